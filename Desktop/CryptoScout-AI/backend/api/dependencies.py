@@ -5,7 +5,7 @@ from fastapi import Depends, Header, HTTPException
 import jwt
 
 from core.config import JWT_SECRET, JWT_ALGORITHM
-from database.repository import get_user_by_id
+from database.async_repository import get_user_by_id
 
 #from fastapi.security import OAuth2PasswordBearer ????
 #from api.dependencies import get_current_user -------Delete 
@@ -13,7 +13,7 @@ from database.repository import get_user_by_id
 
 
 
-def get_current_user(authorization: str = Header(None)):
+async def get_current_user(authorization: str = Header(None)):
 
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Invalid auth header")
@@ -22,7 +22,7 @@ def get_current_user(authorization: str = Header(None)):
 
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        user = get_user_by_id(payload["user_id"])
+        user = await get_user_by_id(payload["user_id"])
 
         if not user:
             raise HTTPException(status_code=401, detail="User not found")
@@ -1,4 +1,6 @@
 
+import asyncio
+
 from fastapi import APIRouter, Depends
 from api.dependencies import require_pro
 from services.explanation_service import generate_trending_explanation
@@ -15,5 +17,6 @@ def explain(symbol: str): #, user=Depends(require_pro)): ------
 
 @router.post("/analyze")
 async def analyze(request: AIRequest, user=Depends(require_pro)):
-    return analyze_project(request.symbol)
+    # analyze_project blocks on the LLM call: keep it off the event loop
+    return await asyncio.to_thread(analyze_project, request.symbol)
     
\ No newline at end of file
@@ -14,7 +14,7 @@ from core.config import (
     JWT_EXPIRY_DAYS
 )
 
-from database.repository import (
+from database.async_repository import (
     get_or_create_user,
     store_refresh_token,
     is_refresh_token_valid
@@ -41,7 +41,7 @@ async def auth_google(payload: dict):
             GOOGLE_CLIENT_ID
         )
 
-        user = get_or_create_user(
+        user = await get_or_create_user(
             idinfo["sub"],
             idinfo.get("email"),
             idinfo.get("name"),
@@ -71,7 +71,7 @@ async def auth_google(payload: dict):
         )
 
         # ✅ store refresh token in DB
-        store_refresh_token(user["id"], refresh_token)
+        await store_refresh_token(user["id"], refresh_token)
 
         return {
             "access_token": access_token,
@@ -88,7 +88,7 @@ async def auth_google(payload: dict):
 # =====================================================
 
 @router.post("/refresh")
-def refresh(payload: dict):
+async def refresh(payload: dict):
 
     token = payload.get("refresh_token")
     if not token:
@@ -101,7 +101,7 @@ def refresh(payload: dict):
             raise HTTPException(status_code=401, detail="Invalid token type")
 
         # ✅ check DB validity
-        if not is_refresh_token_valid(token):
+        if not await is_refresh_token_valid(token):
             raise HTTPException(status_code=401, detail="Token revoked")
 
         new_access_token = jwt.encode(
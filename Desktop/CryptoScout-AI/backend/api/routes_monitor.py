@@ -1,6 +1,7 @@
 
 # backend/api/routes_monitor.py
 
+import logging
 from fastapi import APIRouter
 from datetime import datetime
 
@@ -8,9 +9,19 @@ from services.scanner_service import get_scan_status
 from services.ai_service import ai_engine_health
 from services.market_service import breaker
 from services.market_service import api_tracker
+from services.market_service import market_flight
+from services.market_service import market_snapshot_info
+from services.ranking_service import get_cache_stats
+from database.async_repository import executor_stats
+from core.rate_governor import governor
+from core.circuit_breaker import snapshot_all
+from core.job_queue import job_queue
+from scheduler import get_scheduler_status
 
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(tags=["Monitor"])
 
 
@@ -26,14 +37,18 @@ def monitor():
 
     overall_status = "healthy"
 
-    if scan_info["scanner"]["last_result"] == "FAILED":
+    # Worst tier (see combine_statuses); per-tier detail in scanner.tiers
+    if scan_info["scanner"]["last_result"] in ("FAILED", "PARTIAL"):
         overall_status = "degraded"
 
     if scan_info["scanner"]["failure_count"] > 3:
         overall_status = "critical"
 
-    if api_tracker.snapshot()["calls_last_hour"] > 80:
-        logger.warning("Approaching API budget limit")
+    rate_budget = governor.snapshot()
+
+    for provider, bucket in rate_budget.items():
+        if bucket["tokens"] < bucket["reserve"]:
+            logger.warning("Approaching %s API budget limit", provider)
 
 
     return {
@@ -43,5 +58,13 @@ def monitor():
         "ai_engine": ai_engine_health(),
         "timestamp": datetime.utcnow().isoformat(),
         "market_circuit": breaker.snapshot(),
-        "api_usage": api_tracker.snapshot()
+        "circuit_breakers": snapshot_all(),
+        "scheduler": get_scheduler_status(),
+        "job_queue": job_queue.stats(),
+        "api_usage": api_tracker.snapshot(),
+        "market_requests": market_flight.stats(),
+        "market_snapshot": market_snapshot_info(),
+        "rate_budget": rate_budget,
+        "db_executor": executor_stats(),
+        "ranking_cache": get_cache_stats()
     }
@@ -1,40 +1,156 @@
 
 # backend/api/routes_rankings.py
 
-import hashlib
+import gzip
 import json
+import time
+import asyncio
+from collections import OrderedDict
 
-from fastapi import APIRouter, Response, Request, Query
+from fastapi import APIRouter, Response, Request, Query, HTTPException, Depends
 from fastapi.responses import JSONResponse
 
+from api.dependencies import require_pro
+from database.async_repository import run_db
+from core.config import REFRESH_WAIT_SECONDS
+from core.compression import accepts_gzip
+from core.job_queue import job_queue, QueueFull, JOB_INTERACTIVE
+from services.scanner_service import (
+    scan_single_project,
+    wait_for_covering_scan,
+    refresh_job_key
+)
 from services.ranking_service import (
-    get_short_term,
-    get_long_term,
-    get_low_risk,
-    get_high_growth
+    get_rankings_snapshot,
+    get_snapshot_version,
+    normalize_profile
 )
 
 router = APIRouter(prefix="/rankings", tags=["Rankings"])
 
 
 # =====================================================
-# ETag Helper
+# PRE-ENCODED PAGES
 # =====================================================
 
-def etag_response(request: Request, response: Response, data):
-    etag = hashlib.md5(
-        json.dumps(data, sort_keys=True).encode()
-    ).hexdigest()
+# Pages are immutable for a given snapshot version, so JSON bytes,
+# gzip bytes and the ETag are computed once per (version, page).
+GZIP_MIN_SIZE = 500
+PAGE_CACHE_MAX_ENTRIES = 512
+
+CACHE_CONTROL = "public, max-age=60"
+
+_page_cache = OrderedDict()
+_page_cache_version = None
+
+
+def _page_etag(version: int, view: str, profile: str, limit: int, offset: int) -> str:
+    return f'"{version}-{view}-{profile}-{offset}-{limit}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    If-None-Match is a comma-separated list (or "*"); it uses weak
+    comparison, so W/ tags match too.
+    """
+    if not if_none_match:
+        return False
+
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+
+        if tag == "*":
+            return True
+
+        if tag.startswith("W/"):
+            tag = tag[2:]
+
+        if tag == etag:
+            return True
+
+    return False
+
+
+def _encode_page(view: str, profile: str, limit: int, offset: int):
+    snapshot = get_rankings_snapshot()
+    data = snapshot["profiles"][profile][view][offset:offset + limit]
+    body = json.dumps(data, separators=(",", ":")).encode()
+
+    gzipped = None
+    if len(body) >= GZIP_MIN_SIZE:
+        gzipped = gzip.compress(body, compresslevel=6, mtime=0)
+
+    return snapshot["version"], body, gzipped
 
-    client_etag = request.headers.get("if-none-match")
 
-    if client_etag == etag:
-        return Response(status_code=304)
+def _cache_page(version: int, etag: str, page):
+    global _page_cache_version
 
-    response.headers["ETag"] = etag
-    response.headers["Cache-Control"] = "public, max-age=60"
+    # New snapshot: every cached page is stale
+    if version != _page_cache_version:
+        _page_cache.clear()
+        _page_cache_version = version
 
-    return JSONResponse(content=data)
+    _page_cache[etag] = page
+
+    while len(_page_cache) > PAGE_CACHE_MAX_ENTRIES:
+        _page_cache.popitem(last=False)
+
+
+async def ranking_response(
+    request: Request,
+    view: str,
+    profile: str,
+    limit: int,
+    offset: int
+) -> Response:
+
+    profile = normalize_profile(profile)
+
+    version = await run_db(get_snapshot_version)
+    etag = _page_etag(version, view, profile, limit, offset)
+
+    headers = {
+        "ETag": etag,
+        "Cache-Control": CACHE_CONTROL,
+        "Vary": "Accept-Encoding"
+    }
+
+    # Conditional request: answered before any ranking data is touched
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    page = _page_cache.get(etag) if version == _page_cache_version else None
+
+    if page is None:
+        encoded_version, body, gzipped = await run_db(
+            _encode_page, view, profile, limit, offset
+        )
+
+        # A scan may have published a newer snapshot in between
+        if encoded_version != version:
+            version = encoded_version
+            etag = _page_etag(version, view, profile, limit, offset)
+            headers["ETag"] = etag
+
+        page = (body, gzipped)
+        _cache_page(version, etag, page)
+    else:
+        _page_cache.move_to_end(etag)
+
+    body, gzipped = page
+
+    # Already-compressed bodies are passed through by GZipMiddleware
+    # (tests/test_rankings_http.py guards this across Starlette upgrades)
+    if gzipped is not None and accepts_gzip(request.headers.get("accept-encoding")):
+        headers["Content-Encoding"] = "gzip"
+        body = gzipped
+
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers=headers
+    )
 
 
 # =====================================================
@@ -42,49 +158,85 @@ def etag_response(request: Request, response: Response, data):
 # =====================================================
 
 @router.get("/short-term")
-def short_term(
+async def short_term(
     request: Request,
-    response: Response,
     profile: str = "balanced",
     limit: int = Query(20, le=100),
     offset: int = Query(0)
 ):
-    data = get_short_term(profile, limit, offset)
-    return etag_response(request, response, data)
+    return await ranking_response(request, "short_term", profile, limit, offset)
 
 
 @router.get("/long-term")
-def long_term(
+async def long_term(
     request: Request,
-    response: Response,
     profile: str = "balanced",
     limit: int = Query(20, le=100),
     offset: int = Query(0)
 ):
-    data = get_long_term(profile, limit, offset)
-    return etag_response(request, response, data)
+    return await ranking_response(request, "long_term", profile, limit, offset)
 
 
 @router.get("/low-risk")
-def low_risk(
+async def low_risk(
     request: Request,
-    response: Response,
     profile: str = "balanced",
     limit: int = Query(20, le=100),
     offset: int = Query(0)
 ):
-    data = get_low_risk(profile, limit, offset)
-    return etag_response(request, response, data)
+    return await ranking_response(request, "low_risk", profile, limit, offset)
 
 
 @router.get("/high-growth")
-def high_growth(
+async def high_growth(
     request: Request,
-    response: Response,
     profile: str = "balanced",
     limit: int = Query(20, le=100),
     offset: int = Query(0)
 ):
-    data = get_high_growth(profile, limit, offset)
-    return etag_response(request, response, data)
-
+    return await ranking_response(request, "high_growth", profile, limit, offset)
+
+
+@router.post("/refresh/{symbol}")
+async def refresh_project(symbol: str, user=Depends(require_pro)):
+    """
+    On-demand refresh of one coin (Trader Mode: it spends CoinGecko
+    and LLM budget). Jumps ahead of queued scan work;
+    answers 202 if it has not finished within REFRESH_WAIT_SECONDS.
+    A tier scan already fetching the coin is waited for instead of
+    racing it; the refresh then reuses the row it wrote.
+    """
+    symbol = symbol.upper().strip()
+    deadline = time.monotonic() + REFRESH_WAIT_SECONDS
+
+    if not await wait_for_covering_scan(symbol, REFRESH_WAIT_SECONDS):
+        return JSONResponse(status_code=202, content={"symbol": symbol, "status": "scanning"})
+
+    try:
+        future = await job_queue.submit(
+            refresh_job_key(symbol),
+            scan_single_project,
+            symbol,
+            priority=JOB_INTERACTIVE
+        )
+    except QueueFull:
+        raise HTTPException(status_code=503, detail="Refresh queue is full, try again shortly")
+
+    try:
+        # shield: timing out here must not cancel the shared job
+        project = await asyncio.wait_for(
+            asyncio.shield(future),
+            max(deadline - time.monotonic(), 0.1)
+        )
+    except asyncio.TimeoutError:
+        return JSONResponse(status_code=202, content={"symbol": symbol, "status": "queued"})
+    except asyncio.CancelledError:
+        # The job was cancelled (shutdown), not this request
+        if future.cancelled():
+            raise HTTPException(status_code=503, detail="Refresh cancelled")
+        raise
+
+    if not project:
+        raise HTTPException(status_code=404, detail=f"Project {symbol} not found")
+
+    return project
@@ -1,15 +1,22 @@
 
 # backend/api/routes_watchlist.py
 
+import asyncio
+
 import jwt
 from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi.responses import JSONResponse
 
-from core.config import JWT_SECRET, JWT_ALGORITHM
-from database.repository import (
+from api.dependencies import require_pro
+from core.config import JWT_SECRET, JWT_ALGORITHM, REFRESH_WAIT_SECONDS
+from core.job_queue import job_queue, QueueFull, JOB_INTERACTIVE
+from services.scanner_service import scan_symbols
+from database.async_repository import (
     get_user_by_id,
-    get_all_projects
+    get_watchlist,
+    add_to_watchlist,
+    remove_from_watchlist
 )
-from database.db import get_connection
 
 router = APIRouter(prefix="/watchlist", tags=["Watchlist"])
 
@@ -18,7 +25,7 @@ router = APIRouter(prefix="/watchlist", tags=["Watchlist"])
 # AUTH DEPENDENCY
 # =============================
 
-def get_current_user(authorization: str = Header(None)):
+async def get_current_user(authorization: str = Header(None)):
 
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Invalid auth header")
@@ -27,7 +34,7 @@ def get_current_user(authorization: str = Header(None)):
 
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        user = get_user_by_id(payload["user_id"])
+        user = await get_user_by_id(payload["user_id"])
 
         if not user:
             raise HTTPException(status_code=401, detail="User not found")
@@ -46,51 +53,64 @@ def get_current_user(authorization: str = Header(None)):
 # =============================
 
 @router.post("/add/{symbol}")
-def add_watchlist(symbol: str, user=Depends(get_current_user)):
-
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute(
-        "INSERT OR IGNORE INTO watchlist (user_id, symbol) VALUES (?, ?)",
-        (user["id"], symbol.upper())
-    )
+async def add_watchlist(symbol: str, user=Depends(get_current_user)):
 
-    conn.commit()
-    conn.close()
+    if not await add_to_watchlist(user["id"], symbol):
+        raise HTTPException(status_code=500, detail="Failed to update watchlist")
 
     return {"status": "added", "symbol": symbol.upper()}
 
 
 @router.get("/")
-def fetch_watchlist(user=Depends(get_current_user)):
+async def fetch_watchlist(user=Depends(get_current_user)):
 
-    conn = get_connection()
-    cursor = conn.cursor()
+    return await get_watchlist(user["id"])
 
-    cursor.execute(
-        "SELECT symbol FROM watchlist WHERE user_id=?",
-        (user["id"],)
-    )
 
-    rows = cursor.fetchall()
-    conn.close()
+@router.delete("/remove/{symbol}")
+async def remove_watchlist(symbol: str, user=Depends(get_current_user)):
 
-    return [r["symbol"] for r in rows]
+    if not await remove_from_watchlist(user["id"], symbol):
+        raise HTTPException(status_code=500, detail="Failed to update watchlist")
 
+    return {"status": "removed", "symbol": symbol.upper()}
 
-@router.delete("/remove/{symbol}")
-def remove_watchlist(symbol: str, user=Depends(get_current_user)):
 
-    conn = get_connection()
-    cursor = conn.cursor()
+@router.post("/refresh")
+async def refresh_watchlist(user=Depends(require_pro)):
+    """
+    Rescan every watchlisted coin in one batched by-id fetch (Trader
+    Mode: it spends CoinGecko and LLM budget). Answers 202 if it has
+    not finished within REFRESH_WAIT_SECONDS.
+    """
+    symbols = await get_watchlist(user["id"])
 
-    cursor.execute(
-        "DELETE FROM watchlist WHERE user_id=? AND symbol=?",
-        (user["id"], symbol.upper())
-    )
+    if not symbols:
+        return {"status": "empty", "symbols": []}
 
-    conn.commit()
-    conn.close()
+    try:
+        future = await job_queue.submit(
+            f"watchlist:{user['id']}",
+            scan_symbols,
+            symbols,
+            priority=JOB_INTERACTIVE
+        )
+    except QueueFull:
+        raise HTTPException(status_code=503, detail="Refresh queue is full, try again shortly")
 
-    return {"status": "removed", "symbol": symbol.upper()}
+    try:
+        # shield: timing out here must not cancel the shared job
+        result = await asyncio.wait_for(asyncio.shield(future), REFRESH_WAIT_SECONDS)
+    except asyncio.TimeoutError:
+        return JSONResponse(status_code=202, content={"status": "queued", "symbols": symbols})
+
+    if not result:
+        raise HTTPException(status_code=503, detail="Market data unavailable")
+
+    return {
+        "status": "refreshed",
+        "symbols": symbols,
+        "processed": result["processed"],
+        "unchanged": result["skipped"],
+        "ai_analyzed": result["ai_analyzed"]
+    }
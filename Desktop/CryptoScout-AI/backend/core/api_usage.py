@@ -2,45 +2,157 @@
 # backend/core/api_usage.py
 
 import time
-from collections import deque
+import threading
+
+
+# label -> window length (seconds)
+DEFAULT_WINDOWS = {
+    "1m": 60,
+    "5m": 300,
+    "1h": 3600,
+    "24h": 86400
+}
+
+METRICS = ("calls", "failures", "rate_limits")
+
+
+class RingCounter:
+    """
+    Sliding-window event count in constant memory.
+
+    The window is split into `slots` fixed buckets kept in a ring with
+    a running total; expiring old buckets touches at most `slots`
+    entries, so record and read are O(1). Resolution is one bucket
+    (window / slots).
+    """
+
+    def __init__(self, window_seconds: float, slots: int = 60):
+        self.window_seconds = window_seconds
+        self.slots = slots
+        self.width = window_seconds / slots
+
+        self.counts = [0] * slots
+        self.total = 0
+        self.head = None        # absolute index of the newest bucket
+
+    def _advance(self, now: float):
+        index = int(now // self.width)
+
+        if self.head is None:
+            self.head = index
+            return
+
+        gap = index - self.head
+
+        if gap <= 0:
+            return
+
+        if gap >= self.slots:
+            self.counts = [0] * self.slots
+            self.total = 0
+        else:
+            for i in range(1, gap + 1):
+                slot = (self.head + i) % self.slots
+                self.total -= self.counts[slot]
+                self.counts[slot] = 0
+
+        self.head = index
+
+    def add(self, now: float, n: int = 1):
+        self._advance(now)
+        self.counts[self.head % self.slots] += n
+        self.total += n
+
+    def count(self, now: float) -> int:
+        self._advance(now)
+        return self.total
+
+    def clear(self):
+        self.counts = [0] * self.slots
+        self.total = 0
+        self.head = None
 
 
 class APIUsageTracker:
 
-    def __init__(self, window_seconds: int = 3600):
+    def __init__(self, window_seconds: int = 3600, windows=None, slots: int = 60):
         self.window_seconds = window_seconds
-        self.calls = deque()
-        self.failures = deque()
-        self.rate_limits = deque()
+        self.windows = dict(windows or DEFAULT_WINDOWS)
+
+        # The primary window always exists (backs the *_last_hour keys)
+        if window_seconds not in self.windows.values():
+            self.windows[f"{window_seconds}s"] = window_seconds
+
+        self._lock = threading.Lock()
+        self._counters = {
+            metric: {
+                seconds: RingCounter(seconds, slots)
+                for seconds in set(self.windows.values())
+            }
+            for metric in METRICS
+        }
+
+    def _record(self, metric):
+        now = time.monotonic()
 
-    def _cleanup(self):
-        cutoff = time.time() - self.window_seconds
+        with self._lock:
+            for counter in self._counters[metric].values():
+                counter.add(now)
 
-        while self.calls and self.calls[0] < cutoff:
-            self.calls.popleft()
+    def _count(self, metric, window_seconds=None) -> int:
+        seconds = window_seconds or self.window_seconds
+        counter = self._counters[metric].get(seconds)
 
-        while self.failures and self.failures[0] < cutoff:
-            self.failures.popleft()
+        if counter is None:
+            raise ValueError(f"No {seconds}s window (have {sorted(self._counters[metric])})")
 
-        while self.rate_limits and self.rate_limits[0] < cutoff:
-            self.rate_limits.popleft()
+        with self._lock:
+            return counter.count(time.monotonic())
 
     def record_call(self):
-        self.calls.append(time.time())
-        self._cleanup()
+        self._record("calls")
 
     def record_failure(self):
-        self.failures.append(time.time())
-        self._cleanup()
+        self._record("failures")
 
     def record_rate_limit(self):
-        self.rate_limits.append(time.time())
-        self._cleanup()
+        self._record("rate_limits")
+
+    def get_call_count(self, window_seconds: int = None) -> int:
+        return self._count("calls", window_seconds)
+
+    def get_failure_count(self, window_seconds: int = None) -> int:
+        return self._count("failures", window_seconds)
+
+    def get_rate_limit_count(self, window_seconds: int = None) -> int:
+        return self._count("rate_limits", window_seconds)
+
+    def clear(self):
+        with self._lock:
+            for counters in self._counters.values():
+                for counter in counters.values():
+                    counter.clear()
 
     def snapshot(self):
-        self._cleanup()
+        now = time.monotonic()
+
+        with self._lock:
+            counts = {
+                metric: {
+                    seconds: counter.count(now)
+                    for seconds, counter in counters.items()
+                }
+                for metric, counters in self._counters.items()
+            }
+
+        primary = self.window_seconds
+
         return {
-            "calls_last_hour": len(self.calls),
-            "failures_last_hour": len(self.failures),
-            "rate_limits_last_hour": len(self.rate_limits)
+            "calls_last_hour": counts["calls"][primary],
+            "failures_last_hour": counts["failures"][primary],
+            "rate_limits_last_hour": counts["rate_limits"][primary],
+            "windows": {
+                label: {metric: counts[metric][seconds] for metric in METRICS}
+                for label, seconds in self.windows.items()
+            }
         }
@@ -0,0 +1,150 @@
+
+# backend/core/cache.py
+
+import time
+import threading
+import logging
+from collections import OrderedDict
+
+from core.redis_client import redis_client, cache_get, cache_set
+
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class TieredCache:
+    """
+    L1: in-process TTL + size-bounded LRU.
+    L2: Redis (optional — skipped when REDIS_URL is unset).
+    """
+
+    def __init__(self, name: str, max_entries: int = 128, ttl: int = 30):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._entries = OrderedDict()   # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+        self.l2_errors = 0
+        self._lookup_seconds = 0.0
+        self._lookups = 0
+
+    # -------------------------
+    # L1
+    # -------------------------
+
+    def _l1_get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return _MISSING
+
+            expires_at, value = entry
+
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return _MISSING
+
+            self._entries.move_to_end(key)
+            return value
+
+    def _l1_set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    # -------------------------
+    # PUBLIC
+    # -------------------------
+
+    def _record(self, stat: str, lookup_seconds: float = None):
+        # Counters are shared with executor threads
+        with self._lock:
+            setattr(self, stat, getattr(self, stat) + 1)
+
+            if lookup_seconds is not None:
+                self._lookup_seconds += lookup_seconds
+                self._lookups += 1
+
+    def get(self, key):
+        started = time.perf_counter()
+        outcome = "misses"
+
+        try:
+            value = self._l1_get(key)
+
+            if value is not _MISSING:
+                outcome = "l1_hits"
+                return value
+
+            try:
+                value = cache_get(key)
+            except Exception as e:
+                self._record("l2_errors")
+                logger.warning("L2 cache get failed (%s): %s", self.name, e)
+                value = None
+
+            if value is not None:
+                outcome = "l2_hits"
+                self._l1_set(key, value, self.ttl)
+                return value
+
+            return None
+
+        finally:
+            self._record(outcome, time.perf_counter() - started)
+
+    def set(self, key, value, ttl: int = None):
+        ttl = ttl or self.ttl
+
+        # With a shared L2, keep L1 short-lived so other processes'
+        # writes become visible; without one, L1 is authoritative.
+        l1_ttl = min(ttl, self.ttl) if redis_client else ttl
+
+        self._l1_set(key, value, l1_ttl)
+        self._record("sets")
+
+        try:
+            cache_set(key, value, ttl)
+        except Exception as e:
+            self._record("l2_errors")
+            logger.warning("L2 cache set failed (%s): %s", self.name, e)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def snapshot(self):
+        with self._lock:
+            lookups = self._lookups or 1
+
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "l1_hits": self.l1_hits,
+                "l2_hits": self.l2_hits,
+                "misses": self.misses,
+                "sets": self.sets,
+                "evictions": self.evictions,
+                "l2_errors": self.l2_errors,
+                "hit_rate": round((self.l1_hits + self.l2_hits) / lookups, 4),
+                "avg_lookup_ms": round(self._lookup_seconds / lookups * 1000, 4)
+            }
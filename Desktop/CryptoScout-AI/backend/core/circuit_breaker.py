@@ -1,51 +1,173 @@
-
 # backend/core/circuit_breaker.py
 
 import time
 import logging
+import threading
+from collections import deque
 
 logger = logging.getLogger(__name__)
 
 
 class CircuitBreaker:
+    """
+    Thread-safe breaker.
+
+    CLOSED -> OPEN when `failure_threshold` failures land within
+    `window_seconds`. After `recovery_timeout` it goes HALF-OPEN and
+    admits at most `half_open_max_probes` concurrent probe calls;
+    everyone else is still rejected. A probe success closes the
+    breaker, a probe failure re-opens it, and a neutral outcome (e.g.
+    a 429) hands the slot back via `release_probe()`. Probes that
+    never report back free their slot after `probe_timeout`.
+    """
 
     def __init__(
         self,
         failure_threshold: int = 5,
-        recovery_timeout: int = 120
+        recovery_timeout: int = 120,
+        window_seconds: int = 60,
+        half_open_max_probes: int = 1,
+        probe_timeout: int = 30,
+        name: str = "default"
     ):
+        self.name = name
         self.failure_threshold = failure_threshold
         self.recovery_timeout = recovery_timeout
+        self.window_seconds = window_seconds
+        self.half_open_max_probes = half_open_max_probes
+        self.probe_timeout = probe_timeout
+
+        self._lock = threading.Lock()
+        self._failures = deque(maxlen=failure_threshold)   # recent failure times
+        self._probes = deque()                             # probe start times
 
         self.failure_count = 0
         self.last_failure_time = None
+        self.opened_at = None
         self.state = "CLOSED"
+        self.rejected = 0
+
+    def _expire_probes(self, now):
+        while self._probes and now - self._probes[0] > self.probe_timeout:
+            self._probes.popleft()
 
     def can_execute(self) -> bool:
+        with self._lock:
+            now = time.time()
 
-        if self.state == "OPEN":
-            if time.time() - self.last_failure_time > self.recovery_timeout:
-                logger.info("Circuit breaker entering HALF-OPEN state")
-                self.state = "HALF-OPEN"
+            if self.state == "CLOSED":
                 return True
-            return False
 
-        return True
+            if self.state == "OPEN":
+                if now - self.opened_at <= self.recovery_timeout:
+                    self.rejected += 1
+                    return False
+
+                logger.info("Circuit breaker %s entering HALF-OPEN state", self.name)
+                self.state = "HALF-OPEN"
+                self._probes.clear()
+
+            # HALF-OPEN: only a bounded number of probes at a time
+            self._expire_probes(now)
+
+            if len(self._probes) >= self.half_open_max_probes:
+                self.rejected += 1
+                return False
+
+            self._probes.append(now)
+            return True
 
     def record_success(self):
-        self.failure_count = 0
-        self.state = "CLOSED"
+        with self._lock:
+            if self.state != "CLOSED":
+                logger.info("Circuit breaker %s CLOSED", self.name)
+
+            self.state = "CLOSED"
+            self.failure_count = 0
+            self._failures.clear()
+            self._probes.clear()
+
+    def release_probe(self):
+        """
+        Give back a probe slot without judging the endpoint (the
+        call was deferred or rate-limited, not failed).
+        """
+        with self._lock:
+            if self.state == "HALF-OPEN" and self._probes:
+                self._probes.popleft()
 
     def record_failure(self):
-        self.failure_count += 1
-        self.last_failure_time = time.time()
+        with self._lock:
+            now = time.time()
+
+            self.failure_count += 1
+            self.last_failure_time = now
+            self._failures.append(now)
 
-        if self.failure_count >= self.failure_threshold:
-            self.state = "OPEN"
-            logger.warning("Circuit breaker OPENED")
+            if self.state == "HALF-OPEN":
+                self._open(now)
+                return
+
+            # Rolling window: threshold failures within window_seconds
+            if (
+                self.state == "CLOSED"
+                and len(self._failures) >= self.failure_threshold
+                and now - self._failures[0] <= self.window_seconds
+            ):
+                self._open(now)
+
+    def _open(self, now):
+        self.state = "OPEN"
+        self.opened_at = now
+        self._probes.clear()
+        logger.warning("Circuit breaker %s OPENED", self.name)
+
+    def is_open(self) -> bool:
+        return self.state == "OPEN"
 
     def snapshot(self):
-        return {
-            "state": self.state,
-            "failure_count": self.failure_count
-        }
+        with self._lock:
+            now = time.time()
+
+            return {
+                "state": self.state,
+                "failure_count": self.failure_count,
+                "failures_in_window": sum(
+                    1 for t in self._failures if now - t <= self.window_seconds
+                ),
+                "open_for_seconds": round(now - self.opened_at, 1)
+                if self.state != "CLOSED" and self.opened_at else 0,
+                "probes_in_flight": len(self._probes),
+                "rejected": self.rejected
+            }
+
+
+# =====================================================
+# REGISTRY (provider, endpoint) -> breaker
+# =====================================================
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(provider: str, endpoint: str, **kwargs) -> CircuitBreaker:
+    """
+    Shared breaker for one provider endpoint (created on first use).
+    """
+    key = (provider, endpoint)
+
+    with _registry_lock:
+        breaker = _registry.get(key)
+
+        if breaker is None:
+            breaker = CircuitBreaker(name=f"{provider}:{endpoint}", **kwargs)
+            _registry[key] = breaker
+
+        return breaker
+
+
+def snapshot_all():
+    with _registry_lock:
+        breakers = list(_registry.values())
+
+    return {b.name: b.snapshot() for b in breakers}
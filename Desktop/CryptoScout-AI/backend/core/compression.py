@@ -0,0 +1,51 @@
+# backend/core/compression.py
+
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.datastructures import Headers
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Accept-Encoding allows gzip with q > 0 (explicitly, or via "*"
+    when gzip is not listed).
+    """
+    wildcard = False
+
+    for coding in (accept_encoding or "").split(","):
+        name, _, params = coding.partition(";")
+        name = name.strip().lower()
+        q = 1.0
+
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+
+        if name == "gzip":
+            return q > 0
+
+        if name == "*":
+            wildcard = q > 0
+
+    return wildcard
+
+
+class QValueGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware that honours q-values: Starlette compresses
+    whenever "gzip" appears anywhere in Accept-Encoding, including
+    "gzip;q=0" (gzip refused) and unrelated tokens like "x-gzip-ish".
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not accepts_gzip(
+            Headers(scope=scope).get("accept-encoding")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        await super().__call__(scope, receive, send)
@@ -29,6 +29,15 @@ GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID", "")
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_PATH = os.path.join(BASE_DIR, "cryptoscout.db")
 
+# SQLite tuning (applied to every connection)
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+DB_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", "65536"))       # 64 MB page cache
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))  # 256 MB
+
+# Async data access: dedicated DB threads + bounded wait queue
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", "8"))
+DB_EXECUTOR_QUEUE_SIZE = int(os.getenv("DB_EXECUTOR_QUEUE_SIZE", "256"))
+
 # =====================================================
 # AI
 # =====================================================
@@ -38,12 +47,128 @@ AI_MODEL = "gpt-4o-mini"
 AI_TIMEOUT = 20
 AI_MAX_RETRIES = 2
 
+# A stored LLM verdict is reused while the coin's inputs have not
+# moved materially since that call, for at most AI_CACHE_TTL_SECONDS
+AI_CACHE_TTL_SECONDS = int(os.getenv("AI_CACHE_TTL_SECONDS", str(6 * 3600)))
+# Material change: market cap / volume / rank move by more than this
+# fraction, or a price change field by more than this many points
+AI_CACHE_MAX_RELATIVE_CHANGE = float(os.getenv("AI_CACHE_MAX_RELATIVE_CHANGE", "0.10"))
+AI_CACHE_MAX_CHANGE_POINTS = float(os.getenv("AI_CACHE_MAX_CHANGE_POINTS", "2.0"))
+
+# =====================================================
+# MARKET DATA (COINGECKO)
+# =====================================================
+
+# Async multi-page ingestion: concurrent pages + minimum spacing
+# between request starts (free tier allows ~30 calls/min)
+COINGECKO_PAGE_CONCURRENCY = int(os.getenv("COINGECKO_PAGE_CONCURRENCY", "3"))
+COINGECKO_MIN_REQUEST_INTERVAL = float(os.getenv("COINGECKO_MIN_REQUEST_INTERVAL", "2.0"))
+COINGECKO_MAX_PROJECTS = int(os.getenv("COINGECKO_MAX_PROJECTS", "2500"))
+
+# Identical concurrent market calls share one request; results are
+# reused for this long
+MARKET_RESPONSE_CACHE_SECONDS = float(os.getenv("MARKET_RESPONSE_CACHE_SECONDS", "30"))
+
+# Last-known-good market data, served when CoinGecko is unavailable
+MARKET_SNAPSHOT_PATH = os.getenv("MARKET_SNAPSHOT_PATH", os.path.join(BASE_DIR, "market_snapshot.json"))
+MARKET_SNAPSHOT_MAX_AGE_SECONDS = int(os.getenv("MARKET_SNAPSHOT_MAX_AGE_SECONDS", str(6 * 3600)))
+MARKET_REFRESH_RETRY_SECONDS = float(os.getenv("MARKET_REFRESH_RETRY_SECONDS", "30"))
+MARKET_REFRESH_MAX_ATTEMPTS = int(os.getenv("MARKET_REFRESH_MAX_ATTEMPTS", "6"))
+
+# Symbol -> CoinGecko id index (from /coins/list)
+COIN_INDEX_REFRESH_SECONDS = int(os.getenv("COIN_INDEX_REFRESH_SECONDS", str(24 * 3600)))
+# Unknown symbol: allow an early re-pull at most this often
+COIN_INDEX_MIN_REFRESH_SECONDS = int(os.getenv("COIN_INDEX_MIN_REFRESH_SECONDS", "3600"))
+
+# =====================================================
+# OUTBOUND RATE BUDGETS
+# =====================================================
+
+# provider -> (calls, per seconds, burst)
+RATE_BUDGETS = {
+    "coingecko": (int(os.getenv("COINGECKO_CALLS_PER_MINUTE", "25")), 60, 5),
+    "openai": (int(os.getenv("OPENAI_CALLS_PER_MINUTE", "60")), 60, 10),
+    "gnews": (int(os.getenv("GNEWS_CALLS_PER_DAY", "100")), 24 * 3600, 10),
+    "rapidapi": (int(os.getenv("RAPIDAPI_CALLS_PER_HOUR", "60")), 3600, 10),
+}
+
+# Share of each burst kept back for high-priority (user-facing) calls
+RATE_RESERVE_FRACTION = float(os.getenv("RATE_RESERVE_FRACTION", "0.2"))
+# Longest a normal-priority call waits for a token before giving up
+RATE_MAX_WAIT_SECONDS = float(os.getenv("RATE_MAX_WAIT_SECONDS", "90"))
+# Refill pause after a provider answers 429 (unless it sends Retry-After)
+RATE_PENALTY_SECONDS = float(os.getenv("RATE_PENALTY_SECONDS", "60"))
+
+# =====================================================
+# SCANNER
+# =====================================================
+
+# Max projects processed in parallel during a single scan
+SCAN_CONCURRENCY = int(os.getenv("SCAN_CONCURRENCY", "8"))
+
+# AI calls allowed per scan when no tier budget is given
+SCAN_AI_BUDGET = int(os.getenv("SCAN_AI_BUDGET", "30"))
+
+# Tiered scanning by market-cap rank band. Top coins refresh often,
+# the long tail hourly; per-scan AI budgets keep the total LLM spend
+# at roughly the old single-scan level (~360 calls/hour).
+# (name, first rank, last rank, interval seconds, AI calls per scan)
+SCAN_TIERS = (
+    ("top", 1, 100, 300, 25),
+    ("mid", 101, 500, 1800, 20),
+    ("tail", 501, 1500, 3600, 10),
+)
+
+# Unchanged coins are skipped, but re-analyzed at least this often
+SCAN_UNCHANGED_MAX_AGE_SECONDS = int(os.getenv("SCAN_UNCHANGED_MAX_AGE_SECONDS", "3600"))
+
+# projects.symbol is unique but tickers are not: a deeper-band coin
+# never overwrites a higher-ranked coin's row for the same symbol
+# unless that row has not been refreshed for this long
+SCAN_SYMBOL_OWNER_MAX_AGE_SECONDS = int(os.getenv("SCAN_SYMBOL_OWNER_MAX_AGE_SECONDS", str(6 * 3600)))
+
+# Adaptive cadence: each tier's interval moves between these
+# multiples of its base interval
+SCAN_INTERVAL_MIN_FACTOR = float(os.getenv("SCAN_INTERVAL_MIN_FACTOR", "0.5"))
+SCAN_INTERVAL_MAX_FACTOR = float(os.getenv("SCAN_INTERVAL_MAX_FACTOR", "3.0"))
+# Share of HIGH/EXTREME volatility coins that counts as a hot market,
+# and the share at or below which the market counts as calm
+SCAN_HOT_SHARE = float(os.getenv("SCAN_HOT_SHARE", "0.25"))
+SCAN_CALM_SHARE = float(os.getenv("SCAN_CALM_SHARE", "0.05"))
+# SCORE_JUMP alerts in one scan that count as a burst
+SCAN_ALERT_BURST = int(os.getenv("SCAN_ALERT_BURST", "5"))
+
+# Background job queue: workers in total, and how many of them
+# periodic/maintenance work may occupy (the rest stay free for
+# user-triggered refreshes)
+JOB_QUEUE_CONCURRENCY = int(os.getenv("JOB_QUEUE_CONCURRENCY", "2"))
+JOB_QUEUE_BATCH_CONCURRENCY = int(os.getenv("JOB_QUEUE_BATCH_CONCURRENCY", "1"))
+JOB_QUEUE_MAX_DEPTH = int(os.getenv("JOB_QUEUE_MAX_DEPTH", "100"))
+# On-demand refresh reuses a row written this recently instead of
+# fetching the coin again
+REFRESH_MIN_AGE_SECONDS = int(os.getenv("REFRESH_MIN_AGE_SECONDS", "60"))
+# How long POST /rankings/refresh waits for its job before answering 202
+REFRESH_WAIT_SECONDS = float(os.getenv("REFRESH_WAIT_SECONDS", "20"))
+
+# Only the process holding the scheduler lease scans. The leader
+# renews every tick; if it dies, a follower takes over within
+# TTL + one tick.
+SCHEDULER_LEASE_TTL_SECONDS = int(os.getenv("SCHEDULER_LEASE_TTL_SECONDS", "90"))
+
 # =====================================================
 # RANKING CACHE
 # =====================================================
 
 RANKING_CACHE_DURATION = timedelta(minutes=5)
 
+# In-process L1 (always on) in front of optional Redis L2
+RANKING_CACHE_TTL_SECONDS = int(os.getenv("RANKING_CACHE_TTL_SECONDS", "30"))
+RANKING_CACHE_MAX_ENTRIES = int(os.getenv("RANKING_CACHE_MAX_ENTRIES", "64"))
+
+# Scan-published ranking snapshots; TTL is only a safety net in
+# case scans stop (normally replaced every scan)
+RANKING_SNAPSHOT_TTL_SECONDS = int(os.getenv("RANKING_SNAPSHOT_TTL_SECONDS", "900"))
+
 # =====================================================
 # CORS
 # =====================================================
@@ -0,0 +1,411 @@
+
+# backend/core/job_queue.py
+
+import time
+import heapq
+import asyncio
+import itertools
+import logging
+import contextvars
+from collections import deque
+
+from core.config import (
+    JOB_QUEUE_CONCURRENCY,
+    JOB_QUEUE_BATCH_CONCURRENCY,
+    JOB_QUEUE_MAX_DEPTH
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Lower runs first. Interactive and ranking jobs are "foreground" and
+# may use any worker; periodic and maintenance jobs share at most
+# `batch_concurrency` workers, so a user refresh never waits behind
+# a full scan.
+JOB_INTERACTIVE = 0
+JOB_RANKINGS = 1
+JOB_PERIODIC = 2
+JOB_MAINTENANCE = 3
+
+PRIORITY_NAMES = {
+    JOB_INTERACTIVE: "interactive",
+    JOB_RANKINGS: "rankings",
+    JOB_PERIODIC: "periodic",
+    JOB_MAINTENANCE: "maintenance",
+}
+
+
+class QueueFull(Exception):
+    pass
+
+
+# Key of the job the current task (or its worker thread) runs for
+_current_job = contextvars.ContextVar("current_job", default=None)
+
+
+class _Job:
+
+    def __init__(self, key, priority, fn, args, kwargs, seq):
+        self.key = key
+        self.priority = priority
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.seq = seq
+
+        self.future = asyncio.get_running_loop().create_future()
+        self.enqueued_at = time.monotonic()
+        self.task = None        # own task while running, so it can be cancelled alone
+
+    @property
+    def batch(self) -> bool:
+        return self.priority >= JOB_PERIODIC
+
+
+class JobQueue:
+    """
+    In-process priority queue for background work on the app loop.
+
+    Jobs carry a dedupe key. Submitting a key that is already queued
+    returns that job's future (raising its priority if the new request
+    is more urgent). A key that is running returns the running job's
+    future, or with `after_running=True` queues one follow-up run
+    (e.g. a rebuild that must see newer data). Two jobs with the same
+    key never run at the same time. Coroutine functions run on the
+    loop, plain functions in a worker thread.
+
+    A job must not await another job's future: with every worker
+    busy it would wait forever. Check in_job() and run the work inline.
+    At least one worker is always left for foreground jobs.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        concurrency: int = 2,
+        batch_concurrency: int = 1,
+        max_depth: int = 100
+    ):
+        if concurrency < batch_concurrency + 1:
+            raise ValueError(
+                f"Job queue {name}: concurrency ({concurrency}) must exceed "
+                f"batch_concurrency ({batch_concurrency}) so foreground jobs "
+                f"always have a worker"
+            )
+
+        self.name = name
+        self.concurrency = concurrency
+        self.batch_concurrency = max(1, batch_concurrency)
+        self.max_depth = max_depth
+
+        self._heap = []             # (priority, seq, job) — may hold stale entries
+        self._queued = {}           # key -> job waiting for a worker
+        self._running = {}          # key -> job being run
+        self._parked = {}           # key -> job waiting for its key's running job
+        self._seq = itertools.count()
+        self._cond = None
+        self._loop = None
+        self._workers = []
+        self._batch_running = 0
+
+        self.submitted = 0
+        self.deduped = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._waits = {p: deque(maxlen=200) for p in PRIORITY_NAMES}
+
+    # -------------------------
+    # LIFECYCLE
+    # -------------------------
+
+    def start(self):
+        """
+        Start the workers on the running loop (FastAPI lifespan).
+        """
+        if self._workers:
+            return
+
+        self._cond = asyncio.Condition()
+        self._loop = asyncio.get_running_loop()
+        self._workers = [
+            asyncio.get_running_loop().create_task(self._worker())
+            for _ in range(self.concurrency)
+        ]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+
+        for job in list(self._queued.values()) + list(self._parked.values()):
+            job.future.cancel()
+
+        running = [job.task for job in self._running.values()]
+
+        for task in running:
+            task.cancel()
+
+        for task in self._workers + running:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        self._workers = []
+        self._heap = []
+        self._queued = {}
+        self._running = {}
+        self._parked = {}
+        self._batch_running = 0
+        self._cond = None
+        self._loop = None
+
+    def is_running(self) -> bool:
+        """
+        Workers are up on the calling loop (a script or test driving
+        run_scan through asyncio.run has a loop of its own).
+        """
+        try:
+            return bool(self._workers) and self._loop is asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+
+    # -------------------------
+    # SUBMIT / CANCEL
+    # -------------------------
+
+    async def submit(
+        self,
+        key: str,
+        fn,
+        *args,
+        priority: int = JOB_PERIODIC,
+        after_running: bool = False,
+        **kwargs
+    ) -> asyncio.Future:
+        """
+        Queue a job; returns a future for its result. Callers that do
+        not need the result may ignore it.
+        """
+        if self._cond is None:
+            raise RuntimeError(f"Job queue {self.name} is not started")
+
+        async with self._cond:
+            job = self._queued.get(key) or self._parked.get(key)
+
+            if job is None and not after_running:
+                job = self._running.get(key)
+
+            if job is not None:
+                self.deduped += 1
+
+                # Waiting at a lower priority: move it up
+                if job.task is None and priority < job.priority:
+                    job.priority = priority
+
+                    if key in self._queued:
+                        heapq.heappush(self._heap, (priority, job.seq, job))
+                        self._cond.notify_all()
+
+                return job.future
+
+            if len(self._queued) + len(self._parked) >= self.max_depth:
+                self.rejected += 1
+                raise QueueFull(f"Job queue {self.name} is full ({self.max_depth} jobs)")
+
+            job = _Job(key, priority, fn, args, kwargs, next(self._seq))
+            self._queue(job)
+            self.submitted += 1
+
+            return job.future
+
+    def _queue(self, job):
+        self._queued[job.key] = job
+        heapq.heappush(self._heap, (job.priority, job.seq, job))
+        self._cond.notify_all()
+
+    def cancel(self, key: str) -> bool:
+        """
+        Drop a waiting job and cancel a running one with this key.
+        """
+        found = False
+
+        for waiting in (self._queued, self._parked):
+            job = waiting.pop(key, None)
+
+            if job is not None:
+                job.future.cancel()
+                found = True
+
+        job = self._running.get(key)
+
+        if job is not None:
+            job.task.cancel()
+            found = True
+
+        return found
+
+    def active(self, key: str) -> bool:
+        return key in self._queued or key in self._running or key in self._parked
+
+    def in_job(self) -> bool:
+        """
+        Called from inside a running job (on the loop or in its thread).
+        """
+        return _current_job.get() is not None
+
+    # -------------------------
+    # WORKERS
+    # -------------------------
+
+    def _discard_stale(self):
+        while self._heap:
+            priority, _, job = self._heap[0]
+
+            if self._queued.get(job.key) is job and job.priority == priority:
+                return
+
+            heapq.heappop(self._heap)
+
+    def _runnable(self) -> bool:
+        while True:
+            self._discard_stale()
+
+            if not self._heap:
+                return False
+
+            job = self._heap[0][2]
+
+            # Same key still running: park it until that run ends
+            if job.key in self._running:
+                heapq.heappop(self._heap)
+                del self._queued[job.key]
+                self._parked[job.key] = job
+                continue
+
+            # Heap top is the most urgent job: if it is batch work, no
+            # foreground job is waiting either
+            return not job.batch or self._batch_running < self.batch_concurrency
+
+    async def _worker(self):
+        while True:
+            async with self._cond:
+                await self._cond.wait_for(self._runnable)
+                _, _, job = heapq.heappop(self._heap)
+
+                del self._queued[job.key]
+                self._running[job.key] = job
+                job.task = asyncio.get_running_loop().create_task(self._call(job))
+
+                if job.batch:
+                    self._batch_running += 1
+
+            self._waits[job.priority].append(time.monotonic() - job.enqueued_at)
+
+            try:
+                # wait() (not await task): cancelling the worker leaves
+                # the job to stop()
+                await asyncio.wait({job.task})
+                self._settle(job)
+            finally:
+                async with self._cond:
+                    if job.batch:
+                        self._batch_running -= 1
+
+                    if self._running.get(job.key) is job:
+                        del self._running[job.key]
+
+                    parked = self._parked.pop(job.key, None)
+
+                    if parked is not None and self._workers:
+                        self._queue(parked)
+
+                    self._cond.notify_all()
+
+    async def _call(self, job):
+        # Own task, so this only marks the job's context
+        _current_job.set(job.key)
+
+        if asyncio.iscoroutinefunction(job.fn):
+            return await job.fn(*job.args, **job.kwargs)
+
+        return await asyncio.to_thread(job.fn, *job.args, **job.kwargs)
+
+    def _settle(self, job):
+        task = job.task
+
+        if task.cancelled():
+            logger.info("Job %s cancelled", job.key)
+            job.future.cancel()
+            return
+
+        error = task.exception()
+
+        if error is not None:
+            self.failed += 1
+            logger.error("Job %s failed: %s", job.key, error)
+
+            if not job.future.done():
+                job.future.set_exception(error)
+                # Nobody may be awaiting it
+                job.future.exception()
+            return
+
+        self.completed += 1
+
+        if not job.future.done():
+            job.future.set_result(task.result())
+
+    # -------------------------
+    # METRICS
+    # -------------------------
+
+    def stats(self):
+        depth = {name: 0 for name in PRIORITY_NAMES.values()}
+
+        for job in list(self._queued.values()) + list(self._parked.values()):
+            depth[PRIORITY_NAMES[job.priority]] += 1
+
+        now = time.monotonic()
+        oldest = min(
+            (job.enqueued_at for job in self._queued.values()),
+            default=None
+        )
+
+        waits = {}
+
+        for priority, samples in self._waits.items():
+            if not samples:
+                continue
+
+            ordered = sorted(samples)
+
+            waits[PRIORITY_NAMES[priority]] = {
+                "avg_seconds": round(sum(ordered) / len(ordered), 3),
+                "p95_seconds": round(ordered[int(0.95 * (len(ordered) - 1))], 3),
+                "max_seconds": round(ordered[-1], 3)
+            }
+
+        return {
+            "name": self.name,
+            "workers": len(self._workers),
+            "concurrency": self.concurrency,
+            "batch_concurrency": self.batch_concurrency,
+            "depth": depth,
+            "oldest_wait_seconds": round(now - oldest, 1) if oldest else 0,
+            "running": sorted(self._running),
+            "submitted": self.submitted,
+            "deduped": self.deduped,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "wait": waits
+        }
+
+
+job_queue = JobQueue(
+    "jobs",
+    concurrency=JOB_QUEUE_CONCURRENCY,
+    batch_concurrency=JOB_QUEUE_BATCH_CONCURRENCY,
+    max_depth=JOB_QUEUE_MAX_DEPTH
+)
@@ -0,0 +1,137 @@
+
+# backend/core/leader_lease.py
+
+import os
+import time
+import uuid
+import socket
+import logging
+
+from core.redis_client import redis_client
+from database.repository import acquire_lease, release_lease
+
+
+logger = logging.getLogger(__name__)
+
+# Renew if we hold it, otherwise take it only if nobody does
+_ACQUIRE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+if redis.call('set', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    return 1
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class LeaderLease:
+    """
+    Time-bounded leadership shared by every worker process.
+
+    Redis (SET NX PX) when REDIS_URL is configured, otherwise a row
+    in SQLite. The holder renews on every call to try_acquire(); if
+    it dies, the lease expires and another process takes over within
+    `ttl_seconds`.
+    """
+
+    def __init__(self, name: str, ttl_seconds: float):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.backend = "redis" if redis_client else "sqlite"
+
+        self._holder = None
+        self._holder_pid = None
+
+        self.is_leader = False
+        self.renewed_at = None
+
+    @property
+    def holder(self) -> str:
+        """
+        Identity of this process, created on first use in it. The
+        lease object is built at import, which under `gunicorn
+        --preload` happens once in the master: every forked worker
+        would otherwise share one identity and all "renew" the lease.
+        """
+        pid = os.getpid()
+
+        if self._holder_pid != pid:
+            # Fresh process (or forked copy): nothing held yet
+            self._holder = f"{socket.gethostname()}:{pid}:{uuid.uuid4().hex[:8]}"
+            self._holder_pid = pid
+            self.is_leader = False
+            self.renewed_at = None
+
+        return self._holder
+
+    def _acquire(self) -> bool:
+        if redis_client:
+            try:
+                return bool(redis_client.eval(
+                    _ACQUIRE_SCRIPT,
+                    1,
+                    f"lease:{self.name}",
+                    self.holder,
+                    int(self.ttl_seconds * 1000)
+                ))
+            except Exception as e:
+                logger.warning("Lease %s: Redis error: %s", self.name, e)
+                return False
+
+        return acquire_lease(self.name, self.holder, self.ttl_seconds)
+
+    def try_acquire(self) -> bool:
+        """
+        Take or renew the lease. Blocking — run in a worker thread.
+        """
+        leader = self._acquire()
+
+        if leader and not self.is_leader:
+            logger.info("Lease %s acquired by %s (%s)", self.name, self.holder, self.backend)
+        elif self.is_leader and not leader:
+            logger.warning("Lease %s lost by %s", self.name, self.holder)
+
+        self.is_leader = leader
+
+        if leader:
+            self.renewed_at = time.time()
+
+        return leader
+
+    def release(self):
+        """
+        Give the lease up (clean shutdown) so a follower takes over
+        on its next tick instead of waiting for expiry.
+        """
+        if not self.is_leader:
+            return
+
+        if redis_client:
+            try:
+                redis_client.eval(_RELEASE_SCRIPT, 1, f"lease:{self.name}", self.holder)
+            except Exception as e:
+                logger.warning("Lease %s: Redis error on release: %s", self.name, e)
+        else:
+            release_lease(self.name, self.holder)
+
+        self.is_leader = False
+        logger.info("Lease %s released by %s", self.name, self.holder)
+
+    def snapshot(self):
+        return {
+            "name": self.name,
+            "backend": self.backend,
+            "holder": self.holder,
+            "is_leader": self.is_leader,
+            "ttl_seconds": self.ttl_seconds,
+            "renewed_seconds_ago": round(time.time() - self.renewed_at, 1)
+            if self.renewed_at else None
+        }
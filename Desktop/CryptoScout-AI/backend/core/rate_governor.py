@@ -0,0 +1,200 @@
+
+# backend/core/rate_governor.py
+
+import time
+import asyncio
+import threading
+import logging
+
+from core.config import (
+    RATE_BUDGETS,
+    RATE_RESERVE_FRACTION,
+    RATE_MAX_WAIT_SECONDS,
+    RATE_PENALTY_SECONDS
+)
+
+
+logger = logging.getLogger(__name__)
+
+# high:   user-facing (single lookups, summaries) — may use the reserve
+# normal: scan work — waits for a token, up to max_wait
+# low:    background enrichment — never waits, deferred when short
+PRIORITY_HIGH = "high"
+PRIORITY_NORMAL = "normal"
+PRIORITY_LOW = "low"
+
+
+class TokenBucket:
+
+    def __init__(
+        self,
+        name: str,
+        calls: int,
+        period: float,
+        burst: int,
+        reserve_fraction: float = RATE_RESERVE_FRACTION
+    ):
+        self.name = name
+        self.rate = max(calls, 1) / period          # tokens per second
+        self.capacity = max(burst, 1)
+        self.reserve = min(self.capacity * reserve_fraction, self.capacity - 1)
+
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+        self.granted = 0
+        self.deferred = 0
+        self.waited_seconds = 0.0
+        self.penalties = 0
+
+    def _refill(self, now):
+        start = max(self.updated, self.paused_until)
+
+        if now > start:
+            self.tokens = min(self.capacity, self.tokens + (now - start) * self.rate)
+
+        self.updated = max(self.updated, now)
+
+    def try_take(self, priority: str) -> float:
+        """
+        Take one token. Returns 0 on success, otherwise the seconds
+        until a token is available for this priority.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            floor = 0 if priority == PRIORITY_HIGH else self.reserve
+
+            if self.tokens - 1 >= floor:
+                self.tokens -= 1
+                self.granted += 1
+                return 0.0
+
+            wait = (floor + 1 - self.tokens) / self.rate
+
+            if now < self.paused_until:
+                wait += self.paused_until - now
+
+            return wait
+
+    def penalize(self, seconds: float):
+        with self.lock:
+            self.tokens = 0.0
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.penalties += 1
+
+    def snapshot(self):
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            return {
+                "tokens": round(self.tokens, 2),
+                "capacity": self.capacity,
+                "reserve": round(self.reserve, 2),
+                "rate_per_minute": round(self.rate * 60, 3),
+                "paused_for_seconds": round(max(self.paused_until - now, 0), 1),
+                "granted": self.granted,
+                "deferred": self.deferred,
+                "waited_seconds": round(self.waited_seconds, 2),
+                "penalties": self.penalties
+            }
+
+
+class RateGovernor:
+    """
+    Proactive per-provider token buckets shared by every outbound
+    client. Callers ask for a token before each request instead of
+    finding out about the budget from a 429.
+    """
+
+    def __init__(self, budgets):
+        self._buckets = {
+            name: TokenBucket(name, calls, period, burst)
+            for name, (calls, period, burst) in budgets.items()
+        }
+
+    def _decide(self, bucket, wait, priority, deadline):
+        if priority == PRIORITY_LOW or time.monotonic() + wait > deadline:
+            with bucket.lock:
+                bucket.deferred += 1
+            logger.info("Rate budget short for %s — %s-priority call deferred", bucket.name, priority)
+            return False
+
+        with bucket.lock:
+            bucket.waited_seconds += wait
+        return True
+
+    def acquire(self, provider: str, priority: str = PRIORITY_NORMAL, max_wait: float = None) -> bool:
+        """
+        Block until a token is available (or max_wait passes).
+        Returns False when the call should be skipped/deferred.
+        """
+        bucket = self._buckets.get(provider)
+
+        if bucket is None:
+            return True
+
+        deadline = time.monotonic() + (RATE_MAX_WAIT_SECONDS if max_wait is None else max_wait)
+
+        while True:
+            wait = bucket.try_take(priority)
+
+            if wait == 0:
+                return True
+
+            if not self._decide(bucket, wait, priority, deadline):
+                return False
+
+            time.sleep(wait)
+
+    async def acquire_async(self, provider: str, priority: str = PRIORITY_NORMAL, max_wait: float = None) -> bool:
+        """
+        Async acquire(): waits without blocking the event loop.
+        """
+        bucket = self._buckets.get(provider)
+
+        if bucket is None:
+            return True
+
+        deadline = time.monotonic() + (RATE_MAX_WAIT_SECONDS if max_wait is None else max_wait)
+
+        while True:
+            wait = bucket.try_take(priority)
+
+            if wait == 0:
+                return True
+
+            if not self._decide(bucket, wait, priority, deadline):
+                return False
+
+            await asyncio.sleep(wait)
+
+    def penalize(self, provider: str, seconds: float = None):
+        """
+        Provider answered 429: drain its bucket and pause refills.
+        """
+        bucket = self._buckets.get(provider)
+
+        if bucket is None:
+            return
+
+        seconds = RATE_PENALTY_SECONDS if seconds is None else seconds
+        bucket.penalize(seconds)
+        logger.warning("%s rate limited — pausing its budget for %.0fs", provider, seconds)
+
+    def remaining(self, provider: str) -> float:
+        bucket = self._buckets.get(provider)
+        return bucket.snapshot()["tokens"] if bucket else float("inf")
+
+    def snapshot(self):
+        return {
+            name: bucket.snapshot()
+            for name, bucket in self._buckets.items()
+        }
+
+
+governor = RateGovernor(RATE_BUDGETS)
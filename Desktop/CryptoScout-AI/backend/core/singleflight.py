@@ -0,0 +1,190 @@
+
+# backend/core/singleflight.py
+
+import asyncio
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+
+_MISSING = object()
+
+
+class _Call:
+    """
+    One in-flight sync call that followers wait on.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Request coalescing + short-lived response cache.
+
+    Concurrent calls with the same key share one in-flight call and
+    its result (sync callers across threads, async callers per event
+    loop). Truthy results are then served from a small TTL cache;
+    empty/failed results are never cached. Every caller gets its own
+    deep copy, so mutating a result cannot leak into the cache.
+    """
+
+    def __init__(self, name: str, ttl: float = 30, max_entries: int = 256):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()   # key -> (expires_at, value)
+        self._calls = {}              # key -> _Call
+        self._tasks = {}              # (loop, key) -> asyncio.Task
+
+        self.calls = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+
+    # -------------------------
+    # RESPONSE CACHE
+    # -------------------------
+
+    def _cached(self, key):
+        entry = self._cache.get(key)
+
+        if entry is None:
+            return _MISSING
+
+        expires_at, value = entry
+
+        if expires_at <= time.monotonic():
+            del self._cache[key]
+            return _MISSING
+
+        self.cache_hits += 1
+        return value
+
+    def _store(self, key, value):
+        if not value or self.ttl <= 0:
+            return
+
+        with self._lock:
+            self._cache[key] = (time.monotonic() + self.ttl, value)
+            self._cache.move_to_end(key)
+
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    # -------------------------
+    # SYNC
+    # -------------------------
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) unless an identical call is already
+        in flight (wait for it) or recently cached.
+        """
+        with self._lock:
+            value = self._cached(key)
+
+            if value is not _MISSING:
+                return copy.deepcopy(value)
+
+            call = self._calls.get(key)
+            leader = call is None
+
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+
+            if call.error is not None:
+                raise call.error
+
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = fn(*args, **kwargs)
+            self._store(key, call.result)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+        return copy.deepcopy(call.result)
+
+    # -------------------------
+    # ASYNC
+    # -------------------------
+
+    async def do_async(self, key, fn, *args, **kwargs):
+        """
+        Async counterpart of do(): fn is a coroutine function. The
+        shared call runs as its own task, so one caller being
+        cancelled does not cancel it for the others.
+        """
+        loop = asyncio.get_running_loop()
+        task_key = (loop, key)
+
+        with self._lock:
+            value = self._cached(key)
+
+            if value is not _MISSING:
+                return copy.deepcopy(value)
+
+            task = self._tasks.get(task_key)
+
+            if task is None:
+                task = loop.create_task(fn(*args, **kwargs))
+                self._tasks[task_key] = task
+                self.calls += 1
+                task.add_done_callback(
+                    lambda t: self._finish_task(task_key, key, t)
+                )
+            else:
+                self.coalesced += 1
+
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result)
+
+    def _finish_task(self, task_key, key, task):
+        with self._lock:
+            self._tasks.pop(task_key, None)
+
+        if not task.cancelled() and task.exception() is None:
+            self._store(key, task.result())
+
+    # -------------------------
+    # ADMIN
+    # -------------------------
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self):
+        with self._lock:
+            requested = self.calls + self.cache_hits + self.coalesced
+
+            return {
+                "name": self.name,
+                "ttl_seconds": self.ttl,
+                "cached_entries": len(self._cache),
+                "in_flight": len(self._calls) + len(self._tasks),
+                "upstream_calls": self.calls,
+                "cache_hits": self.cache_hits,
+                "coalesced": self.coalesced,
+                "saved_ratio": round(
+                    (self.cache_hits + self.coalesced) / requested, 4
+                ) if requested else 0.0
+            }
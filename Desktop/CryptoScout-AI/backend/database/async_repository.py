@@ -0,0 +1,124 @@
+
+# backend/database/async_repository.py
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from core.config import DB_EXECUTOR_WORKERS, DB_EXECUTOR_QUEUE_SIZE
+from database import repository
+
+
+# =====================================================
+# DB EXECUTOR
+# =====================================================
+
+# Dedicated DB threads (each keeps its own pooled connection), so
+# routes don't hold slots in the default request threadpool.
+_executor = ThreadPoolExecutor(
+    max_workers=DB_EXECUTOR_WORKERS,
+    thread_name_prefix="db"
+)
+
+# Bounded queue: workers + queue_size calls admitted, the rest await
+_slots = None
+_in_flight = 0
+
+
+def _get_slots() -> asyncio.Semaphore:
+    global _slots
+
+    if _slots is None:
+        _slots = asyncio.Semaphore(DB_EXECUTOR_WORKERS + DB_EXECUTOR_QUEUE_SIZE)
+
+    return _slots
+
+
+async def run_db(fn, *args, **kwargs):
+    """
+    Run a blocking DB-bound callable on the DB executor.
+    """
+    global _in_flight
+
+    async with _get_slots():
+        _in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                _executor,
+                partial(fn, *args, **kwargs)
+            )
+        finally:
+            _in_flight -= 1
+
+
+def executor_stats():
+    return {
+        "workers": DB_EXECUTOR_WORKERS,
+        "queue_size": DB_EXECUTOR_QUEUE_SIZE,
+        "in_flight": _in_flight
+    }
+
+
+# =============================
+# USERS
+# =============================
+
+async def get_or_create_user(google_id, email, name, picture):
+    return await run_db(repository.get_or_create_user, google_id, email, name, picture)
+
+
+async def get_user_by_id(user_id):
+    return await run_db(repository.get_user_by_id, user_id)
+
+
+# =============================
+# PROJECTS
+# =============================
+
+async def get_all_projects():
+    return await run_db(repository.get_all_projects)
+
+
+async def get_project_by_symbol(symbol: str):
+    return await run_db(repository.get_project_by_symbol, symbol)
+
+
+# =============================
+# ALERTS
+# =============================
+
+async def get_all_alerts(limit: int = 50):
+    return await run_db(repository.get_all_alerts, limit)
+
+
+# =============================
+# WATCHLIST
+# =============================
+
+async def get_watchlist(user_id: int):
+    return await run_db(repository.get_watchlist, user_id)
+
+
+async def add_to_watchlist(user_id: int, symbol: str):
+    return await run_db(repository.add_to_watchlist, user_id, symbol)
+
+
+async def remove_from_watchlist(user_id: int, symbol: str):
+    return await run_db(repository.remove_from_watchlist, user_id, symbol)
+
+
+# =============================
+# REFRESH TOKENS
+# =============================
+
+async def store_refresh_token(user_id: int, token: str, days_valid: int = 30):
+    return await run_db(repository.store_refresh_token, user_id, token, days_valid)
+
+
+async def is_refresh_token_valid(token: str) -> bool:
+    return await run_db(repository.is_refresh_token_valid, token)
+
+
+async def revoke_refresh_token(token: str):
+    return await run_db(repository.revoke_refresh_token, token)
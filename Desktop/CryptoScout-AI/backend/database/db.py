@@ -2,15 +2,100 @@
 # backend/database/db.py
 
 import sqlite3
-from core.config import DB_PATH
+import threading
+from contextlib import contextmanager
+
+from core.config import (
+    DB_PATH,
+    DB_BUSY_TIMEOUT_MS,
+    DB_CACHE_SIZE_KB,
+    DB_MMAP_SIZE
+)
+
+
+# =====================================================
+# CONNECTION MANAGER
+# =====================================================
+
+# One long-lived connection per thread (scheduler thread,
+# request threadpool workers, scan worker threads).
+_local = threading.local()
+
+
+def _apply_pragmas(conn):
+    cursor = conn.cursor()
+
+    # WAL: readers never block on the scan's writer (and vice versa)
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(DB_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA cache_size=-{int(DB_CACHE_SIZE_KB)}")
+    cursor.execute(f"PRAGMA mmap_size={int(DB_MMAP_SIZE)}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
 
 
 def get_connection():
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    """
+    Open a new, tuned connection.
+    Prefer db_session() — this is for one-off work like migrations.
+    """
+    conn = sqlite3.connect(
+        DB_PATH,
+        check_same_thread=False,
+        timeout=DB_BUSY_TIMEOUT_MS / 1000
+    )
     conn.row_factory = sqlite3.Row
+    _apply_pragmas(conn)
     return conn
 
 
+def _thread_connection():
+    conn = getattr(_local, "conn", None)
+
+    if conn is None:
+        conn = get_connection()
+        _local.conn = conn
+        _local.depth = 0
+
+    return conn
+
+
+@contextmanager
+def db_session():
+    """
+    Hand out this thread's pooled connection.
+
+    Commits when the outermost block exits cleanly and rolls back
+    on any exception. Nested blocks share the same transaction.
+    """
+    conn = _thread_connection()
+    _local.depth += 1
+
+    try:
+        yield conn
+
+        if _local.depth == 1:
+            conn.commit()
+    except Exception:
+        if _local.depth == 1:
+            conn.rollback()
+        raise
+    finally:
+        _local.depth -= 1
+
+
+def close_thread_connection():
+    """
+    Close this thread's pooled connection (if any).
+    """
+    conn = getattr(_local, "conn", None)
+
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+        _local.depth = 0
+
+
 def init_db():
 
     # ==========================
@@ -50,10 +135,27 @@ def init_db():
         ai_score REAL,
         ai_verdict TEXT,
         sentiment_score REAL,
+        combined_score REAL,
+        fingerprint TEXT,
+        coin_id TEXT,
         last_updated TEXT
     )
     """)
 
+    cursor.execute("""
+    PRAGMA table_info(projects)
+    """)
+    project_columns = [row[1] for row in cursor.fetchall()]
+
+    if "combined_score" not in project_columns:
+        cursor.execute("ALTER TABLE projects ADD COLUMN combined_score REAL")
+
+    if "fingerprint" not in project_columns:
+        cursor.execute("ALTER TABLE projects ADD COLUMN fingerprint TEXT")
+
+    if "coin_id" not in project_columns:
+        cursor.execute("ALTER TABLE projects ADD COLUMN coin_id TEXT")
+
     # =============================
     # Watchlist
     # =============================
@@ -109,6 +211,55 @@ def init_db():
     )
     """)
 
+    # =============================
+    # Coin Index (symbol -> CoinGecko id)
+    # =============================
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS coin_index (
+        coin_id TEXT PRIMARY KEY,
+        symbol TEXT,
+        name TEXT,
+        updated_at TEXT
+    )
+    """)
+
+    # =============================
+    # Scheduler Lease (one scanning process)
+    # =============================
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS scheduler_lease (
+        name TEXT PRIMARY KEY,
+        holder TEXT,
+        expires_at REAL
+    )
+    """)
+
+    # =============================
+    # App State (small cross-process values)
+    # =============================
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS app_state (
+        key TEXT PRIMARY KEY,
+        value TEXT,
+        updated_at TEXT
+    )
+    """)
+
+    # =============================
+    # AI Result Cache (last LLM verdict per coin + its inputs)
+    # =============================
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS ai_cache (
+        symbol TEXT PRIMARY KEY,
+        model TEXT,
+        features TEXT,
+        score REAL,
+        verdict TEXT,
+        confidence REAL,
+        created_at REAL
+    )
+    """)
+
     # =============================
     # Refresh Tokens
     # =============================
@@ -145,6 +296,11 @@ def init_db():
     ON project_history(symbol, snapshot_time)
     """)
 
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_coin_index_symbol
+    ON coin_index(symbol)
+    """)
+
     cursor.execute("""
     CREATE INDEX IF NOT EXISTS idx_alert_symbol_time
     ON alerts(symbol, created_at)
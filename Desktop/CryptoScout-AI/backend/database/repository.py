@@ -3,8 +3,9 @@
 # backend/database/repository.py
 
 import sqlite3
+import time
 from datetime import datetime, timedelta
-from database.db import get_connection
+from database.db import db_session
 
 
 # =============================
@@ -12,24 +13,9 @@ from database.db import get_connection
 # =============================
 
 def get_or_create_user(google_id, email, name, picture):
-    conn = None
     try:
-        conn = get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cursor.execute(
-            "SELECT * FROM users WHERE google_id=?",
-            (google_id,)
-        )
-        user = cursor.fetchone()
-
-        if not user:
-            cursor.execute(
-                "INSERT INTO users (google_id, email, name, picture) VALUES (?, ?, ?, ?)",
-                (google_id, email, name, picture)
-            )
-            conn.commit()
+        with db_session() as conn:
+            cursor = conn.cursor()
 
             cursor.execute(
                 "SELECT * FROM users WHERE google_id=?",
@@ -37,204 +23,260 @@ def get_or_create_user(google_id, email, name, picture):
             )
             user = cursor.fetchone()
 
-        return dict(user) if user else None
+            if not user:
+                cursor.execute(
+                    "INSERT INTO users (google_id, email, name, picture) VALUES (?, ?, ?, ?)",
+                    (google_id, email, name, picture)
+                )
+
+                cursor.execute(
+                    "SELECT * FROM users WHERE google_id=?",
+                    (google_id,)
+                )
+                user = cursor.fetchone()
+
+            return dict(user) if user else None
     except sqlite3.Error as e:
         print(f"Database error in get_or_create_user: {e}")
-        if conn:
-            conn.rollback()
         return None
-    finally:
-        if conn:
-            conn.close()
 
 
 def get_user_by_id(user_id):
-    conn = None
     try:
-        conn = get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        with db_session() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute(
-            "SELECT * FROM users WHERE id=?",
-            (user_id,)
-        )
+            cursor.execute(
+                "SELECT * FROM users WHERE id=?",
+                (user_id,)
+            )
 
-        user = cursor.fetchone()
-        return dict(user) if user else None
+            user = cursor.fetchone()
+            return dict(user) if user else None
     except sqlite3.Error as e:
         print(f"Database error in get_user_by_id: {e}")
         return None
-    finally:
-        if conn:
-            conn.close()
 
 
 # =============================
 # PROJECTS
 # =============================
 
+_UPSERT_PROJECT_SQL = """
+INSERT INTO projects (
+    name, symbol, current_price, market_cap, volume_24h,
+    price_change_24h, price_change_7d,
+    market_cap_rank, ai_score, ai_verdict,
+    sentiment_score, combined_score, fingerprint, coin_id, last_updated
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(symbol) DO UPDATE SET
+    name=excluded.name,
+    market_cap=excluded.market_cap,
+    current_price=excluded.current_price,
+    volume_24h=excluded.volume_24h,
+    price_change_24h=excluded.price_change_24h,
+    price_change_7d=excluded.price_change_7d,
+    market_cap_rank=excluded.market_cap_rank,
+    ai_score=excluded.ai_score,
+    ai_verdict=excluded.ai_verdict,
+    sentiment_score=excluded.sentiment_score,
+    combined_score=excluded.combined_score,
+    fingerprint=excluded.fingerprint,
+    coin_id=COALESCE(excluded.coin_id, projects.coin_id),
+    last_updated=excluded.last_updated
+"""
+
+_INSERT_HISTORY_SQL = """
+INSERT INTO project_history (
+    symbol,
+    current_price,
+    market_cap,
+    volume_24h,
+    price_change_24h,
+    price_change_7d,
+    ai_score,
+    ai_verdict,
+    sentiment_score,
+    combined_score,
+    snapshot_time
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
+"""
+
+_INSERT_ALERT_SQL = """
+INSERT INTO alerts (symbol, alert_type, message, created_at)
+VALUES (?, ?, ?, datetime('now'))
+"""
+
+_UPSERT_AI_CACHE_SQL = """
+INSERT INTO ai_cache (
+    symbol, model, features, score, verdict, confidence, created_at
+)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(symbol) DO UPDATE SET
+    model=excluded.model,
+    features=excluded.features,
+    score=excluded.score,
+    verdict=excluded.verdict,
+    confidence=excluded.confidence,
+    created_at=excluded.created_at
+"""
+
+
+def _project_params(data, updated_at):
+    return (
+        data["name"],
+        data["symbol"],
+        data["current_price"],
+        data["market_cap"],
+        data["volume_24h"],
+        data["price_change_24h"],
+        data["price_change_7d"],
+        data["market_cap_rank"],
+        data["ai_score"],
+        data["ai_verdict"],
+        data["sentiment_score"],
+        data.get("combined_score"),
+        data.get("fingerprint"),
+        data.get("coin_id") or None,
+        updated_at
+    )
+
+
+def _history_params(data):
+    return (
+        data["symbol"],
+        data["current_price"],
+        data["market_cap"],
+        data["volume_24h"],
+        data["price_change_24h"],
+        data["price_change_7d"],
+        data["ai_score"],
+        data["ai_verdict"],
+        data["sentiment_score"],
+        data["combined_score"]
+    )
+
+
+def _alert_params(data):
+    return (
+        data["symbol"].upper().strip(),
+        data["alert_type"],
+        data["message"]
+    )
+
+
 def upsert_project(data):
-    conn = None
     try:
-        conn = get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cursor.execute("""
-        INSERT INTO projects (
-            name, symbol, current_price, market_cap, volume_24h,
-            price_change_24h, price_change_7d,
-            market_cap_rank, ai_score, ai_verdict,
-            sentiment_score, last_updated
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(symbol) DO UPDATE SET
-            name=excluded.name,
-            market_cap=excluded.market_cap,
-            current_price=excluded.current_price,
-            volume_24h=excluded.volume_24h,
-            price_change_24h=excluded.price_change_24h,
-            price_change_7d=excluded.price_change_7d,
-            market_cap_rank=excluded.market_cap_rank,
-            ai_score=excluded.ai_score,
-            ai_verdict=excluded.ai_verdict,
-            sentiment_score=excluded.sentiment_score,
-            last_updated=excluded.last_updated
-        """, (
-            data["name"],
-            data["symbol"],
-            data["current_price"],
-            data["market_cap"],
-            data["volume_24h"],
-            data["price_change_24h"],
-            data["price_change_7d"],
-            data["market_cap_rank"],
-            data["ai_score"],
-            data["ai_verdict"],
-            data["sentiment_score"],
-            datetime.utcnow().isoformat()
-        ))
-
-        conn.commit()
+        with db_session() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(
+                _UPSERT_PROJECT_SQL,
+                _project_params(data, datetime.utcnow().isoformat())
+            )
     except sqlite3.Error as e:
         print(f"Database error in upsert_project: {e}")
-        if conn:
-            conn.rollback()
-    finally:
-        if conn:
-            conn.close()
 
 
 def get_all_projects():
-    conn = None
     try:
-        conn = get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        with db_session() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("SELECT * FROM projects")
-        rows = cursor.fetchall()
+            cursor.execute("SELECT * FROM projects")
+            rows = cursor.fetchall()
 
-        return [dict(r) for r in rows]
+            return [dict(r) for r in rows]
     except sqlite3.Error as e:
         print(f"Database error in get_all_projects: {e}")
         return []
-    finally:
-        if conn:
-            conn.close()
 
 
 def insert_project_history(data):
-    conn = None
     try:
-        conn = get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cursor.execute("""
-        INSERT INTO project_history (
-            symbol,
-            current_price,
-            market_cap,
-            volume_24h,
-            price_change_24h,
-            price_change_7d,
-            ai_score,
-            ai_verdict,
-            sentiment_score,
-            combined_score,
-            snapshot_time
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
-        """, (
-            data["symbol"],
-            data["current_price"],
-            data["market_cap"],
-            data["volume_24h"],
-            data["price_change_24h"],
-            data["price_change_7d"],
-            data["ai_score"],
-            data["ai_verdict"],
-            data["sentiment_score"],
-            data["combined_score"]
-        ))
-
-        conn.commit()
+        with db_session() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(_INSERT_HISTORY_SQL, _history_params(data))
     except sqlite3.Error as e:
         print(f"Database error in insert_project_history: {e}")
-        if conn:
-            conn.rollback()
-    finally:
-        if conn:
-            conn.close()
 
 
 def get_project_by_symbol(symbol: str):
     if not symbol or not isinstance(symbol, str):
         return None
     
-    conn = None
     try:
-        conn = get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        with db_session() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute(
-            "SELECT * FROM projects WHERE symbol=?",
-            (symbol.upper().strip(),)
-        )
+            cursor.execute(
+                "SELECT * FROM projects WHERE symbol=?",
+                (symbol.upper().strip(),)
+            )
 
-        row = cursor.fetchone()
-        return dict(row) if row else None
+            row = cursor.fetchone()
+            return dict(row) if row else None
     except sqlite3.Error as e:
         print(f"Database error in get_project_by_symbol: {e}")
         return None
-    finally:
-        if conn:
-            conn.close()
 
 
-def insert_alert(symbol: str, alert_type: str, message: str):
-    conn = None
+# SQLite caps bound parameters per statement (999 on older builds)
+_MAX_IN_PARAMS = 500
+
+
+def _chunks(items, size=_MAX_IN_PARAMS):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def get_projects_by_symbols(symbols):
+    """
+    Load many projects in as few queries as possible.
+    Returns {symbol: row}.
+    """
+    symbols = sorted({s.upper().strip() for s in symbols if s})
+
+    if not symbols:
+        return {}
+
     try:
-        conn = get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        with db_session() as conn:
+            cursor = conn.cursor()
+
+            projects = {}
+
+            for chunk in _chunks(symbols):
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(
+                    f"SELECT * FROM projects WHERE symbol IN ({placeholders})",
+                    chunk
+                )
+
+                for row in cursor.fetchall():
+                    projects[row["symbol"]] = dict(row)
+
+            return projects
+    except sqlite3.Error as e:
+        print(f"Database error in get_projects_by_symbols: {e}")
+        return {}
 
-        cursor.execute("""
-        INSERT INTO alerts (symbol, alert_type, message, created_at)
-        VALUES (?, ?, ?, datetime('now'))
-        """, (symbol.upper().strip(), alert_type, message))
 
-        conn.commit()
+def insert_alert(symbol: str, alert_type: str, message: str):
+    try:
+        with db_session() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(_INSERT_ALERT_SQL, _alert_params({
+                "symbol": symbol,
+                "alert_type": alert_type,
+                "message": message
+            }))
     except sqlite3.Error as e:
         print(f"Database error in insert_alert: {e}")
-        if conn:
-            conn.rollback()
-    finally:
-        if conn:
-            conn.close()
 
 
 def get_recent_alert(symbol: str, alert_type: str, minutes: int = 60):
@@ -244,51 +286,446 @@ def get_recent_alert(symbol: str, alert_type: str, minutes: int = 60):
     if not symbol or not alert_type:
         return None
 
-    conn = None
     try:
-        conn = get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cursor.execute("""
-        SELECT * FROM alerts
-        WHERE symbol=? AND alert_type=? 
-        AND created_at >= datetime('now', ?)
-        ORDER BY created_at DESC
-        LIMIT 1
-        """, (symbol.upper().strip(), alert_type, f"-{minutes} minutes"))
-
-        row = cursor.fetchone()
-        return dict(row) if row else None
+        with db_session() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("""
+            SELECT * FROM alerts
+            WHERE symbol=? AND alert_type=? 
+            AND created_at >= datetime('now', ?)
+            ORDER BY created_at DESC
+            LIMIT 1
+            """, (symbol.upper().strip(), alert_type, f"-{minutes} minutes"))
+
+            row = cursor.fetchone()
+            return dict(row) if row else None
     except sqlite3.Error as e:
         print(f"Database error in get_recent_alert: {e}")
         return None
-    finally:
-        if conn:
-            conn.close()
+
+
+def get_recent_alert_symbols(symbols, alert_type: str, minutes: int = 60):
+    """
+    Batch version of get_recent_alert.
+    Returns the set of symbols alerted within the time window.
+    """
+    symbols = sorted({s.upper().strip() for s in symbols if s})
+
+    if not symbols or not alert_type:
+        return set()
+
+    try:
+        with db_session() as conn:
+            cursor = conn.cursor()
+
+            alerted = set()
+
+            for chunk in _chunks(symbols):
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(f"""
+                SELECT DISTINCT symbol FROM alerts
+                WHERE alert_type=?
+                AND created_at >= datetime('now', ?)
+                AND symbol IN ({placeholders})
+                """, (alert_type, f"-{minutes} minutes", *chunk))
+
+                alerted.update(row["symbol"] for row in cursor.fetchall())
+
+            return alerted
+    except sqlite3.Error as e:
+        print(f"Database error in get_recent_alert_symbols: {e}")
+        return set()
 
 
 def get_all_alerts(limit: int = 50):
-    conn = None
     try:
-        conn = get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cursor.execute("""
-        SELECT * FROM alerts
-        ORDER BY created_at DESC
-        LIMIT ?
-        """, (limit,))
-
-        rows = cursor.fetchall()
-        return [dict(r) for r in rows]
+        with db_session() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("""
+            SELECT * FROM alerts
+            ORDER BY created_at DESC
+            LIMIT ?
+            """, (limit,))
+
+            rows = cursor.fetchall()
+            return [dict(r) for r in rows]
     except sqlite3.Error as e:
         print(f"Database error in get_all_alerts: {e}")
         return []
-    finally:
-        if conn:
-            conn.close()
+
+
+# =============================
+# WATCHLIST
+# =============================
+
+def get_watchlist(user_id: int):
+    try:
+        with db_session() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(
+                "SELECT symbol FROM watchlist WHERE user_id=?",
+                (user_id,)
+            )
+
+            return [r["symbol"] for r in cursor.fetchall()]
+    except sqlite3.Error as e:
+        print(f"Database error in get_watchlist: {e}")
+        return []
+
+
+def add_to_watchlist(user_id: int, symbol: str):
+    try:
+        with db_session() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(
+                "INSERT OR IGNORE INTO watchlist (user_id, symbol) VALUES (?, ?)",
+                (user_id, symbol.upper())
+            )
+
+            return True
+    except sqlite3.Error as e:
+        print(f"Database error in add_to_watchlist: {e}")
+        return False
+
+
+def remove_from_watchlist(user_id: int, symbol: str):
+    try:
+        with db_session() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(
+                "DELETE FROM watchlist WHERE user_id=? AND symbol=?",
+                (user_id, symbol.upper())
+            )
+
+            return True
+    except sqlite3.Error as e:
+        print(f"Database error in remove_from_watchlist: {e}")
+        return False
+
+
+# =====================================================
+# BULK WRITES (SCAN RESULTS)
+# =====================================================
+
+def _ai_cache_params(entry):
+    return (
+        entry["symbol"],
+        entry["model"],
+        entry["features"],
+        entry["score"],
+        entry["verdict"],
+        entry["confidence"],
+        entry["created_at"]
+    )
+
+
+def _rows_params(table, rows, to_params, dropped, *args):
+    """
+    SQL parameters for every well-formed row. A row missing a field
+    is dropped (logged and counted in `dropped[table]`) instead of
+    aborting the whole batch.
+    """
+    params = []
+
+    for row in rows:
+        try:
+            params.append(to_params(row, *args))
+        except (KeyError, TypeError, AttributeError) as e:
+            symbol = row.get("symbol") if isinstance(row, dict) else None
+            print(f"Skipping malformed {table} row for {symbol}: {e!r}")
+            dropped[table] = dropped.get(table, 0) + 1
+
+    return params
+
+
+def _write_scan_rows(cursor, projects, history, alerts, ai_cache=()):
+    """
+    Returns {table: rows dropped as malformed}.
+    """
+    updated_at = datetime.utcnow().isoformat()
+    dropped = {}
+
+    if projects:
+        cursor.executemany(
+            _UPSERT_PROJECT_SQL,
+            _rows_params("projects", projects, _project_params, dropped, updated_at)
+        )
+
+    if history:
+        cursor.executemany(
+            _INSERT_HISTORY_SQL,
+            _rows_params("project_history", history, _history_params, dropped)
+        )
+
+    if alerts:
+        cursor.executemany(
+            _INSERT_ALERT_SQL,
+            _rows_params("alerts", alerts, _alert_params, dropped)
+        )
+
+    if ai_cache:
+        cursor.executemany(
+            _UPSERT_AI_CACHE_SQL,
+            _rows_params("ai_cache", ai_cache, _ai_cache_params, dropped)
+        )
+
+    return dropped
+
+
+def _bulk_write(name, projects=(), history=(), alerts=(), ai_cache=(), report=None):
+    try:
+        with db_session() as conn:
+            cursor = conn.cursor()
+
+            dropped = _write_scan_rows(cursor, projects, history, alerts, ai_cache)
+
+            if dropped:
+                print(f"{name}: dropped malformed rows {dropped}")
+
+            if report is not None:
+                report["dropped"] = dropped
+
+            return True
+    except sqlite3.Error as e:
+        print(f"Database error in {name}: {e}")
+        return False
+
+
+def upsert_projects_bulk(projects):
+    """
+    Upsert many projects with a single commit.
+    """
+    return _bulk_write("upsert_projects_bulk", projects=projects)
+
+
+def insert_history_bulk(rows):
+    """
+    Insert many history snapshots with a single commit.
+    """
+    return _bulk_write("insert_history_bulk", history=rows)
+
+
+def insert_alerts_bulk(alerts):
+    """
+    Insert many alerts ({symbol, alert_type, message}) with a single commit.
+    """
+    return _bulk_write("insert_alerts_bulk", alerts=alerts)
+
+
+def save_ai_cache_bulk(entries):
+    """
+    Upsert AI cache entries (one row per symbol) with a single commit.
+    """
+    return _bulk_write("save_ai_cache_bulk", ai_cache=entries)
+
+
+def save_scan_results(projects, history, alerts, ai_cache=(), report=None):
+    """
+    Persist a whole scan (projects, history snapshots, alerts and
+    new AI cache entries) in one transaction. A database error
+    writes nothing (returns False). Malformed rows (missing fields)
+    are logged and dropped while the rest commits; if `report` is
+    given, report["dropped"] is set to {table: rows dropped}.
+    """
+    return _bulk_write(
+        "save_scan_results",
+        projects=projects,
+        history=history,
+        alerts=alerts,
+        ai_cache=ai_cache,
+        report=report
+    )
+
+
+def get_ai_cache_entries(symbols, model: str, min_created_at: float):
+    """
+    Cached AI results for many symbols, only for `model` and newer
+    than `min_created_at`. Returns {symbol: row}.
+    """
+    symbols = sorted({s.upper().strip() for s in symbols if s})
+
+    if not symbols:
+        return {}
+
+    try:
+        with db_session() as conn:
+            cursor = conn.cursor()
+
+            entries = {}
+
+            for chunk in _chunks(symbols):
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(f"""
+                SELECT * FROM ai_cache
+                WHERE model = ?
+                AND created_at >= ?
+                AND symbol IN ({placeholders})
+                """, (model, min_created_at, *chunk))
+
+                entries.update({row["symbol"]: dict(row) for row in cursor.fetchall()})
+
+            return entries
+    except sqlite3.Error as e:
+        print(f"Database error in get_ai_cache_entries: {e}")
+        return {}
+
+
+# =====================================================
+# COIN INDEX (SYMBOL -> COINGECKO ID)
+# =====================================================
+
+def replace_coin_index(coins):
+    """
+    Swap in a fresh coin index ({coin_id, symbol, name}) atomically.
+    """
+    updated_at = datetime.utcnow().isoformat()
+
+    rows = [
+        (c["coin_id"], c["symbol"].upper().strip(), c.get("name", ""), updated_at)
+        for c in coins
+        if c.get("coin_id") and c.get("symbol")
+    ]
+
+    try:
+        with db_session() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("DELETE FROM coin_index")
+            cursor.executemany(
+                """
+                INSERT OR REPLACE INTO coin_index (coin_id, symbol, name, updated_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                rows
+            )
+
+            return True
+    except sqlite3.Error as e:
+        print(f"Database error in replace_coin_index: {e}")
+        return False
+
+
+def get_coin_ids_by_symbol(symbol: str):
+    """
+    All CoinGecko ids sharing a symbol (symbols are not unique).
+    """
+    try:
+        with db_session() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT coin_id FROM coin_index WHERE symbol = ?",
+                (symbol.upper().strip(),)
+            )
+            return [row["coin_id"] for row in cursor.fetchall()]
+    except sqlite3.Error as e:
+        print(f"Database error in get_coin_ids_by_symbol: {e}")
+        return []
+
+
+def get_coin_index_updated_at():
+    """
+    When the coin index was last refreshed (datetime), or None if empty.
+    """
+    try:
+        with db_session() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT MAX(updated_at) FROM coin_index")
+            row = cursor.fetchone()
+            return datetime.fromisoformat(row[0]) if row and row[0] else None
+    except (sqlite3.Error, ValueError) as e:
+        print(f"Database error in get_coin_index_updated_at: {e}")
+        return None
+
+
+# =====================================================
+# SCHEDULER LEASE
+# =====================================================
+
+def acquire_lease(name: str, holder: str, ttl_seconds: float) -> bool:
+    """
+    Take or renew a named lease in one atomic upsert.
+    True if `holder` owns the lease afterwards.
+    """
+    now = time.time()
+
+    try:
+        with db_session() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(
+                """
+                INSERT INTO scheduler_lease (name, holder, expires_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    holder=excluded.holder,
+                    expires_at=excluded.expires_at
+                WHERE scheduler_lease.holder = excluded.holder
+                   OR scheduler_lease.expires_at < ?
+                """,
+                (name, holder, now + ttl_seconds, now)
+            )
+
+            cursor.execute(
+                "SELECT holder FROM scheduler_lease WHERE name = ?",
+                (name,)
+            )
+            row = cursor.fetchone()
+
+            return bool(row) and row["holder"] == holder
+    except sqlite3.Error as e:
+        print(f"Database error in acquire_lease: {e}")
+        return False
+
+
+def release_lease(name: str, holder: str):
+    try:
+        with db_session() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "DELETE FROM scheduler_lease WHERE name = ? AND holder = ?",
+                (name, holder)
+            )
+    except sqlite3.Error as e:
+        print(f"Database error in release_lease: {e}")
+
+
+# =====================================================
+# APP STATE
+# =====================================================
+
+def set_app_state(key: str, value: str):
+    try:
+        with db_session() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                INSERT INTO app_state (key, value, updated_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    value=excluded.value,
+                    updated_at=excluded.updated_at
+                """,
+                (key, value, datetime.utcnow().isoformat())
+            )
+    except sqlite3.Error as e:
+        print(f"Database error in set_app_state: {e}")
+
+
+def get_app_state(key: str):
+    try:
+        with db_session() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT value FROM app_state WHERE key = ?", (key,))
+            row = cursor.fetchone()
+            return row["value"] if row else None
+    except sqlite3.Error as e:
+        print(f"Database error in get_app_state: {e}")
+        return None
 
 
 # =====================================================
@@ -303,36 +740,28 @@ def store_refresh_token(user_id: int, token: str, days_valid: int = 30):
     if not user_id or not token:
         return False
 
-    conn = None
     try:
-        conn = get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        expires_at = (datetime.utcnow() + timedelta(days=days_valid)).isoformat()
-
-        cursor.execute(
-            """
-            INSERT INTO refresh_tokens (user_id, token, expires_at)
-            VALUES (?, ?, ?)
-            """,
-            (
-                user_id,
-                token,
-                expires_at
+        with db_session() as conn:
+            cursor = conn.cursor()
+
+            expires_at = (datetime.utcnow() + timedelta(days=days_valid)).isoformat()
+
+            cursor.execute(
+                """
+                INSERT INTO refresh_tokens (user_id, token, expires_at)
+                VALUES (?, ?, ?)
+                """,
+                (
+                    user_id,
+                    token,
+                    expires_at
+                )
             )
-        )
 
-        conn.commit()
-        return True
+            return True
     except sqlite3.Error as e:
         print(f"Database error in store_refresh_token: {e}")
-        if conn:
-            conn.rollback()
         return False
-    finally:
-        if conn:
-            conn.close()
 
 
 def is_refresh_token_valid(token: str) -> bool:
@@ -342,28 +771,23 @@ def is_refresh_token_valid(token: str) -> bool:
     if not token:
         return False
 
-    conn = None
     try:
-        conn = get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            SELECT id FROM refresh_tokens
-            WHERE token = ? AND expires_at > ?
-            """,
-            (token, datetime.utcnow().isoformat())
-        )
+        with db_session() as conn:
+            cursor = conn.cursor()
 
-        row = cursor.fetchone()
-        return row is not None
+            cursor.execute(
+                """
+                SELECT id FROM refresh_tokens
+                WHERE token = ? AND expires_at > ?
+                """,
+                (token, datetime.utcnow().isoformat())
+            )
+
+            row = cursor.fetchone()
+            return row is not None
     except sqlite3.Error as e:
         print(f"Database error in is_refresh_token_valid: {e}")
         return False
-    finally:
-        if conn:
-            conn.close()
 
 
 def revoke_refresh_token(token: str):
@@ -373,27 +797,19 @@ def revoke_refresh_token(token: str):
     if not token:
         return False
 
-    conn = None
     try:
-        conn = get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            DELETE FROM refresh_tokens
-            WHERE token = ?
-            """,
-            (token,)
-        )
+        with db_session() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(
+                """
+                DELETE FROM refresh_tokens
+                WHERE token = ?
+                """,
+                (token,)
+            )
 
-        conn.commit()
-        return True
+            return True
     except sqlite3.Error as e:
         print(f"Database error in revoke_refresh_token: {e}")
-        if conn:
-            conn.rollback()
         return False
-    finally:
-        if conn:
-            conn.close()
\ No newline at end of file
@@ -1,9 +1,10 @@
 
 # backend/main.py
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 
 import sentry_sdk
 import os
@@ -11,7 +12,10 @@ import os
 from core.config import APP_NAME, ALLOWED_ORIGINS
 from core.logging_config import setup_logging
 from database.db import init_db
-from scheduler import start_scheduler
+from scheduler import start_scheduler, stop_scheduler
+from services.market_service import close_async_client
+from core.job_queue import job_queue
+from core.compression import QValueGZipMiddleware
 
 from api.routes_auth import router as auth_router
 from api.routes_rankings import router as rankings_router
@@ -34,11 +38,30 @@ from payments import router as payments_router
 setup_logging()
 
 
+# =====================================================
+# LIFESPAN (STARTUP / SHUTDOWN)
+# =====================================================
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_db()
+
+    # Scans run on this loop, next to the WebSocket connections
+    job_queue.start()
+    start_scheduler()
+
+    yield
+
+    await stop_scheduler()
+    await job_queue.stop()
+    await close_async_client()
+
+
 # =====================================================
 # CREATE APP (MUST COME EARLY)
 # =====================================================
 
-app = FastAPI(title=APP_NAME)
+app = FastAPI(title=APP_NAME, lifespan=lifespan)
 
 
 @app.middleware("https")
@@ -61,8 +84,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# optional gzip
-app.add_middleware(GZipMiddleware, minimum_size=500)
+# optional gzip (q-value aware, see core/compression.py)
+app.add_middleware(QValueGZipMiddleware, minimum_size=500)
 
 
 # =====================================================
@@ -78,16 +101,6 @@ if SENTRY_DSN:
     )
 
 
-# =====================================================
-# STARTUP
-# =====================================================
-
-@app.on_event("startup")
-def startup_event():
-    init_db()
-    start_scheduler()
-
-
 
 # =====================================================
 # ROUTERS
@@ -4,17 +4,40 @@
 from datetime import datetime
 
 
+# Worst first: the combined status reports the worst tier
+RESULT_SEVERITY = ("FAILED", "PARTIAL", "UNKNOWN", "SUCCESS")
+
+
 class ScanStatus:
     def __init__(self):
         self.last_run = None
+        self.last_success_time = None
         self.last_result = "UNKNOWN"
         self.failure_count = 0
         self.api_failures = 0
+        self.missing_pages = []
+        self.stale_pages = []
+        self.stale_count = 0
 
-    def success(self):
-        self.last_run = datetime.utcnow().isoformat()
-        self.last_result = "SUCCESS"
-        self.failure_count = 0
+    def success(self, missing_pages=None, stale_pages=None, stale_count=0):
+        """
+        Scan saved. With missing market pages it only covered part of
+        its band; with pages served from the last-known-good snapshot
+        its data is old. Either way it is reported as PARTIAL and does
+        not clear earlier failures.
+        """
+        now = datetime.utcnow()
+        self.last_run = now.isoformat()
+        self.last_success_time = now
+        self.missing_pages = list(missing_pages or [])
+        self.stale_pages = list(stale_pages or [])
+        self.stale_count = stale_count
+
+        if self.missing_pages or self.stale_pages or stale_count:
+            self.last_result = "PARTIAL"
+        else:
+            self.last_result = "SUCCESS"
+            self.failure_count = 0
 
     def failure(self):
         self.last_run = datetime.utcnow().isoformat()
@@ -29,7 +52,33 @@ class ScanStatus:
             "scanner": {
                 "last_run": self.last_run,
                 "last_result": self.last_result,
-                "failure_count": self.failure_count
+                "failure_count": self.failure_count,
+                "missing_pages": self.missing_pages,
+                "stale_pages": self.stale_pages,
+                "stale_count": self.stale_count
             },
             "api_failures": self.api_failures
         }
+
+
+def combine_statuses(statuses):
+    """
+    One status over several scanners ({tier: ScanStatus}) so one
+    tier's success never masks another's failure: the worst result,
+    the highest failure count and the latest run, plus every tier's
+    own snapshot.
+    """
+    tiers = {name: status.snapshot()["scanner"] for name, status in statuses.items()}
+
+    results = [t["last_result"] for t in tiers.values()] or ["UNKNOWN"]
+    runs = [t["last_run"] for t in tiers.values() if t["last_run"]]
+
+    return {
+        "scanner": {
+            "last_run": max(runs) if runs else None,
+            "last_result": min(results, key=RESULT_SEVERITY.index),
+            "failure_count": max((t["failure_count"] for t in tiers.values()), default=0),
+            "tiers": tiers
+        },
+        "api_failures": sum(status.api_failures for status in statuses.values())
+    }
@@ -2,7 +2,7 @@
 # backend/recommendation_engine.py
 
 import math
-from database import get_all_projects
+from database.repository import get_all_projects
 
 
 # --------------------------------------------------
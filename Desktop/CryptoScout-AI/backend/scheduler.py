@@ -1,11 +1,26 @@
 
 # backend/scheduler.py
 
-import threading
 import time
+import asyncio
+import random
 import logging
 
-from services.scanner_service import run_scan_sync
+from services.scanner_service import run_scan
+from services.market_service import refresh_coin_index, set_market_refresh_listener
+from services.ranking_service import sync_rankings_snapshot
+from core.leader_lease import LeaderLease
+from core.rate_governor import governor
+from core.job_queue import job_queue, QueueFull, JOB_PERIODIC, JOB_MAINTENANCE
+from core.config import (
+    SCAN_TIERS,
+    SCHEDULER_LEASE_TTL_SECONDS,
+    SCAN_INTERVAL_MIN_FACTOR,
+    SCAN_INTERVAL_MAX_FACTOR,
+    SCAN_HOT_SHARE,
+    SCAN_CALM_SHARE,
+    SCAN_ALERT_BURST
+)
 
 
 logger = logging.getLogger(__name__)
@@ -14,50 +29,251 @@ logger = logging.getLogger(__name__)
 # CONFIG
 # =====================================================
 
-SCAN_INTERVAL_SECONDS = 300  # 5 minutes
+# How often the loop checks which tiers are due
+SCHEDULER_TICK_SECONDS = 30
 
-_scheduler_thread = None
-_running = False
-_lock = threading.Lock()
+# Random delay added to each tick so several processes/instances
+# don't hit the providers in lockstep (never accumulates)
+SCHEDULER_JITTER_SECONDS = 3
+
+_scheduler_task = None
+
+# One scanning process across all workers
+_lease = LeaderLease("scan-scheduler", SCHEDULER_LEASE_TTL_SECONDS)
+
+# tier name -> loop time it is next due (0 = run on first tick)
+_next_due = {}
+
+# tier name -> current adaptive interval (seconds)
+_intervals = {}
+
+# Tiers whose last scan served stale or missing market pages
+_degraded = set()
+
+# Providers whose budget pressure slows scanning down
+SCAN_BUDGET_PROVIDERS = ("coingecko", "openai")
 
 
 # =====================================================
-# SAFE SCAN WRAPPER
+# TIER RUNNER
 # =====================================================
 
-def _safe_scan():
+def _advance_due(name, interval, now):
     """
-    Ensures only one scan runs at a time.
+    Fixed-rate: the next slot is one interval after the previous
+    slot, not after the scan finished. Missed slots are skipped
+    rather than run back to back.
     """
+    due = _next_due.get(name) or now
 
-    if not _lock.acquire(blocking=False):
-        logger.warning("Scan skipped — previous scan still running")
-        return
+    while due <= now:
+        due += interval
 
-    try:
-        run_scan_sync()
-    finally:
-        _lock.release()
+    _next_due[name] = due
+
+
+def _budget_pressure(before, after) -> bool:
+    """
+    The scan had to defer calls or hit a 429, or a provider is still
+    paused: scanning faster would only burn the remaining budget.
+    """
+    for provider in SCAN_BUDGET_PROVIDERS:
+        old, new = before.get(provider), after.get(provider)
+
+        if not old or not new:
+            continue
+
+        if (
+            new["deferred"] > old["deferred"]
+            or new["penalties"] > old["penalties"]
+            or new["paused_for_seconds"] > 0
+        ):
+            return True
+
+    return False
+
+
+def _adaptive_interval(base, result, budget_low) -> float:
+    """
+    Next interval for a tier from its last scan: shorter when the
+    band runs hot or SCORE_JUMP alerts burst, longer when it is calm
+    or the API/LLM budget is under pressure. Always within
+    [base * SCAN_INTERVAL_MIN_FACTOR, base * SCAN_INTERVAL_MAX_FACTOR].
+    """
+    factor = 1.0
+
+    heat = result.get("volatility") or {}
+    total = sum(heat.values())
+
+    if total:
+        hot_share = (heat.get("HIGH", 0) + heat.get("EXTREME", 0)) / total
+
+        if hot_share >= SCAN_HOT_SHARE:
+            factor *= 0.5
+        elif hot_share <= SCAN_CALM_SHARE:
+            factor *= 1.5
+
+    if result.get("alerts", 0) >= SCAN_ALERT_BURST:
+        factor *= 0.5
+
+    # Budget wins over freshness
+    if budget_low:
+        factor = max(factor, 1.0) * 2
+
+    return min(
+        max(base * factor, base * SCAN_INTERVAL_MIN_FACTOR),
+        base * SCAN_INTERVAL_MAX_FACTOR
+    )
+
+
+def _tier_key(name: str) -> str:
+    return f"scan:{name}"
+
+
+async def _run_tier(name, first_rank, last_rank, interval, ai_budget, slot):
+    """
+    One tier scan (a periodic job), then re-time the tier from its
+    result.
+    """
+    loop = asyncio.get_running_loop()
+    current = _intervals.get(name, interval)
+    budget_before = governor.snapshot()
+
+    result = await run_scan(
+        limit=last_rank - first_rank + 1,
+        offset=first_rank - 1,
+        ai_budget=ai_budget,
+        tier=name
+    )
+
+    # Failed scans keep the current cadence
+    if not result:
+        return result
+
+    if result.get("stale_pages") or result.get("missing_pages"):
+        _degraded.add(name)
+    else:
+        _degraded.discard(name)
+
+    adapted = _adaptive_interval(
+        interval,
+        result,
+        _budget_pressure(budget_before, governor.snapshot())
+    )
+
+    if adapted != current:
+        logger.info("Tier %s interval %ss -> %ss", name, round(current), round(adapted))
+        _intervals[name] = adapted
+
+        # Re-slot from this run's start on the new cadence
+        _next_due[name] = slot
+        _advance_due(name, adapted, loop.time())
+
+    return result
+
+
+def _rescan_refreshed(last_rank: int):
+    """
+    A background market refresh brought ranks 1..last_rank back:
+    tiers it covers that were served stale become due on the
+    next tick, so the fresh data reaches the DB (stale rows are never
+    written).
+    """
+    for name, _, tier_last_rank, _, _ in SCAN_TIERS:
+        if name in _degraded and tier_last_rank <= last_rank:
+            logger.info("Tier %s rescan queued — market data is fresh again", name)
+            _next_due[name] = 0
+
+
+async def _submit_due_tiers():
+    loop = asyncio.get_running_loop()
+
+    # No-op unless the symbol index is stale (daily)
+    await job_queue.submit("coin-index", refresh_coin_index, priority=JOB_MAINTENANCE)
+
+    # Same priority runs in submit order: top band first
+    for name, first_rank, last_rank, interval, ai_budget in SCAN_TIERS:
+        now = loop.time()
+
+        if now < _next_due.get(name, 0):
+            continue
+
+        # Due time moves at submit so a failing tier does not retry
+        # on every tick
+        slot = _next_due.get(name) or now
+        _advance_due(name, _intervals.get(name, interval), now)
+
+        # Overlap protection: a tier never stacks a second scan
+        if job_queue.active(_tier_key(name)):
+            logger.warning("Tier %s skipped — previous scan still queued or running", name)
+            continue
+
+        await job_queue.submit(
+            _tier_key(name),
+            _run_tier,
+            name, first_rank, last_rank, interval, ai_budget, slot,
+            priority=JOB_PERIODIC
+        )
 
 
 # =====================================================
 # BACKGROUND LOOP
 # =====================================================
 
-def _scheduler_loop():
-    global _running
+async def _scheduler_loop():
+    loop = asyncio.get_running_loop()
+
+    logger.info(
+        "Scheduler started (tiers: %s; lease via %s as %s)",
+        ", ".join(f"{t[0]} ranks {t[1]}-{t[2]} every {t[3]}s" for t in SCAN_TIERS),
+        _lease.backend,
+        _lease.holder     # first use in this worker pins its identity
+    )
 
-    logger.info("Scheduler started (interval: %s sec)", SCAN_INTERVAL_SECONDS)
+    next_tick = loop.time()
 
-    while _running:
-        try:
-            _safe_scan()
-        except Exception as e:
-            logger.error("Scheduler error: %s", e)
+    try:
+        while True:
+            # Renewed every tick, including while a long scan runs
+            try:
+                leader = await asyncio.to_thread(_lease.try_acquire)
+            except Exception as e:
+                logger.error("Scheduler lease check failed: %s", e)
+                leader = False
+
+            # A single failed renewal is tolerated; once our last renewal
+            # is older than the TTL another process may be scanning
+            lease_expired = time.time() - (_lease.renewed_at or 0) >= _lease.ttl_seconds
+
+            if not leader and lease_expired:
+                for name, *_ in SCAN_TIERS:
+                    if job_queue.cancel(_tier_key(name)):
+                        logger.warning("Scheduler lease lost — cancelled %s scan", name)
+
+            if not leader:
+                # Followers only pick up the leader's published rankings
+                try:
+                    await asyncio.to_thread(sync_rankings_snapshot)
+                except Exception as e:
+                    logger.error("Rankings snapshot sync failed: %s", e)
+
+            else:
+                try:
+                    await _submit_due_tiers()
+                except QueueFull as e:
+                    logger.warning("Scan tick skipped: %s", e)
 
-        time.sleep(SCAN_INTERVAL_SECONDS)
+            # Ticks are scheduled on absolute times, so scan duration
+            # never shifts the cadence
+            next_tick += SCHEDULER_TICK_SECONDS
 
-    logger.info("Scheduler stopped")
+            if next_tick < loop.time():
+                next_tick = loop.time()
+
+            delay = next_tick - loop.time() + random.uniform(0, SCHEDULER_JITTER_SECONDS)
+            await asyncio.sleep(delay)
+    finally:
+        logger.info("Scheduler stopped")
 
 
 # =====================================================
@@ -65,22 +281,62 @@ def _scheduler_loop():
 # =====================================================
 
 def start_scheduler():
-    global _scheduler_thread, _running
+    """
+    Start the scheduler on the running event loop (call from the
+    FastAPI lifespan) so scans and their WebSocket broadcasts share
+    the loop that owns the sockets.
+    """
+    global _scheduler_task
 
-    if _scheduler_thread and _scheduler_thread.is_alive():
+    if _scheduler_task and not _scheduler_task.done():
         logger.warning("Scheduler already running")
         return
 
-    _running = True
+    loop = asyncio.get_running_loop()
 
-    _scheduler_thread = threading.Thread(
-        target=_scheduler_loop,
-        daemon=True
+    # The refresh runs in its own thread: hop onto the loop
+    set_market_refresh_listener(
+        lambda last_rank: loop.call_soon_threadsafe(_rescan_refreshed, last_rank)
     )
 
-    _scheduler_thread.start()
+    _scheduler_task = loop.create_task(_scheduler_loop())
+
+
+async def stop_scheduler():
+    """
+    Stop the tick loop. Queued and running scans are cancelled by
+    job_queue.stop().
+    """
+    global _scheduler_task
+
+    if _scheduler_task and not _scheduler_task.done():
+        _scheduler_task.cancel()
+
+        try:
+            await _scheduler_task
+        except asyncio.CancelledError:
+            pass
+
+    _scheduler_task = None
+    set_market_refresh_listener(None)
+
+    # Hand over now instead of making followers wait for expiry
+    try:
+        await asyncio.to_thread(_lease.release)
+    except Exception as e:
+        logger.error("Scheduler lease release failed: %s", e)
 
 
-def stop_scheduler():
-    global _running
-    _running = False
+def get_scheduler_status():
+    return {
+        "running": bool(_scheduler_task and not _scheduler_task.done()),
+        "scanning": [
+            name for name, *_ in SCAN_TIERS
+            if job_queue.active(_tier_key(name))
+        ],
+        "intervals": {
+            name: round(_intervals.get(name, interval))
+            for name, _, _, interval, _ in SCAN_TIERS
+        },
+        "lease": _lease.snapshot()
+    }
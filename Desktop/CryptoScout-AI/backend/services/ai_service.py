@@ -2,11 +2,23 @@
 # backend/services/ai_service.py
 
 import math
+import json
+import time
 import logging
-from typing import Dict, Any
-
-from openai import OpenAI
-from core.config import OPENAI_API_KEY, AI_MODEL, AI_TIMEOUT, AI_MAX_RETRIES
+import threading
+from typing import Dict, Any, Optional
+
+from openai import OpenAI, RateLimitError
+from core.config import (
+    OPENAI_API_KEY,
+    AI_MODEL,
+    AI_TIMEOUT,
+    AI_MAX_RETRIES,
+    AI_CACHE_TTL_SECONDS,
+    AI_CACHE_MAX_RELATIVE_CHANGE,
+    AI_CACHE_MAX_CHANGE_POINTS
+)
+from core.rate_governor import governor, PRIORITY_HIGH, PRIORITY_NORMAL
 
 logger = logging.getLogger(__name__)
 
@@ -111,6 +123,10 @@ Rank: {project.get("market_cap_rank")}
 
     for attempt in range(AI_MAX_RETRIES):
 
+        # Out of OpenAI budget: score deterministically instead of waiting
+        if not governor.acquire("openai", PRIORITY_NORMAL, max_wait=AI_TIMEOUT):
+            break
+
         try:
             response = client.chat.completions.create(
                 model=AI_MODEL,
@@ -134,9 +150,14 @@ Rank: {project.get("market_cap_rank")}
             return {
                 "score": score,
                 "verdict": parsed["verdict"],
-                "confidence": confidence
+                "confidence": confidence,
+                "source": "llm"
             }
 
+        except RateLimitError as e:
+            governor.penalize("openai")
+            logger.warning("AI attempt rate limited: %s", e)
+
         except Exception as e:
             logger.warning("AI attempt failed: %s", e)
 
@@ -144,6 +165,130 @@ Rank: {project.get("market_cap_rank")}
     return fallback_analysis(project)
 
 
+# =====================================================
+# RESULT CACHE
+# =====================================================
+
+# Inputs the prompt depends on, quantized so float noise never
+# counts as a change
+RELATIVE_FEATURES = ("market_cap", "volume_24h", "market_cap_rank")
+POINT_FEATURES = ("price_change_24h", "price_change_7d")
+
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0, "stores": 0}
+
+
+def _count(stat: str, n: int = 1):
+    with _cache_lock:
+        _cache_stats[stat] += n
+
+
+def ai_features(project: Dict[str, Any]) -> Dict[str, float]:
+    features = {
+        field: float(f"{float(project.get(field) or 0):.3g}")
+        for field in RELATIVE_FEATURES
+    }
+    features.update({
+        field: round(float(project.get(field) or 0), 1)
+        for field in POINT_FEATURES
+    })
+    return features
+
+
+def is_material_change(previous: Dict[str, float], current: Dict[str, float]) -> bool:
+    """
+    Compared against the inputs of the cached LLM call, so slow
+    drift still adds up to a material change.
+    """
+    for field in RELATIVE_FEATURES:
+        before, after = previous.get(field, 0), current[field]
+
+        # Floor of 10 so a top-10 coin swapping ranks by one is not material
+        if abs(after - before) > AI_CACHE_MAX_RELATIVE_CHANGE * max(abs(before), 10):
+            return True
+
+    for field in POINT_FEATURES:
+        if abs(current[field] - previous.get(field, 0)) > AI_CACHE_MAX_CHANGE_POINTS:
+            return True
+
+    return False
+
+
+def cache_cutoff() -> float:
+    """
+    Oldest created_at still served from the cache.
+    """
+    return time.time() - AI_CACHE_TTL_SECONDS
+
+
+def cached_analysis(project: Dict[str, Any], entry: Optional[Dict]) -> Optional[Dict[str, Any]]:
+    """
+    Reuse a cached verdict (from get_ai_cache_entries) when the
+    coin's inputs have not materially changed; None means call the LLM.
+    """
+    if (
+        not entry
+        or entry.get("model") != AI_MODEL
+        or (entry.get("created_at") or 0) < cache_cutoff()
+    ):
+        _count("misses")
+        return None
+
+    try:
+        previous = json.loads(entry["features"])
+    except (TypeError, ValueError):
+        _count("misses")
+        return None
+
+    if is_material_change(previous, ai_features(project)):
+        _count("misses")
+        return None
+
+    _count("hits")
+
+    return {
+        "score": entry["score"],
+        "verdict": entry["verdict"],
+        "confidence": entry["confidence"],
+        "source": "cache"
+    }
+
+
+def ai_cache_entry(project: Dict[str, Any], result: Dict[str, Any]) -> Optional[Dict]:
+    """
+    Row for the ai_cache table. Only real LLM answers are cached,
+    never fallback scores. Report it with record_ai_cache_stores()
+    once the row is committed.
+    """
+    if result.get("source") != "llm":
+        return None
+
+    return {
+        "symbol": project["symbol"].upper().strip(),
+        "model": AI_MODEL,
+        "features": json.dumps(ai_features(project), sort_keys=True),
+        "score": result["score"],
+        "verdict": result["verdict"],
+        "confidence": result["confidence"],
+        "created_at": time.time()
+    }
+
+
+def record_ai_cache_stores(n: int):
+    _count("stores", n)
+
+
+def ai_cache_stats():
+    with _cache_lock:
+        stats = dict(_cache_stats)
+
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+    stats["ttl_seconds"] = AI_CACHE_TTL_SECONDS
+
+    return stats
+
+
 # =====================================================
 # HEALTH
 # =====================================================
@@ -152,7 +297,8 @@ def ai_engine_health():
     return {
         "status": "ok" if OPENAI_API_KEY else "degraded",
         "openai_key_loaded": bool(OPENAI_API_KEY),
-        "engine": "CryptoScout AI"
+        "engine": "CryptoScout AI",
+        "cache": ai_cache_stats()
     }
 
 
@@ -161,6 +307,9 @@ def generate_summary(project: Dict) -> str:
     if not client:
         return "AI summary unavailable."
 
+    if not governor.acquire("openai", PRIORITY_HIGH):
+        return "AI summary unavailable."
+
     prompt = f"""
 Explain briefly why {project['name']} ({project['symbol']}) 
 is trending based on:
@@ -1,67 +1,64 @@
 
 from datetime import datetime, timedelta
-from database.db import get_connection
+from database.db import db_session
 import math
 
 
 def backtest_top_n(days_ago: int = 7, hold_days: int = 7, top_n: int = 10):
 
-    conn = get_connection()
-    cursor = conn.cursor()
+    with db_session() as conn:
+        cursor = conn.cursor()
 
-    # Entry snapshot
-    cursor.execute("""
-    SELECT * FROM project_history
-    WHERE snapshot_time <= datetime('now', ?)
-    ORDER BY snapshot_time DESC
-    """, (f"-{days_ago} days",))
-
-    historical = cursor.fetchall()
+        # Entry snapshot
+        cursor.execute("""
+        SELECT * FROM project_history
+        WHERE snapshot_time <= datetime('now', ?)
+        ORDER BY snapshot_time DESC
+        """, (f"-{days_ago} days",))
 
-    if not historical:
-        conn.close()
-        return {"error": "Not enough historical data"}
+        historical = cursor.fetchall()
 
-    sorted_hist = sorted(
-        historical,
-        key=lambda x: x["combined_score"],
-        reverse=True
-    )
+        if not historical:
+            return {"error": "Not enough historical data"}
 
-    selected = sorted_hist[:top_n]
+        sorted_hist = sorted(
+            historical,
+            key=lambda x: x["combined_score"],
+            reverse=True
+        )
 
-    returns = []
-    wins = 0
+        selected = sorted_hist[:top_n]
 
-    for coin in selected:
+        returns = []
+        wins = 0
 
-        entry_price = coin["current_price"]
-        entry_time = datetime.fromisoformat(coin["snapshot_time"])
-        exit_time = entry_time + timedelta(days=hold_days)
+        for coin in selected:
 
-        cursor.execute("""
-        SELECT current_price FROM project_history
-        WHERE symbol=? AND snapshot_time >= ?
-        ORDER BY snapshot_time ASC
-        LIMIT 1
-        """, (coin["symbol"], exit_time.isoformat()))
+            entry_price = coin["current_price"]
+            entry_time = datetime.fromisoformat(coin["snapshot_time"])
+            exit_time = entry_time + timedelta(days=hold_days)
 
-        exit_data = cursor.fetchone()
+            cursor.execute("""
+            SELECT current_price FROM project_history
+            WHERE symbol=? AND snapshot_time >= ?
+            ORDER BY snapshot_time ASC
+            LIMIT 1
+            """, (coin["symbol"], exit_time.isoformat()))
 
-        if not exit_data:
-            continue
+            exit_data = cursor.fetchone()
 
-        exit_price = exit_data["current_price"]
+            if not exit_data:
+                continue
 
-        if entry_price > 0:
+            exit_price = exit_data["current_price"]
 
-            return_pct = (exit_price - entry_price) / entry_price
-            returns.append(return_pct)
+            if entry_price > 0:
 
-            if return_pct > 0:
-                wins += 1
+                return_pct = (exit_price - entry_price) / entry_price
+                returns.append(return_pct)
 
-    conn.close()
+                if return_pct > 0:
+                    wins += 1
 
     if not returns:
         return {"error": "No valid exit data"}
@@ -1,43 +1,106 @@
 
 # backend/services/market_service.py
 
+import asyncio
+import json
+import math
+import os
+import weakref
 import requests
+import httpx
 import logging
+import threading
 import time
-from typing import List, Dict, Any, Optional
+from datetime import datetime
+from typing import List, Dict, Any, Optional, AsyncIterator
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-from core.circuit_breaker import CircuitBreaker
+from core.circuit_breaker import get_breaker
 from core.api_usage import APIUsageTracker
+from core.singleflight import SingleFlight
+from core.rate_governor import (
+    governor,
+    PRIORITY_HIGH,
+    PRIORITY_NORMAL,
+    PRIORITY_LOW
+)
+from core.config import (
+    COINGECKO_PAGE_CONCURRENCY,
+    COINGECKO_MIN_REQUEST_INTERVAL,
+    COINGECKO_MAX_PROJECTS,
+    MARKET_RESPONSE_CACHE_SECONDS,
+    MARKET_SNAPSHOT_PATH,
+    MARKET_SNAPSHOT_MAX_AGE_SECONDS,
+    MARKET_REFRESH_RETRY_SECONDS,
+    MARKET_REFRESH_MAX_ATTEMPTS,
+    COIN_INDEX_REFRESH_SECONDS,
+    COIN_INDEX_MIN_REFRESH_SECONDS
+)
+from database.repository import (
+    replace_coin_index,
+    get_coin_ids_by_symbol,
+    get_coin_index_updated_at
+)
 
 
 logger = logging.getLogger(__name__)
 
 COINGECKO_URL = "https://api.coingecko.com/api/v3/coins/markets"
 COINGECKO_SINGLE_URL = "https://api.coingecko.com/api/v3/coins/{id}"
+COINGECKO_LIST_URL = "https://api.coingecko.com/api/v3/coins/list"
 REQUEST_TIMEOUT = 15
 MAX_RETRIES = 3
 RETRY_DELAY = 2
+MAX_PER_PAGE = 250
+# Smallest page size worth aligning to a band offset; below this the
+# extra requests cost more than re-downloading the rows above the band.
+MIN_ALIGNED_PER_PAGE = MAX_PER_PAGE // 4
+RETRY_STATUSES = {429, 500, 502, 503, 504}
 
-# Create a session with retry strategy
+# Create a session with retry strategy. 429 is deliberately not
+# retried here: it is surfaced so the rate governor can back off.
 session = requests.Session()
 retry_strategy = Retry(
     total=MAX_RETRIES,
     backoff_factor=RETRY_DELAY,
-    status_forcelist=[429, 500, 502, 503, 504],
+    status_forcelist=[500, 502, 503, 504],
     allowed_methods=["GET"]
 )
 adapter = HTTPAdapter(max_retries=retry_strategy)
 session.mount("https://", adapter)
 session.mount("http://", adapter)
 
-breaker = CircuitBreaker(
-    failure_threshold=5,
-    recovery_timeout=120
-)
+PROVIDER = "coingecko"
+
+# One breaker per endpoint: a failing lookup endpoint must not block
+# bulk market scans (and vice versa)
+breaker = get_breaker(PROVIDER, "markets", failure_threshold=5, recovery_timeout=120)
+ids_breaker = get_breaker(PROVIDER, "markets_ids", failure_threshold=5, recovery_timeout=120)
+coin_breaker = get_breaker(PROVIDER, "coin", failure_threshold=5, recovery_timeout=120)
+list_breaker = get_breaker(PROVIDER, "coins_list", failure_threshold=3, recovery_timeout=600)
 
 api_tracker = APIUsageTracker(window_seconds=3600)
 
+# Concurrent identical calls (same function + arguments) share one
+# upstream request; successful results are reused briefly
+market_flight = SingleFlight("coingecko", ttl=MARKET_RESPONSE_CACHE_SECONDS)
+
+
+def _retry_after(response) -> Optional[float]:
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _rate_limited(response):
+    """
+    429: pause the CoinGecko budget. Not a breaker failure — the
+    governor slows callers down instead of failing them.
+    """
+    api_tracker.record_rate_limit()
+    governor.penalize(PROVIDER, _retry_after(response))
+
 
 def validate_coin_data(coin: Dict[str, Any]) -> bool:
     """
@@ -79,6 +142,306 @@ def extract_price_change_7d(coin: Dict[str, Any]) -> float:
     return 0.0
 
 
+def normalize_coin(coin: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Convert one /coins/markets entry into our project dict.
+    Returns None for invalid or malformed entries.
+    """
+    if not validate_coin_data(coin):
+        logger.debug(f"Skipping invalid coin data: {coin.get('symbol', 'unknown')}")
+        return None
+
+    try:
+        # Extract 7-day price change safely
+        price_change_7d = extract_price_change_7d(coin)
+        
+        # Create project entry with safe defaults
+        project = {
+            "coin_id": str(coin.get("id", "") or ""),
+            "name": str(coin.get("name", "")).strip(),
+            "symbol": str(coin.get("symbol", "")).upper().strip(),
+            "current_price": float(coin.get("current_price", 0) or 0),
+            "market_cap": float(coin.get("market_cap", 0) or 0),
+            "volume_24h": float(coin.get("total_volume", 0) or 0),
+            "price_change_24h": float(coin.get("price_change_percentage_24h", 0) or 0),
+            "price_change_7d": float(price_change_7d),
+            "market_cap_rank": int(coin.get("market_cap_rank", 0) or 0),
+            "image": coin.get("image", ""),  # Optional but useful
+            "last_updated": coin.get("last_updated", "")
+        }
+
+    except (ValueError, TypeError) as e:
+        logger.debug(f"Data conversion error for {coin.get('symbol', 'unknown')}: {e}")
+        return None
+
+    # Only include projects with valid symbol
+    if not project["symbol"] or project["symbol"] == "NULL":
+        return None
+
+    return project
+
+
+def parse_markets_response(data: List[Dict[str, Any]]):
+    """
+    Normalize a /coins/markets payload.
+    Returns (projects, validation_errors).
+    """
+    projects = []
+    validation_errors = 0
+
+    for coin in data:
+        project = normalize_coin(coin)
+
+        if project is None:
+            validation_errors += 1
+            continue
+
+        projects.append(project)
+
+    return projects, validation_errors
+
+
+# =====================================================
+# LAST-KNOWN-GOOD SNAPSHOT
+# =====================================================
+
+# Successful market rows in market-cap order, each stamped with the
+# wall-clock time it was fetched. Mirrored to MARKET_SNAPSHOT_PATH so
+# it survives restarts.
+_lkg_lock = threading.Lock()
+_lkg_projects = None
+_lkg_dirty = False
+_lkg_served = 0
+_lkg_refresh_thread = None
+
+# Called with the last refreshed rank after a background refresh
+# succeeds (see set_market_refresh_listener)
+_refresh_listener = None
+
+
+def _load_market_snapshot():
+    global _lkg_projects
+
+    if _lkg_projects is not None:
+        return
+
+    _lkg_projects = []
+
+    try:
+        with open(MARKET_SNAPSHOT_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        if isinstance(data, list):
+            _lkg_projects = data
+            logger.info(f"Loaded market snapshot ({len(data)} projects)")
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable market snapshot: {e}")
+
+
+def remember_market_rows(start: int, projects: List[Dict[str, Any]]):
+    """
+    Record fresh rows at market-cap positions start.. in the snapshot.
+    """
+    global _lkg_dirty
+
+    if not projects:
+        return
+
+    fetched_at = time.time()
+    rows = [dict(p, snapshot_at=fetched_at) for p in projects]
+
+    with _lkg_lock:
+        _load_market_snapshot()
+
+        if start >= len(_lkg_projects):
+            _lkg_projects.extend(rows)
+        else:
+            _lkg_projects[start:start + len(rows)] = rows
+
+        del _lkg_projects[COINGECKO_MAX_PROJECTS:]
+        _lkg_dirty = True
+
+
+def persist_market_snapshot():
+    """
+    Write the snapshot to disk if it changed (atomic replace).
+    """
+    global _lkg_dirty
+
+    with _lkg_lock:
+        if not _lkg_dirty:
+            return
+
+        rows = list(_lkg_projects)
+        _lkg_dirty = False
+
+    tmp_path = f"{MARKET_SNAPSHOT_PATH}.tmp"
+
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(rows, f)
+        os.replace(tmp_path, MARKET_SNAPSHOT_PATH)
+    except OSError as e:
+        logger.error(f"Failed to persist market snapshot: {e}")
+
+
+def _stale_copy(row, now):
+    project = dict(row)
+    project["stale"] = True
+    project["data_age_seconds"] = round(now - row.get("snapshot_at", 0), 1)
+    return project
+
+
+def get_stale_rows(start: int, count: int) -> List[Dict[str, Any]]:
+    """
+    Last-known-good rows for market-cap positions start..start+count,
+    marked stale. Rows older than MARKET_SNAPSHOT_MAX_AGE_SECONDS are
+    not served.
+    """
+    global _lkg_served
+
+    now = time.time()
+
+    with _lkg_lock:
+        _load_market_snapshot()
+
+        rows = [
+            _stale_copy(row, now)
+            for row in _lkg_projects[start:start + count]
+            if now - row.get("snapshot_at", 0) <= MARKET_SNAPSHOT_MAX_AGE_SECONDS
+        ]
+
+        _lkg_served += len(rows)
+
+    return rows
+
+
+def get_stale_project(symbol: str = None, coin_id: str = None) -> Optional[Dict[str, Any]]:
+    """
+    Last-known-good row for one coin (by symbol or CoinGecko id).
+    """
+    global _lkg_served
+
+    now = time.time()
+
+    with _lkg_lock:
+        _load_market_snapshot()
+
+        for row in _lkg_projects:
+            if now - row.get("snapshot_at", 0) > MARKET_SNAPSHOT_MAX_AGE_SECONDS:
+                continue
+
+            if (symbol and row.get("symbol") == symbol) or (coin_id and row.get("coin_id") == coin_id):
+                _lkg_served += 1
+                return _stale_copy(row, now)
+
+    return None
+
+
+def _refresh_until_fresh(limit: int):
+    delay = MARKET_REFRESH_RETRY_SECONDS
+
+    for attempt in range(1, MARKET_REFRESH_MAX_ATTEMPTS + 1):
+        time.sleep(delay)
+
+        # Success = every page answered. Row counts can't tell: symbols
+        # are de-duplicated across pages
+        report = {}
+
+        async def refresh():
+            try:
+                return await fetch_top_projects_async(limit, allow_stale=False, report=report)
+            finally:
+                await close_async_client()
+
+        try:
+            projects = asyncio.run(refresh())
+        except Exception as e:
+            logger.error(f"Background market refresh failed: {e}")
+            projects = []
+
+        if projects and not report.get("failed_pages"):
+            logger.info(f"Background market refresh succeeded (attempt {attempt})")
+            _notify_market_refreshed(limit)
+            return
+
+        logger.warning(
+            f"Background market refresh attempt {attempt}: "
+            f"pages {report.get('failed_pages') or 'all'} failed"
+        )
+
+        delay = min(delay * 2, 600)
+
+    logger.warning("Background market refresh gave up — next scan will retry")
+
+
+def set_market_refresh_listener(listener):
+    """
+    Register `listener(last_rank)`, called from the refresh thread
+    once fresh data for ranks 1..last_rank is back, so the bands that
+    were served stale are rescanned instead of waiting for their next
+    scheduled scan. One listener (the scheduler); None removes it.
+    """
+    global _refresh_listener
+    _refresh_listener = listener
+
+
+def _notify_market_refreshed(last_rank: int):
+    listener = _refresh_listener
+
+    if listener is None:
+        return
+
+    try:
+        listener(last_rank)
+    except Exception as e:
+        logger.error(f"Market refresh listener failed: {e}")
+
+
+def schedule_market_refresh(limit: int):
+    """
+    Start a background thread that retries the market fetch (with
+    backoff) until it succeeds. No-op if one is already running.
+    """
+    global _lkg_refresh_thread
+
+    with _lkg_lock:
+        if _lkg_refresh_thread is not None and _lkg_refresh_thread.is_alive():
+            return
+
+        _lkg_refresh_thread = threading.Thread(
+            target=_refresh_until_fresh,
+            args=(limit,),
+            name="market-refresh",
+            daemon=True
+        )
+        _lkg_refresh_thread.start()
+
+
+def market_snapshot_info() -> Dict[str, Any]:
+    """
+    Age metadata for /monitor.
+    """
+    now = time.time()
+
+    with _lkg_lock:
+        _load_market_snapshot()
+
+        stamps = [row.get("snapshot_at", 0) for row in _lkg_projects]
+        refreshing = _lkg_refresh_thread is not None and _lkg_refresh_thread.is_alive()
+
+        return {
+            "project_count": len(stamps),
+            "newest_age_seconds": round(now - max(stamps), 1) if stamps else None,
+            "oldest_age_seconds": round(now - min(stamps), 1) if stamps else None,
+            "max_age_seconds": MARKET_SNAPSHOT_MAX_AGE_SECONDS,
+            "stale_rows_served": _lkg_served,
+            "background_refresh_running": refreshing
+        }
+
+
 def fetch_top_projects(limit: int = 50) -> List[Dict[str, Any]]:
     """
     Fetch top crypto projects from CoinGecko.
@@ -94,15 +457,37 @@ def fetch_top_projects(limit: int = 50) -> List[Dict[str, Any]]:
     if limit <= 0 or limit > 250:
         logger.warning(f"Invalid limit {limit}, adjusting to 50")
         limit = 50
-    
-    # Track API usage
-    api_tracker.record_call()
+
+    projects = market_flight.do(("top", limit), _fetch_top_projects, limit)
+
+    if projects:
+        remember_market_rows(0, projects)
+        persist_market_snapshot()
+        return projects
+
+    # Stale-while-revalidate: last-known-good rows + background retry
+    projects = get_stale_rows(0, limit)
+
+    if projects:
+        logger.warning(f"Serving {len(projects)} projects from last-known-good snapshot")
+        schedule_market_refresh(limit)
+
+    return projects
+
+
+def _fetch_top_projects(limit: int) -> List[Dict[str, Any]]:
+    # Rate budget first: a deferred call must not hold a probe slot
+    if not governor.acquire(PROVIDER, PRIORITY_NORMAL):
+        return []
 
     # Check circuit breaker
     if not breaker.can_execute():
         logger.warning("Circuit breaker OPEN — skipping market request")
         return []
 
+    # Track API usage
+    api_tracker.record_call()
+
     params = {
         "vs_currency": "usd",
         "order": "market_cap_desc",
@@ -123,10 +508,9 @@ def fetch_top_projects(limit: int = 50) -> List[Dict[str, Any]]:
 
         # Handle rate limiting
         if response.status_code == 429:
-            api_tracker.record_rate_limit()
-            breaker.record_failure()
-            retry_after = response.headers.get('Retry-After', '60')
-            logger.warning(f"Rate limited by CoinGecko (429). Retry after {retry_after} seconds")
+            _rate_limited(response)
+            breaker.release_probe()
+            logger.warning("Rate limited by CoinGecko (429)")
             return []
 
         # Handle other HTTP errors
@@ -146,44 +530,7 @@ def fetch_top_projects(limit: int = 50) -> List[Dict[str, Any]]:
             breaker.record_failure()
             return []
 
-        projects = []
-        validation_errors = 0
-
-        for coin in data:
-            # Validate coin data
-            if not validate_coin_data(coin):
-                validation_errors += 1
-                logger.debug(f"Skipping invalid coin data: {coin.get('symbol', 'unknown')}")
-                continue
-
-            try:
-                # Extract 7-day price change safely
-                price_change_7d = extract_price_change_7d(coin)
-                
-                # Create project entry with safe defaults
-                project = {
-                    "name": str(coin.get("name", "")).strip(),
-                    "symbol": str(coin.get("symbol", "")).upper().strip(),
-                    "current_price": float(coin.get("current_price", 0) or 0),
-                    "market_cap": float(coin.get("market_cap", 0) or 0),
-                    "volume_24h": float(coin.get("total_volume", 0) or 0),
-                    "price_change_24h": float(coin.get("price_change_percentage_24h", 0) or 0),
-                    "price_change_7d": float(price_change_7d),
-                    "market_cap_rank": int(coin.get("market_cap_rank", 0) or 0),
-                    "image": coin.get("image", ""),  # Optional but useful
-                    "last_updated": coin.get("last_updated", "")
-                }
-                
-                # Only include projects with valid symbol
-                if project["symbol"] and project["symbol"] != "NULL":
-                    projects.append(project)
-                else:
-                    validation_errors += 1
-                    
-            except (ValueError, TypeError) as e:
-                validation_errors += 1
-                logger.debug(f"Data conversion error for {coin.get('symbol', 'unknown')}: {e}")
-                continue
+        projects, validation_errors = parse_markets_response(data)
 
         # Log summary
         if validation_errors > 0:
@@ -220,11 +567,547 @@ def fetch_top_projects(limit: int = 50) -> List[Dict[str, Any]]:
         return []
 
 
+# =====================================================
+# ASYNC MULTI-PAGE INGESTION
+# =====================================================
+
+class _AsyncIngestion:
+    """
+    Per-event-loop HTTP state: one pooled keep-alive client plus the
+    rate budget (bounded concurrency + minimum spacing between
+    request starts).
+    """
+
+    def __init__(self):
+        self.client = httpx.AsyncClient(
+            timeout=REQUEST_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=COINGECKO_PAGE_CONCURRENCY,
+                max_keepalive_connections=COINGECKO_PAGE_CONCURRENCY
+            ),
+            headers={"Accept": "application/json"}
+        )
+        self.slots = asyncio.Semaphore(COINGECKO_PAGE_CONCURRENCY)
+        self.pace_lock = asyncio.Lock()
+        self.next_start = 0.0
+
+    async def pace(self):
+        async with self.pace_lock:
+            now = time.monotonic()
+            wait = self.next_start - now
+
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            self.next_start = max(now, self.next_start) + COINGECKO_MIN_REQUEST_INTERVAL
+
+
+# One per event loop (app loop, scheduler loop, background refresh)
+_ingestions = weakref.WeakKeyDictionary()
+
+
+def _get_ingestion() -> _AsyncIngestion:
+    loop = asyncio.get_running_loop()
+    ingestion = _ingestions.get(loop)
+
+    if ingestion is None:
+        ingestion = _AsyncIngestion()
+        _ingestions[loop] = ingestion
+
+    return ingestion
+
+
+async def close_async_client():
+    """
+    Close this event loop's pooled async client (call on app shutdown).
+    """
+    ingestion = _ingestions.pop(asyncio.get_running_loop(), None)
+
+    if ingestion is not None:
+        await ingestion.client.aclose()
+
+
+async def _get_json_async(
+    url: str,
+    params: Dict[str, Any],
+    priority: str = PRIORITY_NORMAL,
+    circuit=None
+):
+    """
+    Rate-budgeted GET with retry/backoff on 429 and 5xx.
+    Identical concurrent requests are coalesced.
+    Returns parsed JSON or None on failure.
+    """
+    key = (url, tuple(sorted(params.items())))
+    return await market_flight.do_async(
+        key, _request_json_async, url, params, priority, circuit or breaker
+    )
+
+
+async def _request_json_async(url: str, params: Dict[str, Any], priority: str, circuit):
+    ingestion = _get_ingestion()
+
+    for attempt in range(MAX_RETRIES + 1):
+
+        # Rate budget first: a deferred call must not hold a probe slot
+        if not await governor.acquire_async(PROVIDER, priority):
+            return None
+
+        if not circuit.can_execute():
+            logger.warning("Circuit breaker OPEN — skipping market request")
+            return None
+
+        async with ingestion.slots:
+            await ingestion.pace()
+            api_tracker.record_call()
+
+            try:
+                response = await ingestion.client.get(url, params=params)
+            except httpx.TimeoutException:
+                api_tracker.record_failure()
+                circuit.record_failure()
+                logger.error(f"Request timeout after {REQUEST_TIMEOUT} seconds")
+                response = None
+            except httpx.HTTPError as e:
+                api_tracker.record_failure()
+                circuit.record_failure()
+                logger.error(f"Connection error: {e}")
+                response = None
+
+        if response is not None:
+            if response.status_code == 429:
+                _rate_limited(response)
+                circuit.release_probe()
+                logger.warning("Rate limited by CoinGecko (429)")
+                continue
+
+            elif response.status_code not in RETRY_STATUSES:
+                try:
+                    response.raise_for_status()
+                    data = response.json()
+                except (httpx.HTTPStatusError, ValueError) as e:
+                    api_tracker.record_failure()
+                    circuit.record_failure()
+                    logger.error(f"Market request failed: {e}")
+                    return None
+
+                circuit.record_success()
+                return data
+
+            else:
+                api_tracker.record_failure()
+                circuit.record_failure()
+                logger.warning(f"CoinGecko returned {response.status_code}")
+
+        if attempt < MAX_RETRIES:
+            await asyncio.sleep(RETRY_DELAY * (2 ** attempt))
+
+    return None
+
+
+async def fetch_markets_page_async(page: int, per_page: int = MAX_PER_PAGE) -> List[Dict[str, Any]]:
+    """
+    Fetch and normalize one /coins/markets page (market-cap order).
+    """
+    params = {
+        "vs_currency": "usd",
+        "order": "market_cap_desc",
+        "per_page": per_page,
+        "page": page,
+        "sparkline": "false",
+        "price_change_percentage": "7d",
+        "locale": "en"
+    }
+
+    data = await _get_json_async(COINGECKO_URL, params)
+
+    if not isinstance(data, list):
+        if data is not None:
+            logger.error(f"Unexpected response type: {type(data)}")
+        return []
+
+    projects, validation_errors = parse_markets_response(data)
+
+    if validation_errors > 0:
+        logger.info(f"Page {page}: skipped {validation_errors} invalid/malformed entries")
+
+    return projects
+
+
+def _band_page_size(offset: int, limit: int) -> int:
+    """
+    Page size for a rank band starting after `offset`.
+
+    From the top this is one right-sized page. Deeper bands use the
+    largest page size that puts a page boundary exactly on the offset,
+    so the first request does not re-download ranks another tier owns
+    (mid band 101-500 -> 100 per page, tail 501-1500 -> 250).
+    """
+    if offset == 0:
+        return min(limit, MAX_PER_PAGE)
+    for per_page in range(MAX_PER_PAGE, MIN_ALIGNED_PER_PAGE - 1, -1):
+        if offset % per_page == 0:
+            return per_page
+    return MAX_PER_PAGE
+
+
+async def stream_top_projects(
+    limit: int = 50,
+    allow_stale: bool = True,
+    offset: int = 0,
+    report: Optional[Dict[str, Any]] = None
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Fetch the top `limit` projects across as many pages as needed.
+    `offset` skips the first positions, so a rank band such as
+    101-500 is offset=100, limit=400.
+
+    All pages are requested concurrently (within the rate budget) and
+    yielded in market-cap order as soon as each is ready, so the
+    scanner can start on page 1 while later pages download. Symbols
+    are de-duplicated across pages (highest market cap wins).
+
+    A page that fails is served from the last-known-good snapshot
+    (rows marked stale) while a background refresh retries, unless
+    allow_stale is False.
+
+    If `report` is given it is filled with the page numbers that
+    failed ("failed_pages"), were served stale ("stale_pages") and
+    had no data at all ("missing_pages").
+    """
+    offset = max(0, min(offset, COINGECKO_MAX_PROJECTS - 1))
+    limit = max(1, min(limit, COINGECKO_MAX_PROJECTS - offset))
+    end = offset + limit
+
+    per_page = _band_page_size(offset, limit)
+    first_page = offset // per_page + 1
+    last_page = math.ceil(end / per_page)
+
+    tasks = [
+        asyncio.create_task(fetch_markets_page_async(page, per_page))
+        for page in range(first_page, last_page + 1)
+    ]
+
+    seen = set()
+    remaining = limit
+
+    report = {} if report is None else report
+    report.update(pages=len(tasks), failed_pages=[], stale_pages=[], missing_pages=[])
+
+    try:
+        for page, task in enumerate(tasks, start=first_page):
+            projects = await task
+            start = (page - 1) * per_page
+
+            if projects:
+                remember_market_rows(start, projects)
+            else:
+                logger.warning(f"Market page {page} returned no data")
+                report["failed_pages"].append(page)
+
+                if allow_stale:
+                    projects = get_stale_rows(start, per_page)
+
+                    if projects:
+                        report["stale_pages"].append(page)
+                        logger.warning(f"Serving {len(projects)} last-known-good rows for page {page}")
+
+                if not projects:
+                    report["missing_pages"].append(page)
+                    continue
+
+            # Keep only positions inside the band
+            projects = projects[max(offset - start, 0):end - start]
+
+            batch = []
+
+            for project in projects:
+                if project["symbol"] in seen:
+                    continue
+
+                seen.add(project["symbol"])
+                batch.append(project)
+
+                if len(batch) >= remaining:
+                    break
+
+            remaining -= len(batch)
+
+            if batch:
+                yield batch
+
+            if remaining <= 0:
+                break
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+        if allow_stale and report["failed_pages"]:
+            schedule_market_refresh(end)
+
+        await asyncio.to_thread(persist_market_snapshot)
+
+    logger.info(
+        f"Fetched {limit - remaining} projects from CoinGecko "
+        f"(ranks {offset + 1}-{end}, {len(tasks)} pages)"
+    )
+
+
+async def fetch_top_projects_async(
+    limit: int = 50,
+    allow_stale: bool = True,
+    report: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Async multi-page version of fetch_top_projects (no 250 cap).
+    """
+    projects = []
+
+    async for batch in stream_top_projects(limit, allow_stale, report=report):
+        projects.extend(batch)
+
+    return projects
+
+
+# =====================================================
+# SYMBOL -> ID INDEX
+# =====================================================
+
+# Minimum spacing between /coins/list attempts (failed pulls included)
+COIN_INDEX_RETRY_SECONDS = 60
+
+_index_lock = threading.Lock()
+_index_last_attempt = 0.0
+
+
+def _get_json(
+    url: str,
+    params: Dict[str, Any],
+    what: str,
+    priority: str = PRIORITY_NORMAL,
+    circuit=None
+):
+    """
+    One breaker-guarded, rate-budgeted GET on the shared session.
+    Returns parsed JSON or None on failure.
+    """
+    circuit = circuit or breaker
+
+    # Rate budget first: a deferred call must not hold a probe slot
+    if not governor.acquire(PROVIDER, priority):
+        return None
+
+    if not circuit.can_execute():
+        logger.warning(f"Circuit breaker OPEN — skipping {what} request")
+        return None
+
+    api_tracker.record_call()
+
+    try:
+        response = session.get(url, params=params, timeout=REQUEST_TIMEOUT)
+
+        if response.status_code == 429:
+            _rate_limited(response)
+            circuit.release_probe()
+            logger.warning(f"Rate limited by CoinGecko (429) on {what}")
+            return None
+
+        response.raise_for_status()
+        data = response.json()
+
+    except (requests.exceptions.RequestException, ValueError) as e:
+        api_tracker.record_failure()
+        circuit.record_failure()
+        logger.error(f"{what} request failed: {e}")
+        return None
+
+    circuit.record_success()
+    return data
+
+
+def _coin_index_age() -> Optional[float]:
+    updated_at = get_coin_index_updated_at()
+
+    if updated_at is None:
+        return None
+
+    return (datetime.utcnow() - updated_at).total_seconds()
+
+
+def refresh_coin_index(max_age: int = COIN_INDEX_REFRESH_SECONDS) -> bool:
+    """
+    Re-pull /coins/list into the symbol index if it is older than
+    max_age seconds (or empty). Returns True if the index was replaced.
+    """
+    global _index_last_attempt
+
+    with _index_lock:
+        age = _coin_index_age()
+
+        if age is not None and age < max_age:
+            return False
+
+        now = time.monotonic()
+
+        if _index_last_attempt and now - _index_last_attempt < COIN_INDEX_RETRY_SECONDS:
+            return False
+
+        _index_last_attempt = now
+
+        data = _get_json(COINGECKO_LIST_URL, {}, "coins list", PRIORITY_LOW, list_breaker)
+
+        if not isinstance(data, list):
+            return False
+
+        coins = [
+            {
+                "coin_id": c.get("id"),
+                "symbol": str(c.get("symbol") or ""),
+                "name": c.get("name", "")
+            }
+            for c in data
+            if isinstance(c, dict)
+        ]
+
+        if not coins or not replace_coin_index(coins):
+            return False
+
+        logger.info(f"Coin index refreshed ({len(coins)} coins)")
+        return True
+
+
+def resolve_coin_ids(symbol: str) -> List[str]:
+    """
+    CoinGecko ids for a symbol. An unknown symbol triggers an early
+    index refresh (at most once per COIN_INDEX_MIN_REFRESH_SECONDS).
+    """
+    ids = get_coin_ids_by_symbol(symbol)
+
+    if not ids and refresh_coin_index(max_age=COIN_INDEX_MIN_REFRESH_SECONDS):
+        ids = get_coin_ids_by_symbol(symbol)
+
+    return ids
+
+
+def _markets_ids_params(ids: List[str]) -> Dict[str, Any]:
+    return {
+        "vs_currency": "usd",
+        "ids": ",".join(ids),
+        "order": "market_cap_desc",
+        "per_page": len(ids),
+        "page": 1,
+        "sparkline": "false",
+        "price_change_percentage": "7d",
+        "locale": "en"
+    }
+
+
+def _fetch_markets_for_ids(ids: List[str]) -> List[Dict[str, Any]]:
+    """
+    One /coins/markets request restricted to the given ids (max 250).
+    """
+    ids = ids[:MAX_PER_PAGE]
+
+    # Only used for on-demand single lookups
+    data = _get_json(
+        COINGECKO_URL,
+        _markets_ids_params(ids),
+        "markets by id",
+        PRIORITY_HIGH,
+        ids_breaker
+    )
+
+    if not isinstance(data, list):
+        return []
+
+    projects, _ = parse_markets_response(data)
+    return projects
+
+
+async def _fetch_ids_chunk_async(ids: List[str]) -> List[Dict[str, Any]]:
+    data = await _get_json_async(
+        COINGECKO_URL,
+        _markets_ids_params(ids),
+        circuit=ids_breaker
+    )
+
+    if not isinstance(data, list):
+        if data is not None:
+            logger.error(f"Unexpected response type: {type(data)}")
+        return []
+
+    projects, validation_errors = parse_markets_response(data)
+
+    if validation_errors > 0:
+        logger.info(f"Skipped {validation_errors} invalid/malformed entries")
+
+    return projects
+
+
+async def fetch_projects_by_ids(ids: List[str]) -> List[Dict[str, Any]]:
+    """
+    Refresh an arbitrary set of coins (watchlist, alerting symbols)
+    without pulling whole market-cap pages.
+
+    Ids are de-duplicated and split into maximal /coins/markets?ids=
+    requests (250 each) that run concurrently within the async rate
+    budget. Returns the same normalized dicts as fetch_top_projects;
+    a failed chunk is logged and skipped.
+    """
+    ids = list(dict.fromkeys(i for i in ids if i))
+
+    if not ids:
+        return []
+
+    chunks = [ids[i:i + MAX_PER_PAGE] for i in range(0, len(ids), MAX_PER_PAGE)]
+
+    results = await asyncio.gather(*(_fetch_ids_chunk_async(c) for c in chunks))
+
+    projects = [p for chunk in results for p in chunk]
+
+    logger.info(
+        f"Fetched {len(projects)}/{len(ids)} projects by id ({len(chunks)} requests)"
+    )
+    return projects
+
+
+async def fetch_projects_by_symbols(symbols: List[str]) -> List[Dict[str, Any]]:
+    """
+    Batched fetch_project_by_symbol: every symbol is resolved through
+    the coin index and all candidate ids go out in as few id requests
+    as possible. Per symbol the highest market cap wins. Returned in
+    market-cap order; unknown symbols are left out.
+    """
+    symbols = list(dict.fromkeys(s.upper().strip() for s in symbols if s))
+
+    ids = await asyncio.to_thread(
+        lambda: [coin_id for symbol in symbols for coin_id in resolve_coin_ids(symbol)]
+    )
+
+    best = {}
+
+    for project in await fetch_projects_by_ids(ids):
+        symbol = project.get("symbol")
+
+        if symbol in symbols and project["market_cap"] > best.get(symbol, {}).get("market_cap", -1):
+            best[symbol] = project
+
+    missing = [s for s in symbols if s not in best]
+
+    if missing:
+        logger.warning(f"Projects not found by symbol: {missing}")
+
+    return sorted(best.values(), key=lambda p: p["market_cap"], reverse=True)
+
+
 def fetch_project_by_symbol(symbol: str) -> Optional[Dict[str, Any]]:
     """
     Fetch a single project by symbol.
-    Note: CoinGecko doesn't support direct symbol lookup, so we need to search.
-    This is a helper function for single project scans.
+
+    The symbol is resolved through the local coin index, then only the
+    matching ids are requested. Symbols are not unique on CoinGecko,
+    so the highest market cap wins.
     
     Args:
         symbol: Project symbol (e.g., 'BTC')
@@ -237,18 +1120,31 @@ def fetch_project_by_symbol(symbol: str) -> Optional[Dict[str, Any]]:
     
     # Normalize symbol
     symbol = symbol.upper().strip()
-    
-    # Fetch top projects and find the one with matching symbol
-    # This is more efficient than calling the API for each symbol
-    projects = fetch_top_projects(limit=250)  # Get more to increase chance of finding
-    
-    for project in projects:
-        if project.get("symbol") == symbol:
-            logger.info(f"Found project {symbol}: {project.get('name')}")
-            return project
-    
-    logger.warning(f"Project with symbol {symbol} not found")
-    return None
+
+    project = market_flight.do(("symbol", symbol), _fetch_project_by_symbol, symbol)
+
+    return project or get_stale_project(symbol=symbol)
+
+
+def _fetch_project_by_symbol(symbol: str) -> Optional[Dict[str, Any]]:
+    ids = resolve_coin_ids(symbol)
+
+    if not ids:
+        logger.warning(f"Project with symbol {symbol} not in coin index")
+        return None
+
+    projects = [
+        p for p in _fetch_markets_for_ids(ids)
+        if p.get("symbol") == symbol
+    ]
+
+    if not projects:
+        logger.warning(f"Project with symbol {symbol} not found")
+        return None
+
+    project = max(projects, key=lambda p: p["market_cap"])
+    logger.info(f"Found project {symbol}: {project.get('name')}")
+    return project
 
 
 def fetch_project_by_id(coin_id: str) -> Optional[Dict[str, Any]]:
@@ -263,8 +1159,18 @@ def fetch_project_by_id(coin_id: str) -> Optional[Dict[str, Any]]:
     """
     if not coin_id:
         return None
-    
-    if not breaker.can_execute():
+
+    project = market_flight.do(("id", coin_id), _fetch_project_by_id, coin_id)
+
+    return project or get_stale_project(coin_id=coin_id)
+
+
+def _fetch_project_by_id(coin_id: str) -> Optional[Dict[str, Any]]:
+    # Rate budget first: a deferred call must not hold a probe slot
+    if not governor.acquire(PROVIDER, PRIORITY_HIGH):
+        return None
+
+    if not coin_breaker.can_execute():
         logger.warning("Circuit breaker OPEN — skipping single project request")
         return None
     
@@ -287,7 +1193,8 @@ def fetch_project_by_id(coin_id: str) -> Optional[Dict[str, Any]]:
         )
         
         if response.status_code == 429:
-            breaker.record_failure()
+            _rate_limited(response)
+            coin_breaker.release_probe()
             logger.warning("Rate limited by CoinGecko (429)")
             return None
             
@@ -296,6 +1203,7 @@ def fetch_project_by_id(coin_id: str) -> Optional[Dict[str, Any]]:
         
         # Transform to match the format from fetch_top_projects
         project = {
+            "coin_id": data.get("id", coin_id),
             "name": data.get("name", ""),
             "symbol": data.get("symbol", "").upper(),
             "current_price": data.get("market_data", {}).get("current_price", {}).get("usd", 0),
@@ -308,11 +1216,11 @@ def fetch_project_by_id(coin_id: str) -> Optional[Dict[str, Any]]:
             "last_updated": data.get("last_updated", "")
         }
         
-        breaker.record_success()
+        coin_breaker.record_success()
         return project
         
     except Exception as e:
-        breaker.record_failure()
+        coin_breaker.record_failure()
         logger.error(f"Failed to fetch project by id {coin_id}: {e}")
         return None
 
@@ -325,7 +1233,7 @@ def get_api_usage_stats() -> Dict[str, Any]:
         "calls_last_hour": api_tracker.get_call_count(),
         "rate_limited": api_tracker.get_rate_limit_count(),
         "failures": api_tracker.get_failure_count(),
-        "circuit_breaker_state": "OPEN" if breaker.is_open() else "CLOSED"
+        "circuit_breaker_state": breaker.snapshot()["state"]
     }
 
 
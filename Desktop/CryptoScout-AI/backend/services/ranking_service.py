@@ -1,22 +1,33 @@
 
 # backend/services/ranking_service.py
 
+import time
 import logging
+import threading
 from datetime import datetime
 from typing import List, Dict, Optional
 
-from core.config import RANKING_CACHE_DURATION
-from database.repository import get_all_projects
-from core.redis_client import cache_get, cache_set
+import numpy as np
+
+from core.config import (
+    RANKING_CACHE_TTL_SECONDS,
+    RANKING_CACHE_MAX_ENTRIES,
+    RANKING_SNAPSHOT_TTL_SECONDS
+)
+from database.repository import get_all_projects, get_app_state, set_app_state
+from core.redis_client import redis_client
+from core.cache import TieredCache
+from services.sentiment_service import compute_sentiment
+from recommendation_engine import PROFILES
 
 
 logger = logging.getLogger(__name__)
 
-"""_cache = {
-    "data": None,
-    "timestamp": None
-}
-"""
+_rankings_cache = TieredCache(
+    "rankings",
+    max_entries=RANKING_CACHE_MAX_ENTRIES,
+    ttl=RANKING_CACHE_TTL_SECONDS
+)
 
 # =====================================================
 # CORE METRICS
@@ -79,8 +90,57 @@ def compute_trend_acceleration(project: Dict) -> float:
 # RISK PROFILE SCORING
 # =====================================================
 
+# Profiles and their strategy weights live in
+# recommendation_engine.PROFILES (fundamental / momentum / risk / ai).
+# The score here has its own components, so each profile scales the
+# balanced weights below by how much more or less that profile leans
+# on the matching strategy weight than "balanced" does. "balanced"
+# therefore stays the original scoring formula; adding or retuning a
+# profile in PROFILES carries over here. volatility is a penalty
+# (subtracted).
+BALANCED_WEIGHTS = {
+    "momentum": 0.35,
+    "ai": 0.25,
+    "sentiment": 0.20,
+    "stability": 0.20,
+    "volatility": 0.25
+}
+
+# Score component -> PROFILES weight it follows
+PROFILE_WEIGHT_SOURCES = {
+    "momentum": "momentum",
+    "ai": "ai",
+    "sentiment": "momentum",     # crowd mood is a short-horizon signal
+    "stability": "fundamental",
+    "volatility": "risk"
+}
+
+
+def _derive_profile_weights() -> Dict[str, Dict[str, float]]:
+    base = PROFILES["balanced"]
+
+    return {
+        profile: {
+            component: round(
+                weight * strategy[PROFILE_WEIGHT_SOURCES[component]]
+                / base[PROFILE_WEIGHT_SOURCES[component]],
+                4
+            )
+            for component, weight in BALANCED_WEIGHTS.items()
+        }
+        for profile, strategy in PROFILES.items()
+    }
+
+
+PROFILE_WEIGHTS = _derive_profile_weights()
+
+DEFAULT_PROFILE = "balanced"
+
+
 def compute_combined_score(project: Dict, profile: str = "balanced") -> float:
 
+    weights = PROFILE_WEIGHTS.get(profile, PROFILE_WEIGHTS[DEFAULT_PROFILE])
+
     market_cap = float(project.get("market_cap") or 0)
     ai_score = float(project.get("ai_score") or 0) / 100
     sentiment = float(project.get("sentiment_score") or 0)
@@ -94,65 +154,424 @@ def compute_combined_score(project: Dict, profile: str = "balanced") -> float:
     stability_factor = min(market_cap / 5_000_000_000, 1)
 
     base_score = (
-        0.35 * momentum +
-        0.25 * ai_score +
-        0.20 * sentiment +
-        0.20 * stability_factor
+        weights["momentum"] * momentum +
+        weights["ai"] * ai_score +
+        weights["sentiment"] * sentiment +
+        weights["stability"] * stability_factor
     )
 
-    adjusted_score = base_score - (0.25 * volatility_penalty)
+    adjusted_score = base_score - (weights["volatility"] * volatility_penalty)
 
     final_score = max(0, min(1, adjusted_score))
 
     return round(final_score, 4)
 
+
+# =====================================================
+# BATCH (VECTORIZED) SCORING
+# =====================================================
+
+SCORE_COLUMNS = (
+    "market_cap",
+    "volume_24h",
+    "price_change_24h",
+    "price_change_7d",
+    "ai_score",
+    "sentiment_score"
+)
+
+
+def project_columns(projects: List[Dict]) -> Dict[str, np.ndarray]:
+    """
+    Columnar float64 view of the fields scoring needs
+    (missing / None -> 0, like the per-dict functions).
+    """
+    n = len(projects)
+
+    return {
+        field: np.fromiter(
+            (float(p.get(field) or 0) for p in projects),
+            dtype=np.float64,
+            count=n
+        )
+        for field in SCORE_COLUMNS
+    }
+
+
+def _column_row(columns: Dict[str, np.ndarray], i: int) -> Dict:
+    return {field: float(values[i]) for field, values in columns.items()}
+
+
+def _round4(values: np.ndarray, columns: Dict[str, np.ndarray], scalar_fn) -> np.ndarray:
+    """
+    np.round(x, 4) agrees with Python's round(x, 4) except right at a
+    half-way point, where the two can break ties differently. Those
+    rare entries are recomputed with the per-dict function so batch
+    results match it exactly.
+    """
+    rounded = np.round(values, 4)
+
+    scaled = np.abs(values) * 10_000
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+
+    for i in np.flatnonzero(near_tie):
+        rounded[i] = scalar_fn(_column_row(columns, i))
+
+    return rounded
+
+
+def batch_trend_momentum(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    change_24h = columns["price_change_24h"]
+    change_7d = columns["price_change_7d"]
+
+    raw = (0.6 * change_7d + 0.4 * change_24h) / 100
+    return _round4(raw, columns, compute_trend_momentum)
+
+
+def batch_volatility_heat(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    change = np.abs(columns["price_change_24h"])
+
+    return np.select(
+        [change > 15, change > 8, change > 3],
+        ["EXTREME", "HIGH", "MODERATE"],
+        default="LOW"
+    ).astype(object)
+
+
+def batch_market_cap_score(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    mc = columns["market_cap"]
+    positive = mc > 0
+
+    raw = np.zeros_like(mc)
+    raw[positive] = np.minimum(np.log10(mc[positive]) / 12, 1)
+
+    return _round4(raw, columns, compute_market_cap_score)
+
+
+def batch_volume_pressure(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    volume = columns["volume_24h"]
+    market_cap = np.where(columns["market_cap"] == 0, 1.0, columns["market_cap"])
+
+    raw = np.minimum(volume / market_cap * 5, 1)
+    return _round4(raw, columns, compute_volume_pressure)
+
+
+def batch_trend_acceleration(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    change_24h = columns["price_change_24h"]
+    change_7d = columns["price_change_7d"]
+
+    raw = (change_24h - (change_7d / 7)) / 100
+    return _round4(raw, columns, compute_trend_acceleration)
+
+
+def batch_sentiment(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    change_24h = columns["price_change_24h"]
+    change_7d = columns["price_change_7d"]
+
+    # Same accumulation order as compute_sentiment
+    score = 0.4 * (change_24h > 0)
+    score = score + 0.4 * (change_7d > 0)
+    score = score + 0.2 * (change_7d > 10)
+
+    return np.minimum(score, 1.0)
+
+
+# Feature order for the profile weight matrix
+PROFILE_FEATURES = ("momentum", "ai", "sentiment", "stability", "volatility")
+
+# profiles x features; the volatility penalty enters with a negative sign
+PROFILE_WEIGHT_MATRIX = np.array([
+    [
+        -weights[f] if f == "volatility" else weights[f]
+        for f in PROFILE_FEATURES
+    ]
+    for weights in PROFILE_WEIGHTS.values()
+])
+
+
+def batch_score_features(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Profile-independent score components, one row per project
+    (columns in PROFILE_FEATURES order).
+    """
+    market_cap = columns["market_cap"]
+    change_24h = columns["price_change_24h"]
+    change_7d = columns["price_change_7d"]
+
+    momentum = (0.6 * change_7d + 0.4 * change_24h) / 100
+    ai_score = columns["ai_score"] / 100
+    sentiment = columns["sentiment_score"]
+    stability_factor = np.minimum(market_cap / 5_000_000_000, 1)
+    volatility_penalty = np.minimum(np.abs(change_24h) / 50, 1) ** 1.3
+
+    return np.column_stack([
+        momentum,
+        ai_score,
+        sentiment,
+        stability_factor,
+        volatility_penalty
+    ])
+
+
+def batch_profile_scores(
+    columns: Dict[str, np.ndarray],
+    features: Optional[np.ndarray] = None
+) -> Dict[str, np.ndarray]:
+    """
+    combined_score for every profile at once: features are computed
+    once, then one (projects x features) @ (features x profiles)
+    product yields all profiles.
+    """
+    if features is None:
+        features = batch_score_features(columns)
+
+    raw = np.clip(features @ PROFILE_WEIGHT_MATRIX.T, 0, 1)
+
+    return {
+        profile: _round4(
+            raw[:, j],
+            columns,
+            lambda row, profile=profile: compute_combined_score(row, profile)
+        )
+        for j, profile in enumerate(PROFILE_WEIGHTS)
+    }
+
+
+def batch_combined_score(
+    columns: Dict[str, np.ndarray],
+    profile: str = "balanced"
+) -> np.ndarray:
+
+    if profile not in PROFILE_WEIGHTS:
+        profile = DEFAULT_PROFILE
+
+    weights = PROFILE_WEIGHT_MATRIX[list(PROFILE_WEIGHTS).index(profile)]
+    raw = np.clip(batch_score_features(columns) @ weights, 0, 1)
+
+    return _round4(
+        raw,
+        columns,
+        lambda row: compute_combined_score(row, profile)
+    )
+
+
+def score_universe(
+    columns: Dict[str, np.ndarray],
+    profile: str = "balanced"
+) -> Dict[str, np.ndarray]:
+    """
+    Every metric for the whole universe in one vectorized pass.
+    Element i matches the per-dict functions applied to project i.
+    """
+    return {
+        "combined_score": batch_combined_score(columns, profile),
+        "trend_momentum": batch_trend_momentum(columns),
+        "volatility_heat": batch_volatility_heat(columns),
+        "market_cap_score": batch_market_cap_score(columns),
+        "volume_pressure": batch_volume_pressure(columns),
+        "trend_acceleration": batch_trend_acceleration(columns),
+        "sentiment_score": batch_sentiment(columns)
+    }
+
+
 # =====================================================
 # RANKING ENGINE
 # =====================================================
 
-def _build_rankings(profile: str = "balanced") -> List[Dict]:
+RANKING_PROFILES = tuple(PROFILE_WEIGHTS)
 
-    projects = get_all_projects()
-    ranked = []
+# view -> (sort key on the raw project row, descending?)
+# Each view re-sorts the score-ranked list; sorted() is stable so
+# ties keep their combined_score order.
+RANKING_VIEWS = {
+    "short_term": None,
+    "long_term": (lambda p: float(p.get("market_cap") or 0), True),
+    "low_risk": (lambda p: abs(float(p.get("price_change_24h") or 0)), False),
+    "high_growth": (lambda p: float(p.get("price_change_7d") or 0), True)
+}
 
-    for project in projects:
-        score = compute_combined_score(project, profile)
+SNAPSHOT_CACHE_KEY = "rankings:snapshot:v3"
 
-        project["combined_score"] = score
-        project["volatility_heat"] = compute_volatility_heat(project)
-        project["trend_momentum"] = compute_trend_momentum(project)
+# Version alone, so ETag checks don't load (or, from Redis, decode)
+# the whole snapshot
+SNAPSHOT_VERSION_CACHE_KEY = "rankings:snapshot:v3:version"
 
-        # ✅ serialize EACH project
-        ranked.append(serialize_project_summary(project))
 
-    ranked.sort(key=lambda x: x["combined_score"], reverse=True)
+def _rank_projects(
+    projects: List[Dict],
+    combined: List[float],
+    heat: List[str],
+    momentum: List[float]
+) -> List[Dict]:
+    """
+    Attach precomputed metrics to every project.
+    Returns raw rows sorted by combined_score.
+    """
+    ranked = []
 
-    logger.info("Rankings rebuilt (%s projects)", len(ranked))
+    for i, project in enumerate(projects):
+        row = dict(project)
+        row["combined_score"] = combined[i]
+        row["volatility_heat"] = heat[i]
+        row["trend_momentum"] = momentum[i]
+        ranked.append(row)
 
+    ranked.sort(key=lambda x: x["combined_score"], reverse=True)
     return ranked
 
 
+def _build_views(ranked: List[Dict]) -> Dict[str, List[Dict]]:
+    views = {}
+
+    for view, ordering in RANKING_VIEWS.items():
+        rows = ranked
+
+        if ordering:
+            key, descending = ordering
+            rows = sorted(ranked, key=key, reverse=descending)
+
+        views[view] = [serialize_project_summary(p) for p in rows]
+
+    return views
+
+
+def build_rankings_snapshot(version: Optional[int] = None) -> Dict:
+    """
+    Materialize every view for every profile from the current
+    projects table. Request handlers only slice the result.
+    """
+    projects = get_all_projects()
+    columns = project_columns(projects)
+
+    # Profile-independent work once; all profiles in one product
+    profile_scores = batch_profile_scores(columns)
+    heat = batch_volatility_heat(columns).tolist()
+    momentum = batch_trend_momentum(columns).tolist()
+
+    snapshot = {
+        "version": version or time.time_ns() // 1_000_000,
+        "generated_at": datetime.utcnow().isoformat(),
+        "project_count": len(projects),
+        "profiles": {
+            profile: _build_views(_rank_projects(
+                projects,
+                profile_scores[profile].tolist(),
+                heat,
+                momentum
+            ))
+            for profile in RANKING_PROFILES
+        }
+    }
+
+    logger.info(
+        "Rankings snapshot %s built (%s projects, %s profiles)",
+        snapshot["version"],
+        len(projects),
+        len(RANKING_PROFILES)
+    )
+
+    return snapshot
+
+
+_synced_version = None
+
+# One rebuild at a time, so a rebuild that read older rows can never
+# publish after one that read newer rows
+_publish_lock = threading.Lock()
+
+
+def publish_rankings_snapshot(announce: bool = True, version: Optional[int] = None) -> Dict:
+    """
+    Build and publish a new snapshot. Called when a scan completes.
+
+    With `announce`, the version is also recorded in SQLite so worker
+    processes without a shared Redis cache rebuild the same version.
+    """
+    global _synced_version
+
+    with _publish_lock:
+        snapshot = build_rankings_snapshot(version)
+        _rankings_cache.set(SNAPSHOT_CACHE_KEY, snapshot, RANKING_SNAPSHOT_TTL_SECONDS)
+        _rankings_cache.set(
+            SNAPSHOT_VERSION_CACHE_KEY,
+            snapshot["version"],
+            RANKING_SNAPSHOT_TTL_SECONDS
+        )
+        _synced_version = snapshot["version"]
+
+        if announce:
+            set_app_state("rankings_snapshot_version", str(snapshot["version"]))
+
+    return snapshot
+
+
+def sync_rankings_snapshot():
+    """
+    Follower side: rebuild locally when the scanning process has
+    announced a newer snapshot. Keeps the leader's version number so
+    ETags agree across workers. Not needed with Redis (shared L2).
+    """
+    if redis_client:
+        return
+
+    announced = get_app_state("rankings_snapshot_version")
+
+    if not announced or int(announced) == _synced_version:
+        return
+
+    publish_rankings_snapshot(announce=False, version=int(announced))
+
 
 # =====================================================
-# CACHE ACCESS
+# SNAPSHOT ACCESS
 # =====================================================
 
+def get_rankings_snapshot() -> Dict:
+    """
+    Current snapshot. Built on demand only when none has been
+    published yet (cold start) or it has expired.
+    """
+    snapshot = _rankings_cache.get(SNAPSHOT_CACHE_KEY)
+
+    if snapshot is None:
+        snapshot = publish_rankings_snapshot(announce=False)
+
+    return snapshot
+
+
+def get_snapshot_version() -> int:
+    """
+    Version of the current snapshot, without reading the snapshot
+    itself unless none is published.
+    """
+    version = _rankings_cache.get(SNAPSHOT_VERSION_CACHE_KEY)
+
+    if version is None:
+        version = get_rankings_snapshot()["version"]
+
+    return int(version)
+
+
+def normalize_profile(profile: str) -> str:
+    return profile if profile in RANKING_PROFILES else DEFAULT_PROFILE
+
+
+def _get_view(view: str, profile: str) -> List[Dict]:
+    profiles = get_rankings_snapshot()["profiles"]
+    return profiles[normalize_profile(profile)][view]
+
+
 def get_rankings(
     profile: str = "balanced",
     limit: int = 20,
     offset: int = 0
 ) -> List[Dict]:
 
-    cached = cache_get(f"rankings:v2:{profile}")    #----------v2
-    if not cached:
-        data = _build_rankings(profile)
-        cache_set(f"rankings:v2:{profile}", data, 30) #---------v2 n 300 to 30
-    else:
-        data = cached
-
-    return data[offset:offset + limit]
+    return _get_view("short_term", profile)[offset:offset + limit]
 
 
+def get_cache_stats() -> Dict:
+    return _rankings_cache.snapshot()
 
 
 # =====================================================
@@ -167,6 +586,9 @@ def personalize_rankings(
     if not user_preferences:
         return rankings
 
+    # Copy — rankings are shared snapshot rows
+    rankings = [dict(p) for p in rankings]
+
     for project in rankings:
         if project["symbol"] in user_preferences:
             project["combined_score"] += 0.1
@@ -184,7 +606,7 @@ def get_short_term(
     limit: int = 20,
     offset: int = 0
 ):
-    return get_rankings(profile, limit, offset)
+    return _get_view("short_term", profile)[offset:offset + limit]
 
 
 def get_long_term(
@@ -192,13 +614,7 @@ def get_long_term(
     limit: int = 20,
     offset: int = 0
 ):
-    data = get_rankings(profile)
-    data = sorted(
-        data,
-        key=lambda x: x.get("market_cap", 0),
-        reverse=True
-    )
-    return data[offset:offset + limit]
+    return _get_view("long_term", profile)[offset:offset + limit]
 
 
 def get_low_risk(
@@ -206,12 +622,7 @@ def get_low_risk(
     limit: int = 20,
     offset: int = 0
 ):
-    data = get_rankings(profile)
-    data = sorted(
-        data,
-        key=lambda x: abs(x.get("price_change_24h", 0))
-    )
-    return data[offset:offset + limit]
+    return _get_view("low_risk", profile)[offset:offset + limit]
 
 
 def get_high_growth(
@@ -219,13 +630,7 @@ def get_high_growth(
     limit: int = 20,
     offset: int = 0
 ):
-    data = get_rankings(profile)
-    data = sorted(
-        data,
-        key=lambda x: x.get("price_change_7d", 0),
-        reverse=True
-    )
-    return data[offset:offset + limit]
+    return _get_view("high_growth", profile)[offset:offset + limit]
 
 
 
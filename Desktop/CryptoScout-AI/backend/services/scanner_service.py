@@ -2,29 +2,67 @@
 # backend/services/scanner_service.py
 
 import logging
+import hashlib
 from typing import Dict, List, Optional
 import asyncio
+from contextlib import aclosing
+from collections import Counter
 from datetime import datetime
 
-from services.market_service import fetch_top_projects
+from services.market_service import stream_top_projects, fetch_projects_by_symbols
 from services.sentiment_service import compute_sentiment
-from services.ai_service import analyze_project, qualifies_for_ai
-from services.ranking_service import compute_combined_score, get_rankings
+from services.ai_service import (
+    analyze_project,
+    qualifies_for_ai,
+    fallback_analysis,
+    cached_analysis,
+    ai_cache_entry,
+    record_ai_cache_stores,
+    cache_cutoff
+)
+from services.ranking_service import (
+    compute_combined_score,
+    compute_volatility_heat,
+    publish_rankings_snapshot
+)
 
 from database.repository import (
+    get_project_by_symbol,
     upsert_project,
     insert_project_history,
-    get_project_by_symbol,
-    insert_alert,
-    get_recent_alert
+    get_projects_by_symbols,
+    get_recent_alert_symbols,
+    get_ai_cache_entries,
+    save_ai_cache_bulk,
+    save_scan_results
 )
 
-from models.scan_status import ScanStatus
+from models.scan_status import ScanStatus, combine_statuses
+from core.config import (
+    SCAN_CONCURRENCY,
+    SCAN_AI_BUDGET,
+    SCAN_UNCHANGED_MAX_AGE_SECONDS,
+    SCAN_SYMBOL_OWNER_MAX_AGE_SECONDS,
+    REFRESH_MIN_AGE_SECONDS,
+    AI_MODEL
+)
 from core.ws_manager import manager
+from core.job_queue import job_queue, JOB_RANKINGS
 
 
 logger = logging.getLogger(__name__)
-_scan_status = ScanStatus()
+# tier -> status of that tier's scans (one tier must not overwrite
+# another's result)
+_scan_statuses = {}
+
+
+def _tier_status(tier: str) -> ScanStatus:
+    status = _scan_statuses.get(tier)
+
+    if status is None:
+        status = _scan_statuses[tier] = ScanStatus()
+
+    return status
 
 
 # =====================================================
@@ -32,8 +70,8 @@ _scan_status = ScanStatus()
 # =====================================================
 
 def get_scan_status():
-    """Return current scan status snapshot"""
-    return _scan_status.snapshot()
+    """Return current scan status snapshot (worst tier first, per tier)"""
+    return combine_statuses(dict(_scan_statuses))
 
 
 # =====================================================
@@ -77,189 +115,680 @@ def calculate_score_change(previous_score: float, new_score: float) -> float:
     return abs((new_score - previous_score) / previous_score) * 100
 
 
+# =====================================================
+# PER-PROJECT PIPELINE
+# =====================================================
+
+def _build_history_data(project: Dict) -> Dict:
+    return {
+        "symbol": project["symbol"],
+        "current_price": project.get("current_price", 0),
+        "market_cap": project.get("market_cap", 0),
+        "volume_24h": project.get("volume_24h", 0),
+        "price_change_24h": project.get("price_change_24h", 0),
+        "price_change_7d": project.get("price_change_7d", 0),
+        "ai_score": project.get("ai_score", 0),
+        "ai_verdict": project.get("ai_verdict", "UNKNOWN"),
+        "sentiment_score": project.get("sentiment_score", 0),
+        "combined_score": project.get("combined_score", 0)
+    }
+
+
+# =====================================================
+# PRE-SCAN STAGE
+# =====================================================
+
+ALERT_TYPE_SCORE_JUMP = "SCORE_JUMP"
+ALERT_THRESHOLD_PCT = 20
+ALERT_DEDUPE_MINUTES = 60
+
+
+def _load_previous_state(symbols: List[str]) -> Dict:
+    """
+    Load previous rows, recently alerted symbols and cached AI
+    results for the whole scan universe in three queries, so change
+    detection needs no per-project DB access.
+    """
+    return {
+        "projects": get_projects_by_symbols(symbols),
+        "recent_alerts": get_recent_alert_symbols(
+            symbols,
+            ALERT_TYPE_SCORE_JUMP,
+            ALERT_DEDUPE_MINUTES
+        ),
+        "ai_cache": get_ai_cache_entries(symbols, AI_MODEL, cache_cutoff())
+    }
+
+
+# =====================================================
+# CHANGE DETECTION
+# =====================================================
+
+# Significant digits kept per field: moves below this are noise
+FINGERPRINT_DIGITS = {
+    "current_price": 4,
+    "market_cap": 3,
+    "volume_24h": 2,
+    "price_change_24h": 2,
+    "price_change_7d": 2,
+}
+
+
+def project_fingerprint(project: Dict) -> str:
+    """
+    "<CoinGecko last_updated>#<hash of quantized market fields>".
+    """
+    quantized = "|".join(
+        f"{float(project.get(field) or 0):.{digits}g}"
+        for field, digits in FINGERPRINT_DIGITS.items()
+    )
+    digest = hashlib.blake2b(quantized.encode(), digest_size=8).hexdigest()
+
+    return f"{project.get('last_updated') or ''}#{digest}"
+
+
+def _row_age_seconds(existing: Dict) -> float:
+    try:
+        updated = datetime.fromisoformat(existing.get("last_updated") or "")
+    except ValueError:
+        return float("inf")
+
+    return (datetime.utcnow() - updated).total_seconds()
+
+
+def _is_unchanged(project: Dict, existing: Optional[Dict]) -> bool:
+    """
+    Same CoinGecko update, or no material move in any field — and the
+    stored analysis is still recent enough to keep.
+    """
+    if not existing or not existing.get("fingerprint"):
+        return False
+
+    if _row_age_seconds(existing) > SCAN_UNCHANGED_MAX_AGE_SECONDS:
+        return False
+
+    previous_source, _, previous_digest = existing["fingerprint"].partition("#")
+    source, _, digest = project["fingerprint"].partition("#")
+
+    return bool(source and source == previous_source) or digest == previous_digest
+
+
+def _owned_by_other_coin(project: Dict, existing: Optional[Dict]) -> bool:
+    """
+    The stored row for this ticker belongs to a different, higher
+    ranked coin that is still being refreshed (e.g. a rank-900 coin
+    sharing a symbol with a rank-20 one). Rows without a coin_id
+    predate the column and are never protected.
+    """
+    if not existing or not existing.get("coin_id") or not project.get("coin_id"):
+        return False
+
+    if existing["coin_id"] == project["coin_id"]:
+        return False
+
+    owner_rank = existing.get("market_cap_rank") or 0
+    rank = project.get("market_cap_rank") or 0
+
+    if not owner_rank or (rank and rank < owner_rank):
+        return False
+
+    return _row_age_seconds(existing) <= SCAN_SYMBOL_OWNER_MAX_AGE_SECONDS
+
+
+def refresh_job_key(symbol: str) -> str:
+    return f"refresh:{symbol.upper().strip()}"
+
+
+class AIBudget:
+    """
+    LLM calls left for one scan. Workers take from it in semaphore
+    (FIFO) order, so the highest market caps get analyzed first.
+    """
+
+    def __init__(self, calls: int):
+        self.remaining = max(0, calls)
+        self.deferred = 0
+
+    def take(self) -> bool:
+        if self.remaining <= 0:
+            self.deferred += 1
+            return False
+
+        self.remaining -= 1
+        return True
+
+
+def _apply_deferred_ai(project: Dict, existing: Optional[Dict]):
+    """
+    Over budget: keep the stored AI verdict, or score new coins with
+    the deterministic engine.
+    """
+    if existing and existing.get("ai_verdict") not in (None, "NOT_QUALIFIED", "ANALYSIS_FAILED"):
+        project["ai_score"] = existing.get("ai_score") or 0
+        project["ai_verdict"] = existing["ai_verdict"]
+        return
+
+    result = fallback_analysis(project)
+    project["ai_score"] = result["score"]
+    project["ai_verdict"] = result["verdict"]
+
+
+def _previous_score(existing: Optional[Dict]) -> float:
+    if not existing:
+        return 0
+
+    stored = existing.get("combined_score")
+
+    # Rows written before combined_score was stored
+    if stored is None:
+        return compute_combined_score(existing) or 0
+
+    return stored
+
+
+async def _process_project(
+    project: Dict,
+    semaphore: asyncio.Semaphore,
+    previous_state: Dict,
+    ai_budget: AIBudget
+) -> Dict:
+    """
+    Analyze a single project inside the worker pool.
+
+    The LLM call runs in a worker thread so a slow project never
+    stalls the event loop. Previous state comes from the pre-scan
+    stage and nothing is written here — the whole scan is saved in
+    one transaction afterwards.
+    """
+    symbol = project.get("symbol")
+    outcome = {
+        "symbol": symbol,
+        "project": project,
+        "ai_analyzed": False,
+        "ai_cached": False,
+        "ai_cache_entry": None,
+        "alert_change_pct": None,
+        "skipped": False,
+        "shadowed": False,
+        "stale": False,
+        "errors": []
+    }
+
+    if not symbol:
+        logger.debug("Skipping project without symbol")
+        outcome["project"] = None
+        return outcome
+
+    # Last-known-good market data was already analyzed and saved when
+    # it was fetched: no AI call, no history row, and the stored row
+    # keeps its real last_updated
+    if project.get("stale"):
+        outcome["project"] = None
+        outcome["stale"] = True
+        return outcome
+
+    # ==========================
+    # CHANGE DETECTION
+    # ==========================
+    # Unchanged coins keep their stored analysis: no sentiment, AI,
+    # scoring or history write
+    project["fingerprint"] = project_fingerprint(project)
+    existing = previous_state["projects"].get(symbol)
+
+    # An on-demand refresh of this coin is queued or running: it
+    # writes fresher data than this page, so leave the row to it
+    if job_queue.active(refresh_job_key(symbol)):
+        outcome["project"] = None
+        outcome["skipped"] = True
+        return outcome
+
+    if _owned_by_other_coin(project, existing):
+        logger.debug(
+            "Skipping %s (%s) — symbol held by higher-ranked %s",
+            symbol, project.get("coin_id"), existing.get("coin_id")
+        )
+        outcome["project"] = None
+        outcome["shadowed"] = True
+        return outcome
+
+    if _is_unchanged(project, existing):
+        outcome["project"] = None
+        outcome["skipped"] = True
+        return outcome
+
+    async with semaphore:
+        try:
+            # ==========================
+            # SENTIMENT
+            # ==========================
+            project["sentiment_score"] = compute_sentiment(project)
+
+            # ==========================
+            # AI FILTERING
+            # ==========================
+            qualified = qualifies_for_ai(project)
+
+            # Inputs barely moved since the last LLM call: reuse its
+            # verdict without spending AI budget
+            cached = (
+                cached_analysis(project, previous_state["ai_cache"].get(symbol))
+                if qualified else None
+            )
+
+            if cached:
+                project["ai_score"] = cached["score"]
+                project["ai_verdict"] = cached["verdict"]
+                outcome["ai_cached"] = True
+            elif qualified and ai_budget.take():
+                try:
+                    ai_result = await asyncio.to_thread(analyze_project, project)
+                    project["ai_score"] = ai_result.get("score", 0)
+                    project["ai_verdict"] = ai_result.get("verdict", "UNKNOWN")
+                    outcome["ai_analyzed"] = True
+                    outcome["ai_cache_entry"] = ai_cache_entry(project, ai_result)
+                except Exception as e:
+                    logger.error(f"AI analysis failed for {symbol}: {e}")
+                    project["ai_score"] = 0
+                    project["ai_verdict"] = "ANALYSIS_FAILED"
+                    outcome["errors"].append(f"AI analysis failed for {symbol}")
+            elif qualified:
+                _apply_deferred_ai(project, existing)
+            else:
+                project["ai_score"] = 0
+                project["ai_verdict"] = "NOT_QUALIFIED"
+
+            # ==========================
+            # PREVIOUS SCORE CHECK
+            # ==========================
+            previous_score = _previous_score(existing)
+
+            # ==========================
+            # COMPUTE NEW SCORE
+            # ==========================
+            combined_score = compute_combined_score(project)
+            project["combined_score"] = combined_score
+
+            # ==========================
+            # SMART ALERT DETECTION
+            # ==========================
+            if previous_score > 0:
+                change_pct = calculate_score_change(previous_score, combined_score)
+
+                if change_pct >= ALERT_THRESHOLD_PCT:
+                    # Prevent duplicate alert within 60 minutes
+                    if symbol not in previous_state["recent_alerts"]:
+                        outcome["alert_change_pct"] = change_pct
+
+        except Exception as e:
+            logger.error(f"Error processing project {symbol}: {e}")
+            outcome["project"] = None
+            outcome["errors"].append(f"Project {symbol}: {str(e)}")
+
+    return outcome
+
+
+def _alert_message(symbol: str, change_pct: float) -> str:
+    return f"{symbol} score changed {change_pct:.2f}% in latest scan"
+
+
 # =====================================================
 # MAIN SCAN FUNCTION
 # =====================================================
 
-async def run_scan(limit: int = 50):
+# Future resolved when a scan ends -> (first rank, last rank)
+_scans_in_flight = {}
+
+
+def scan_covering(rank: Optional[int]) -> Optional[asyncio.Future]:
+    """
+    Completion future of an in-flight scan whose rank band covers
+    `rank`, if any.
+    """
+    if not rank:
+        return None
+
+    for done, (first_rank, last_rank) in _scans_in_flight.items():
+        if first_rank <= rank <= last_rank and not done.done():
+            return done
+
+    return None
+
+
+async def publish_rankings():
+    """
+    Rebuild the rankings snapshot through the job queue, so rebuilds
+    from refreshes and API callers are coalesced (a rebuild already
+    running is followed by one that sees the newer rows).
+
+    Rebuilds directly outside the app loop, and from inside a job
+    (tier scans are jobs): awaiting a queued job there would deadlock
+    once every worker is busy. publish_rankings_snapshot serializes
+    concurrent rebuilds itself.
+    """
+    if not job_queue.is_running() or job_queue.in_job():
+        return await asyncio.to_thread(publish_rankings_snapshot)
+
+    future = await job_queue.submit(
+        "rankings:publish",
+        publish_rankings_snapshot,
+        priority=JOB_RANKINGS,
+        after_running=True
+    )
+    return await asyncio.shield(future)
+
+
+async def run_scan(
+    limit: int = 50,
+    concurrency: Optional[int] = None,
+    offset: int = 0,
+    ai_budget: Optional[int] = None,
+    tier: str = "default"
+):
+    """
+    Full market scan (see _run_scan). While it runs, on-demand
+    refreshes of coins in its band wait for it instead of fetching
+    the same data (scan_covering).
+    """
+    done = asyncio.get_running_loop().create_future()
+    _scans_in_flight[done] = (offset + 1, offset + limit)
+
+    try:
+        return await _run_scan(limit, concurrency, offset, ai_budget, tier)
+    finally:
+        del _scans_in_flight[done]
+        done.set_result(None)
+
+
+async def _run_scan(
+    limit: int = 50,
+    concurrency: Optional[int] = None,
+    offset: int = 0,
+    ai_budget: Optional[int] = None,
+    tier: str = "default",
+    pages=None
+):
     """
     Full market scan.
     Safe, fault-tolerant, scheduler-ready.
+
+    Market pages are streamed in; projects are analyzed by a bounded
+    pool of concurrent workers, then persisted in a single transaction
+    and reported in market-cap order so results are identical to a
+    sequential scan.
     
     Args:
         limit: Maximum number of projects to fetch
+        concurrency: Max projects analyzed in parallel
+            (defaults to SCAN_CONCURRENCY)
+        offset: Market-cap positions to skip (rank band start - 1)
+        ai_budget: LLM calls allowed this scan (defaults to
+            SCAN_AI_BUDGET); qualifying coins beyond it keep their
+            stored verdict
+        tier: Label for logs and results
+        pages: Callable(report) returning the async page stream to
+            scan instead of market-cap pages (see scan_symbols)
     
     Returns:
         Dict with scan results or None if failed
     """
-    logger.info(f"Starting market scan with limit={limit}...")
+    concurrency = max(1, concurrency or SCAN_CONCURRENCY)
+    status = _tier_status(tier)
+    budget = AIBudget(SCAN_AI_BUDGET if ai_budget is None else ai_budget)
+
+    logger.info(
+        f"Starting {tier} market scan with ranks {offset + 1}-{offset + limit}, "
+        f"concurrency={concurrency}, ai_budget={budget.remaining}..."
+    )
     scan_results = {
+        "tier": tier,
         "processed": 0,
         "ai_analyzed": 0,
+        "stale": 0,
+        "skipped": 0,
+        "shadowed": 0,
+        "ai_deferred": 0,
+        "ai_cache_hits": 0,
+        "missing_pages": [],
+        "stale_pages": [],
+        "alerts": 0,
+        "volatility": {},
         "errors": []
     }
 
     try:
-        # Fetch market data
-        projects = fetch_top_projects(limit=limit)
+        semaphore = asyncio.Semaphore(concurrency)
+        tasks = []
+
+        # Heat mix of the whole band, unchanged coins included
+        # (drives the scheduler's adaptive interval)
+        heat_counts = Counter()
+
+        # Pages that failed with no last-known-good rows to stand in
+        fetch_report = {}
+
+        # ==========================
+        # STREAM MARKET PAGES
+        # ==========================
+        # Pages arrive in market-cap order; each page's projects start
+        # processing while later pages are still downloading.
+        if pages is None:
+            stream = stream_top_projects(limit, offset=offset, report=fetch_report)
+        else:
+            stream = pages(fetch_report)
 
-        if not projects:
-            _scan_status.api_failure()
-            _scan_status.failure()
+        async with aclosing(stream) as market_pages:
+            async for page in market_pages:
+
+                heat_counts.update(compute_volatility_heat(p) for p in page)
+
+                # ==========================
+                # PRE-SCAN: PREVIOUS STATE
+                # ==========================
+                previous_state = await asyncio.to_thread(
+                    _load_previous_state,
+                    [p.get("symbol") for p in page]
+                )
+
+                tasks.extend(
+                    asyncio.create_task(
+                        _process_project(project, semaphore, previous_state, budget)
+                    )
+                    for project in page
+                )
+
+        if not tasks:
+            status.api_failure()
+            status.failure()
             logger.warning("Scan aborted — no market data received")
             return None
 
-        # Optional: limit AI exposure to top 30 by market cap
-        projects = sorted(
-            projects,
-            key=lambda x: x.get("market_cap", 0) or 0,  # Handle None values
-            reverse=True
-        )[:30]
+        # The band shrank: say so instead of passing off a partial
+        # scan as complete
+        missing_pages = fetch_report.get("missing_pages", [])
+        scan_results["missing_pages"] = missing_pages
+
+        if missing_pages:
+            status.api_failure()
+            logger.error(
+                "%s scan is missing market pages %s — ranks on them were not scanned",
+                tier,
+                missing_pages
+            )
+            scan_results["errors"].append(f"Missing market pages: {missing_pages}")
+
+        # CoinGecko failed but the snapshot stood in: still an outage
+        stale_pages = fetch_report.get("stale_pages", [])
+        scan_results["stale_pages"] = stale_pages
+
+        if stale_pages:
+            status.api_failure()
+            logger.warning(
+                "%s scan served market pages %s from the last-known-good snapshot",
+                tier,
+                stale_pages
+            )
+
+        # gather() keeps input order regardless of completion order
+        outcomes = await asyncio.gather(*tasks)
 
         processed_count = 0
         ai_count = 0
+        ai_cached_count = 0
+        stale_count = 0
+        skipped_count = 0
+        shadowed_count = 0
 
-        for project in projects:
-            try:
-                symbol = project.get("symbol")
-                if not symbol:
-                    logger.debug("Skipping project without symbol")
-                    continue
+        projects_to_save = []
+        history_to_save = []
+        alerts_to_save = []
+        ai_cache_to_save = []
 
-                # ==========================
-                # SENTIMENT
-                # ==========================
-                sentiment_score = compute_sentiment(project)
-                project["sentiment_score"] = sentiment_score
+        for outcome in outcomes:
+            scan_results["errors"].extend(outcome["errors"])
 
-                # ==========================
-                # AI FILTERING
-                # ==========================
-                if qualifies_for_ai(project):
-                    try:
-                        ai_result = analyze_project(project)
-                        project["ai_score"] = ai_result.get("score", 0)
-                        project["ai_verdict"] = ai_result.get("verdict", "UNKNOWN")
-                        ai_count += 1
-                    except Exception as e:
-                        logger.error(f"AI analysis failed for {symbol}: {e}")
-                        project["ai_score"] = 0
-                        project["ai_verdict"] = "ANALYSIS_FAILED"
-                        scan_results["errors"].append(f"AI analysis failed for {symbol}")
-                else:
-                    project["ai_score"] = 0
-                    project["ai_verdict"] = "NOT_QUALIFIED"
+            if outcome["skipped"]:
+                skipped_count += 1
 
-                # ==========================
-                # PREVIOUS SCORE CHECK
-                # ==========================
-                existing = get_project_by_symbol(symbol)
-                previous_score = 0
+            if outcome["shadowed"]:
+                shadowed_count += 1
 
-                if existing:
-                    previous_score = compute_combined_score(existing) or 0
+            # Served from the last-known-good market snapshot
+            if outcome["stale"]:
+                stale_count += 1
 
-                # ==========================
-                # COMPUTE NEW SCORE
-                # ==========================
-                combined_score = compute_combined_score(project)
-                project["combined_score"] = combined_score
+            if outcome["project"] is None:
+                continue
 
-                # ==========================
-                # SMART ALERT DETECTION
-                # ==========================
-                if previous_score > 0:
-                    change_pct = calculate_score_change(previous_score, combined_score)
+            projects_to_save.append(outcome["project"])
+            history_to_save.append(_build_history_data(outcome["project"]))
+
+            if outcome["alert_change_pct"] is not None:
+                alerts_to_save.append({
+                    "symbol": outcome["symbol"],
+                    "alert_type": ALERT_TYPE_SCORE_JUMP,
+                    "message": _alert_message(outcome["symbol"], outcome["alert_change_pct"])
+                })
+
+            if outcome["ai_analyzed"]:
+                ai_count += 1
+
+            if outcome["ai_cached"]:
+                ai_cached_count += 1
+
+            if outcome["ai_cache_entry"]:
+                ai_cache_to_save.append(outcome["ai_cache_entry"])
+
+            processed_count += 1
+
+        # ==========================
+        # SAVE SCAN (ONE TRANSACTION)
+        # ==========================
+        save_report = {}
+        saved = await asyncio.to_thread(
+            save_scan_results,
+            projects_to_save,
+            history_to_save,
+            alerts_to_save,
+            ai_cache_to_save,
+            save_report
+        )
 
-                    if change_pct >= 20:  # 20% threshold
-                        # Prevent duplicate alert within 60 minutes
-                        recent = get_recent_alert(symbol, "SCORE_JUMP", 60)
+        if not saved:
+            status.failure()
+            logger.error("Scan aborted — failed to persist %s projects", processed_count)
+            scan_results["errors"].append("Failed to persist scan results")
+            return scan_results
 
-                        if not recent:
-                            message = f"{symbol} score changed {change_pct:.2f}% in latest scan"
+        # Malformed rows were dropped, not saved
+        dropped = save_report.get("dropped", {})
 
-                            # Store alert in database
-                            insert_alert(
-                                symbol=symbol,
-                                alert_type="SCORE_JUMP",
-                                message=message
-                            )
+        if dropped:
+            processed_count -= dropped.get("projects", 0)
+            scan_results["errors"].append(f"Dropped malformed rows: {dropped}")
 
-                            # Broadcast alert via WebSocket
-                            await broadcast_alert(symbol, change_pct)
+        record_ai_cache_stores(len(ai_cache_to_save) - dropped.get("ai_cache", 0))
 
-                            logger.info(f"ALERT STORED: {message}")
+        for alert in alerts_to_save:
+            logger.info(f"ALERT STORED: {alert['message']}")
 
-                # ==========================
-                # SAVE CURRENT STATE
-                # ==========================
-                upsert_project(project)
+        # Broadcast alerts via WebSocket (after commit)
+        for outcome in outcomes:
+            if outcome["project"] is not None and outcome["alert_change_pct"] is not None:
+                await broadcast_alert(outcome["symbol"], outcome["alert_change_pct"])
 
-                # ==========================
-                # SAVE HISTORY SNAPSHOT
-                # ==========================
-                history_data = {
-                    "symbol": symbol,
-                    "current_price": project.get("current_price", 0),
-                    "market_cap": project.get("market_cap", 0),
-                    "volume_24h": project.get("volume_24h", 0),
-                    "price_change_24h": project.get("price_change_24h", 0),
-                    "price_change_7d": project.get("price_change_7d", 0),
-                    "ai_score": project.get("ai_score", 0),
-                    "ai_verdict": project.get("ai_verdict", "UNKNOWN"),
-                    "sentiment_score": project.get("sentiment_score", 0),
-                    "combined_score": combined_score
-                }
-                
-                insert_project_history(history_data)
-
-                processed_count += 1
-
-            except Exception as e:
-                logger.error(f"Error processing project {project.get('symbol', 'UNKNOWN')}: {e}")
-                scan_results["errors"].append(f"Project {project.get('symbol', 'UNKNOWN')}: {str(e)}")
-                continue
+        # Publish fresh rankings for request handlers (nothing to
+        # republish when every coin was unchanged)
+        try:
+            if projects_to_save:
+                await publish_rankings()
+        except Exception as e:
+            logger.error(f"Failed to publish rankings snapshot: {e}")
+            scan_results["errors"].append("Failed to publish rankings snapshot")
 
         # Update scan status
-        _scan_status.success()
+        status.success(missing_pages, stale_pages, stale_count)
         scan_results["processed"] = processed_count
         scan_results["ai_analyzed"] = ai_count
+        scan_results["stale"] = stale_count
+        scan_results["skipped"] = skipped_count
+        scan_results["shadowed"] = shadowed_count
+        scan_results["ai_deferred"] = budget.deferred
+        scan_results["ai_cache_hits"] = ai_cached_count
+        scan_results["alerts"] = len(alerts_to_save) - dropped.get("alerts", 0)
+        scan_results["volatility"] = dict(heat_counts)
 
         # Broadcast scan completion
         await broadcast_scan_completion(processed_count, ai_count)
 
         logger.info(
-            "Scan complete — %s processed, %s AI analyzed",
+            "%s scan complete — %s processed, %s unchanged, %s AI analyzed, "
+            "%s AI cache hits, %s from stale market data",
+            tier,
             processed_count,
-            ai_count
+            skipped_count,
+            ai_count,
+            ai_cached_count,
+            stale_count
         )
         
         return scan_results
 
     except Exception as e:
         logger.error(f"Scan failed with critical error: {e}", exc_info=True)
-        _scan_status.failure()
+        status.failure()
         scan_results["errors"].append(f"Critical error: {str(e)}")
         return scan_results
 
 
 # =====================================================
-# SYNC WRAPPER FOR SCHEDULER COMPATIBILITY
+# TARGETED SCANS
 # =====================================================
 
-def run_scan_sync(limit: int = 50):
+async def _symbol_pages(symbols: List[str], report: Dict):
+    # One batched by-id fetch stands in for the market pages
+    projects = await fetch_projects_by_symbols(symbols)
+
+    if projects:
+        yield projects
+
+
+async def scan_symbols(symbols: List[str], tier: str = "watchlist"):
     """
-    Synchronous wrapper for run_scan to be used with schedulers
-    that don't support async functions.
+    Scan a set of coins (e.g. a watchlist) through the normal scan
+    pipeline, fetched in a handful of by-id requests instead of whole
+    market-cap pages. Run it as a job; it has no rank band, so
+    on-demand refreshes don't wait for it.
     """
-    try:
-        loop = asyncio.get_running_loop()
-    except RuntimeError:
-        # No running loop, create a new one
-        return asyncio.run(run_scan(limit))
-    else:
-        # Already in async context, create task
-        return asyncio.create_task(run_scan(limit))
+    symbols = list(dict.fromkeys(s.upper().strip() for s in symbols if s))
+
+    if not symbols:
+        return None
+
+    return await _run_scan(
+        limit=len(symbols),
+        tier=tier,
+        pages=lambda report: _symbol_pages(symbols, report)
+    )
 
 
 # =====================================================
@@ -268,37 +797,96 @@ def run_scan_sync(limit: int = 50):
 
 def is_scan_running() -> bool:
     """Check if a scan is currently running"""
-    return _scan_status.is_running()
+    return bool(_scans_in_flight)
 
 
 def get_last_scan_time() -> Optional[datetime]:
-    """Get the timestamp of the last successful scan"""
-    return _scan_status.last_success_time
+    """Get the timestamp of the last successful scan (any tier)"""
+    return max(
+        (s.last_success_time for s in _scan_statuses.values() if s.last_success_time),
+        default=None
+    )
 
 
 # =====================================================
 # PROJECT-SPECIFIC SCAN FUNCTIONS
 # =====================================================
 
+async def wait_for_covering_scan(symbol: str, timeout: float) -> bool:
+    """
+    If an in-flight scan's band covers this coin's stored rank, wait
+    for it (it is fetching the coin anyway) so a refresh afterwards
+    reuses its row. Waits outside the job queue, so no worker is
+    held. Returns False if the scan is still running at `timeout`.
+    """
+    existing = await asyncio.to_thread(get_project_by_symbol, symbol)
+    covering = scan_covering(existing.get("market_cap_rank")) if existing else None
+
+    if covering is None:
+        return True
+
+    try:
+        await asyncio.wait_for(asyncio.shield(covering), timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+
 async def scan_single_project(symbol: str) -> Optional[Dict]:
     """
-    Scan and update a single project by symbol
+    Scan and update a single project by symbol.
+
+    Run through the job queue (refresh:<SYMBOL>) so concurrent
+    requests share one refresh; callers first wait for a tier scan
+    covering the coin (wait_for_covering_scan). A row written in the
+    last REFRESH_MIN_AGE_SECONDS — by a tier scan or an earlier
+    refresh — is returned as is instead of fetching the coin again.
     """
+    symbol = symbol.upper().strip()
+
     try:
+        existing = await asyncio.to_thread(get_project_by_symbol, symbol)
+
+        if existing and _row_age_seconds(existing) < REFRESH_MIN_AGE_SECONDS:
+            logger.info("Refresh of %s skipped — updated %.0fs ago", symbol, _row_age_seconds(existing))
+            return existing
+
         # Fetch single project data (you'll need to implement this in market_service)
         from services.market_service import fetch_project_by_symbol
-        project = fetch_project_by_symbol(symbol)
+        project = await asyncio.to_thread(fetch_project_by_symbol, symbol)
         
         if not project:
             logger.warning(f"Project {symbol} not found")
             return None
+
+        # Last-known-good fallback (CoinGecko unavailable): old prices
+        # are not re-analyzed or written as new history. Serve the
+        # stored row if there is one, else the marked-stale payload
+        if project.get("stale"):
+            logger.warning("Refresh of %s served stale market data", symbol)
+
+            if existing:
+                return {**existing, "stale": True}
+
+            return project
         
         # Process the project (similar logic as above but for single project)
         sentiment_score = compute_sentiment(project)
         project["sentiment_score"] = sentiment_score
         
         if qualifies_for_ai(project):
-            ai_result = analyze_project(project)
+            entries = await asyncio.to_thread(
+                get_ai_cache_entries, [symbol], AI_MODEL, cache_cutoff()
+            )
+            ai_result = cached_analysis(project, entries.get(symbol))
+
+            if ai_result is None:
+                ai_result = await asyncio.to_thread(analyze_project, project)
+                entry = ai_cache_entry(project, ai_result)
+
+                if entry and await asyncio.to_thread(save_ai_cache_bulk, [entry]):
+                    record_ai_cache_stores(1)
+
             project["ai_score"] = ai_result.get("score", 0)
             project["ai_verdict"] = ai_result.get("verdict", "UNKNOWN")
         else:
@@ -307,28 +895,28 @@ async def scan_single_project(symbol: str) -> Optional[Dict]:
         
         combined_score = compute_combined_score(project)
         project["combined_score"] = combined_score
+        project["fingerprint"] = project_fingerprint(project)
         
         # Save to database
-        upsert_project(project)
+        await asyncio.to_thread(upsert_project, project)
         
         # Save history
-        history_data = {
-            "symbol": symbol,
-            "current_price": project.get("current_price", 0),
-            "market_cap": project.get("market_cap", 0),
-            "volume_24h": project.get("volume_24h", 0),
-            "price_change_24h": project.get("price_change_24h", 0),
-            "price_change_7d": project.get("price_change_7d", 0),
-            "ai_score": project.get("ai_score", 0),
-            "ai_verdict": project.get("ai_verdict", "UNKNOWN"),
-            "sentiment_score": project.get("sentiment_score", 0),
-            "combined_score": combined_score
-        }
-        
-        insert_project_history(history_data)
+        await asyncio.to_thread(insert_project_history, _build_history_data(project))
+
+        # Coalesced: a burst of refreshes publishes once. Not awaited,
+        # the refreshed row is returned right away
+        if job_queue.is_running():
+            await job_queue.submit(
+                "rankings:publish",
+                publish_rankings_snapshot,
+                priority=JOB_RANKINGS,
+                after_running=True
+            )
+        else:
+            await asyncio.to_thread(publish_rankings_snapshot)
         
         return project
         
     except Exception as e:
         logger.error(f"Failed to scan single project {symbol}: {e}")
-        return None
\ No newline at end of file
+        return None
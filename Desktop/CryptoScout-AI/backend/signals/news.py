@@ -8,6 +8,7 @@ import logging
 from collections import defaultdict
 from textblob import TextBlob
 from signals.cache import get, set
+from core.rate_governor import governor, PRIORITY_LOW
 
 
 
@@ -48,6 +49,11 @@ def fetch_news_impact(symbols, limit=10):
 
     for sym in symbols:
 
+        # Background signal: skip the rest rather than wait for budget
+        if not governor.acquire("gnews", PRIORITY_LOW):
+            logger.info("GNews budget exhausted — skipping remaining symbols")
+            break
+
         try:
 
             params = {
@@ -64,6 +70,11 @@ def fetch_news_impact(symbols, limit=10):
                 timeout=20
             )
 
+            if r.status_code == 429:
+                governor.penalize("gnews")
+                logger.warning("GNews rate limited — skipping remaining symbols")
+                break
+
             r.raise_for_status()
 
             data = r.json().get("articles", [])
@@ -8,6 +8,7 @@ import logging
 from collections import defaultdict
 from textblob import TextBlob
 from signals.cache import get, set
+from core.rate_governor import governor, PRIORITY_LOW
 
 
 
@@ -50,6 +51,11 @@ def fetch_sentiment(symbols, limit=50):
 
     for sym in symbols:
 
+        # Background signal: skip the rest rather than wait for budget
+        if not governor.acquire("rapidapi", PRIORITY_LOW):
+            logger.info("RapidAPI budget exhausted — skipping remaining symbols")
+            break
+
         try:
 
             params = {
@@ -65,6 +71,11 @@ def fetch_sentiment(symbols, limit=50):
                 timeout=20
             )
 
+            if r.status_code == 429:
+                governor.penalize("rapidapi")
+                logger.warning("RapidAPI rate limited — skipping remaining symbols")
+                break
+
             r.raise_for_status()
 
             data = r.json().get("data", [])
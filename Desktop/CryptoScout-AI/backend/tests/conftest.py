@@ -0,0 +1,7 @@
+# backend/tests/conftest.py
+
+import os
+import sys
+
+# Modules import each other from the backend root (services.*, core.*)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,187 @@
+# backend/tests/test_ranking_parity.py
+
+import numpy as np
+import pytest
+
+from services.ranking_service import (
+    PROFILE_WEIGHTS,
+    project_columns,
+    compute_trend_momentum,
+    compute_volatility_heat,
+    compute_market_cap_score,
+    compute_volume_pressure,
+    compute_trend_acceleration,
+    compute_combined_score,
+    batch_trend_momentum,
+    batch_volatility_heat,
+    batch_market_cap_score,
+    batch_volume_pressure,
+    batch_trend_acceleration,
+    batch_sentiment,
+    batch_combined_score,
+    batch_profile_scores,
+    score_universe
+)
+from services.sentiment_service import compute_sentiment
+
+
+# =====================================================
+# FIXTURES
+# =====================================================
+
+EDGE_PROJECTS = [
+    # Missing, None and zero fields
+    {},
+    {
+        "market_cap": None,
+        "volume_24h": None,
+        "price_change_24h": None,
+        "price_change_7d": None,
+        "ai_score": None,
+        "sentiment_score": None
+    },
+    {
+        "market_cap": 0,
+        "volume_24h": 0,
+        "price_change_24h": 0,
+        "price_change_7d": 0,
+        "ai_score": 0,
+        "sentiment_score": 0
+    },
+    # Negative inputs
+    {
+        "market_cap": -1_000_000,
+        "volume_24h": -50_000,
+        "price_change_24h": -12.5,
+        "price_change_7d": -40,
+        "ai_score": -10,
+        "sentiment_score": -0.3
+    },
+    {"market_cap": 5_000_000, "volume_24h": 1_000_000, "price_change_24h": -80},
+    # Clamps: score above 1, volume above market cap, huge moves
+    {
+        "market_cap": 9e12,
+        "volume_24h": 2e13,
+        "price_change_24h": 250,
+        "price_change_7d": 900,
+        "ai_score": 100,
+        "sentiment_score": 1
+    },
+    # Volatility heat boundaries
+    {"price_change_24h": 3},
+    {"price_change_24h": 8},
+    {"price_change_24h": 15},
+    {"price_change_24h": -15.0001},
+    # Sentiment boundary (7d exactly 10)
+    {"price_change_24h": 0.1, "price_change_7d": 10},
+    # Values that land on (or next to) a 4th-decimal half-way point
+    {"price_change_24h": 0.0125},
+    {"price_change_24h": 0.0375},
+    {"price_change_7d": 0.035},
+    {"price_change_24h": 0.005, "price_change_7d": 0.0035},
+    {"market_cap": 10 ** 0.0006 * 1e6},
+    {"market_cap": 1_000_000, "volume_24h": 10.5},
+    {"market_cap": 1_000_000, "volume_24h": 30.5},
+    {"ai_score": 0.02, "sentiment_score": 0.00005},
+    {"ai_score": 50.01, "sentiment_score": 0.25005},
+]
+
+
+def _random_projects(n: int = 500, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    projects = []
+
+    for _ in range(n):
+        market_cap = float(10 ** rng.uniform(4, 13))
+
+        projects.append({
+            "market_cap": market_cap,
+            "volume_24h": float(market_cap * rng.uniform(0, 0.5)),
+            "price_change_24h": float(np.round(rng.normal(0, 10), rng.integers(0, 5))),
+            "price_change_7d": float(np.round(rng.normal(0, 25), rng.integers(0, 5))),
+            "ai_score": float(np.round(rng.uniform(0, 100), rng.integers(0, 3))),
+            "sentiment_score": float(np.round(rng.uniform(0, 1), rng.integers(1, 5)))
+        })
+
+    return projects
+
+
+PROJECTS = EDGE_PROJECTS + _random_projects()
+
+
+@pytest.fixture(scope="module")
+def columns():
+    return project_columns(PROJECTS)
+
+
+def _assert_matches(batch, scalar_fn):
+    expected = [scalar_fn(p) for p in PROJECTS]
+
+    assert len(batch) == len(expected)
+
+    for i, (got, want) in enumerate(zip(batch.tolist(), expected)):
+        assert got == want, f"project {i} {PROJECTS[i]}: batch {got!r} != scalar {want!r}"
+
+
+# =====================================================
+# PER-METRIC PARITY
+# =====================================================
+
+@pytest.mark.parametrize("batch_fn, scalar_fn", [
+    (batch_trend_momentum, compute_trend_momentum),
+    (batch_volatility_heat, compute_volatility_heat),
+    (batch_market_cap_score, compute_market_cap_score),
+    (batch_volume_pressure, compute_volume_pressure),
+    (batch_trend_acceleration, compute_trend_acceleration),
+    (batch_sentiment, compute_sentiment),
+])
+def test_batch_metric_matches_scalar(columns, batch_fn, scalar_fn):
+    _assert_matches(batch_fn(columns), scalar_fn)
+
+
+@pytest.mark.parametrize("profile", list(PROFILE_WEIGHTS) + ["unknown"])
+def test_batch_combined_score_matches_scalar(columns, profile):
+    _assert_matches(
+        batch_combined_score(columns, profile),
+        lambda p: compute_combined_score(p, profile)
+    )
+
+
+def test_batch_profile_scores_match_scalar(columns):
+    scores = batch_profile_scores(columns)
+
+    assert list(scores) == list(PROFILE_WEIGHTS)
+
+    for profile, batch in scores.items():
+        _assert_matches(batch, lambda p: compute_combined_score(p, profile))
+
+
+def test_score_universe_matches_scalar(columns):
+    scores = score_universe(columns, "aggressive")
+
+    _assert_matches(scores["combined_score"], lambda p: compute_combined_score(p, "aggressive"))
+    _assert_matches(scores["trend_momentum"], compute_trend_momentum)
+    _assert_matches(scores["volatility_heat"], compute_volatility_heat)
+    _assert_matches(scores["market_cap_score"], compute_market_cap_score)
+    _assert_matches(scores["volume_pressure"], compute_volume_pressure)
+    _assert_matches(scores["trend_acceleration"], compute_trend_acceleration)
+    _assert_matches(scores["sentiment_score"], compute_sentiment)
+
+
+# =====================================================
+# ROUNDING TIES
+# =====================================================
+
+def test_edge_cases_include_rounding_ties(columns):
+    # Guard the fixture: at least one input must hit the tie fallback
+    raw = (0.6 * columns["price_change_7d"] + 0.4 * columns["price_change_24h"]) / 100
+    scaled = np.abs(raw) * 10_000
+
+    assert np.any(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+
+
+def test_empty_universe():
+    columns = project_columns([])
+
+    assert batch_combined_score(columns).shape == (0,)
+    assert all(len(values) == 0 for values in score_universe(columns).values())
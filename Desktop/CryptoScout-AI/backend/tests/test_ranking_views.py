@@ -0,0 +1,126 @@
+# backend/tests/test_ranking_views.py
+
+import pytest
+
+import services.ranking_service as ranking
+from services.ranking_service import (
+    RANKING_PROFILES,
+    compute_combined_score,
+    compute_volatility_heat,
+    compute_trend_momentum,
+    serialize_project_summary
+)
+
+
+# =====================================================
+# FIXTURES
+# =====================================================
+
+PROJECTS = [
+    {"symbol": "BIG", "name": "Big", "current_price": 100, "market_cap": 9e11,
+     "volume_24h": 1e10, "price_change_24h": 1.5, "price_change_7d": 3,
+     "ai_score": 60, "ai_verdict": "HOLD", "sentiment_score": 0.8},
+    {"symbol": "CALM", "name": "Calm", "current_price": 1, "market_cap": 5e9,
+     "volume_24h": 1e8, "price_change_24h": 0.1, "price_change_7d": -1,
+     "ai_score": 40, "ai_verdict": "HOLD", "sentiment_score": 0.0},
+    {"symbol": "MOON", "name": "Moon", "current_price": 0.01, "market_cap": 2e7,
+     "volume_24h": 5e6, "price_change_24h": 25, "price_change_7d": 80,
+     "ai_score": 75, "ai_verdict": "BUY", "sentiment_score": 1.0},
+    {"symbol": "DUMP", "name": "Dump", "current_price": 3, "market_cap": 3e8,
+     "volume_24h": 4e7, "price_change_24h": -12, "price_change_7d": -30,
+     "ai_score": 10, "ai_verdict": "SELL", "sentiment_score": 0.0},
+    # Missing fields sort as 0
+    {"symbol": "BARE", "name": "Bare", "current_price": None, "market_cap": None,
+     "volume_24h": None, "price_change_24h": None, "price_change_7d": None,
+     "ai_score": None, "ai_verdict": None, "sentiment_score": None},
+] + [
+    {"symbol": f"C{i}", "name": f"Coin {i}", "current_price": 1, "market_cap": 1e8 + i * 1e6,
+     "volume_24h": 1e6, "price_change_24h": (i % 7) - 3.5, "price_change_7d": (i % 11) - 5,
+     "ai_score": i % 100, "ai_verdict": "HOLD", "sentiment_score": (i % 5) / 5}
+    for i in range(40)
+]
+
+
+@pytest.fixture(scope="module")
+def snapshot():
+    original = ranking.get_all_projects
+    ranking.get_all_projects = lambda: [dict(p) for p in PROJECTS]
+
+    try:
+        return ranking.build_rankings_snapshot(version=1)
+    finally:
+        ranking.get_all_projects = original
+
+
+def _reference_views(profile):
+    """
+    What each view means, computed row by row with the per-dict
+    functions: short_term by combined score, the others re-sorted
+    from it (ties keep combined-score order).
+    """
+    rows = []
+
+    for project in PROJECTS:
+        row = dict(project)
+        row["combined_score"] = compute_combined_score(project, profile)
+        row["volatility_heat"] = compute_volatility_heat(project)
+        row["trend_momentum"] = compute_trend_momentum(project)
+        rows.append(row)
+
+    by_score = sorted(rows, key=lambda p: p["combined_score"], reverse=True)
+
+    views = {
+        "short_term": by_score,
+        "long_term": sorted(by_score, key=lambda p: float(p["market_cap"] or 0), reverse=True),
+        "low_risk": sorted(by_score, key=lambda p: abs(float(p["price_change_24h"] or 0))),
+        "high_growth": sorted(by_score, key=lambda p: float(p["price_change_7d"] or 0), reverse=True)
+    }
+
+    return {
+        view: [serialize_project_summary(p) for p in ordered]
+        for view, ordered in views.items()
+    }
+
+
+# =====================================================
+# VIEW PARITY
+# =====================================================
+
+@pytest.mark.parametrize("profile", RANKING_PROFILES)
+@pytest.mark.parametrize("view", ["short_term", "long_term", "low_risk", "high_growth"])
+def test_view_matches_reference(snapshot, profile, view):
+    assert snapshot["profiles"][profile][view] == _reference_views(profile)[view]
+
+
+def test_views_cover_the_whole_universe(snapshot):
+    # Not capped to the top 20 by combined score
+    for views in snapshot["profiles"].values():
+        for rows in views.values():
+            assert len(rows) == len(PROJECTS)
+            assert {r["symbol"] for r in rows} == {p["symbol"] for p in PROJECTS}
+
+
+def test_view_orderings(snapshot):
+    views = snapshot["profiles"]["balanced"]
+
+    assert views["long_term"][0]["symbol"] == "BIG"
+    assert views["long_term"][-1]["symbol"] == "BARE"
+    assert views["low_risk"][0]["symbol"] == "BARE"
+    assert views["low_risk"][1]["symbol"] == "CALM"
+    assert views["high_growth"][0]["symbol"] == "MOON"
+    assert views["high_growth"][-1]["symbol"] == "DUMP"
+
+    scores = [r["combined_score"] for r in views["short_term"]]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_view_functions_page_through_the_snapshot(snapshot, monkeypatch):
+    monkeypatch.setattr(ranking, "get_rankings_snapshot", lambda: snapshot)
+
+    full = snapshot["profiles"]["safe"]["long_term"]
+
+    assert ranking.get_long_term("safe", limit=20, offset=20) == full[20:40]
+    assert ranking.get_low_risk("unknown", limit=5) == snapshot["profiles"]["balanced"]["low_risk"][:5]
+    assert ranking.get_high_growth("aggressive", limit=10, offset=40) == \
+        snapshot["profiles"]["aggressive"]["high_growth"][40:50]
+    assert ranking.get_short_term("long-term") == snapshot["profiles"]["long-term"]["short_term"][:20]
@@ -0,0 +1,166 @@
+# backend/tests/test_rankings_http.py
+
+import gzip
+import json
+
+import pytest
+
+pytest.importorskip("fastapi.testclient")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import api.routes_rankings as routes
+from core.compression import QValueGZipMiddleware
+
+
+VERSION = 1_700_000_000_000
+
+ROWS = [
+    {"symbol": f"C{i}", "name": f"Coin {i}", "combined_score": round(1 - i / 100, 4)}
+    for i in range(50)
+]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    snapshot = {
+        "version": VERSION,
+        "profiles": {"balanced": {"short_term": ROWS}}
+    }
+
+    async def run_inline(fn, *args):
+        return fn(*args)
+
+    monkeypatch.setattr(routes, "run_db", run_inline)
+    monkeypatch.setattr(routes, "get_snapshot_version", lambda: VERSION)
+    monkeypatch.setattr(routes, "get_rankings_snapshot", lambda: snapshot)
+    monkeypatch.setattr(routes, "normalize_profile", lambda profile: "balanced")
+    monkeypatch.setattr(routes, "_page_cache", type(routes._page_cache)())
+    monkeypatch.setattr(routes, "_page_cache_version", None)
+
+    # Same middleware setup as main.py
+    app = FastAPI()
+    app.add_middleware(QValueGZipMiddleware, minimum_size=500)
+    app.include_router(routes.router)
+
+    return TestClient(app)
+
+
+def _etag():
+    return routes._page_etag(VERSION, "short_term", "balanced", 50, 0)
+
+
+# =====================================================
+# PRE-GZIPPED PASSTHROUGH
+# =====================================================
+
+def test_pre_gzipped_page_is_not_compressed_twice(client):
+    response = client.get(
+        "/rankings/short-term?limit=50",
+        headers={"Accept-Encoding": "gzip"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+
+    # The client undoes exactly one layer of gzip
+    assert response.json() == ROWS
+
+
+def test_page_served_plain_without_accept_encoding(client):
+    response = client.get(
+        "/rankings/short-term?limit=50",
+        headers={"Accept-Encoding": "identity"}
+    )
+
+    assert "content-encoding" not in response.headers
+    assert json.loads(response.content) == ROWS
+
+
+def test_gzip_body_is_the_cached_page_compressed_once(client):
+    with client.stream(
+        "GET",
+        "/rankings/short-term?limit=50",
+        headers={"Accept-Encoding": "gzip"}
+    ) as response:
+        raw = b"".join(response.iter_raw())
+
+    assert response.headers["content-encoding"] == "gzip"
+
+    # Exactly one gzip layer over the JSON page...
+    assert json.loads(gzip.decompress(raw)) == ROWS
+
+    # ...and it is the pre-encoded body from the page cache
+    body, gzipped = routes._page_cache[_etag()]
+    assert raw == gzipped
+    assert gzip.decompress(gzipped) == body
+
+
+@pytest.mark.parametrize("accept_encoding", [
+    "gzip;q=0",
+    "br, gzip; q=0.0, *",
+    "x-gzip-ish",
+    "*;q=0",
+])
+def test_gzip_refused_by_accept_encoding_serves_plain(client, accept_encoding):
+    with client.stream(
+        "GET",
+        "/rankings/short-term?limit=50",
+        headers={"Accept-Encoding": accept_encoding}
+    ) as response:
+        raw = b"".join(response.iter_raw())
+
+    assert "content-encoding" not in response.headers
+    assert json.loads(raw) == ROWS
+
+
+# =====================================================
+# CONDITIONAL REQUESTS
+# =====================================================
+
+@pytest.mark.parametrize("if_none_match", [
+    "{etag}",
+    "W/{etag}",
+    '"stale-tag", {etag}',
+    '"stale-tag",W/{etag}',
+    "*",
+])
+def test_if_none_match_returns_304(client, if_none_match):
+    response = client.get(
+        "/rankings/short-term?limit=50",
+        headers={"If-None-Match": if_none_match.format(etag=_etag())}
+    )
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == _etag()
+
+
+@pytest.mark.parametrize("if_none_match", [
+    '"stale-tag"',
+    '"stale-tag", W/"other"',
+    "",
+])
+def test_if_none_match_mismatch_returns_page(client, if_none_match):
+    response = client.get(
+        "/rankings/short-term?limit=50",
+        headers={"If-None-Match": if_none_match}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == ROWS
+
+
+# =====================================================
+# ON-DEMAND REFRESH
+# =====================================================
+
+def test_refresh_requires_auth(client, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("refresh ran without auth")
+
+    monkeypatch.setattr(routes, "wait_for_covering_scan", fail)
+
+    response = client.post("/rankings/refresh/BTC")
+
+    assert response.status_code == 401